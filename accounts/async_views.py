@@ -0,0 +1,83 @@
+"""
+Versiones asíncronas del registro y el inicio de sesión.
+
+Se activan con ``ACCOUNTS_ASYNC_VIEWS`` (por defecto al arrancar desde
+platzi_project/asgi.py). Bajo ASGI las vistas síncronas comparten un solo
+hilo, así que un hash de contraseña las retrasa a todas; estas esperan el
+hash en el pool de accounts/hashing.py y el resto de peticiones siguen
+atendiéndose mientras tanto.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.shortcuts import render, redirect
+from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import csrf_protect
+
+from . import services
+from .forms import UserRegistrationForm, UserLoginForm
+from .views import registration_errors
+
+
+arender = sync_to_async(render)
+
+
+@csrf_protect
+@never_cache
+async def register_view(request):
+    if (await request.auser()).is_authenticated:
+        messages.info(request, 'Ya tienes una sesión activa.')
+        return redirect('productos:inicio')
+
+    if request.method == 'POST':
+        form = UserRegistrationForm(request.POST)
+        if await sync_to_async(form.is_valid)():
+            try:
+                user, _ = await services.aregister_user({
+                    'username': form.cleaned_data['username'],
+                    'email': form.cleaned_data['email'],
+                    'first_name': form.cleaned_data['first_name'],
+                    'last_name': form.cleaned_data['last_name'],
+                    'password': form.cleaned_data['password1'],
+                    'password2': form.cleaned_data['password2'],
+                })
+            except services.AccountError as e:
+                registration_errors(form, e.errors)
+            else:
+                messages.success(
+                    request,
+                    f'¡Registro exitoso! Bienvenido {user.first_name}. Tu cuenta ha sido creada.'
+                )
+                return redirect('accounts:login')
+    else:
+        form = UserRegistrationForm()
+
+    return await arender(request, 'register.html', {'form': form})
+
+
+@csrf_protect
+@never_cache
+async def login_view(request):
+    if (await request.auser()).is_authenticated:
+        messages.info(request, 'Ya tienes una sesión activa.')
+        return redirect('productos:inicio')
+
+    if request.method == 'POST':
+        form = UserLoginForm(request.POST)
+        if form.is_valid():
+            try:
+                user, _ = await services.alogin_user(
+                    request, form.cleaned_data['username'], form.cleaned_data['password'],
+                    with_token=False,
+                )
+            except services.AccountError:
+                form.add_error(None, 'Credenciales inválidas. Verifica tu usuario y contraseña.')
+            else:
+                messages.success(
+                    request,
+                    f'¡Bienvenido de nuevo, {user.first_name or user.username}!'
+                )
+                return redirect(request.GET.get('next', 'productos:inicio'))
+    else:
+        form = UserLoginForm()
+
+    return await arender(request, 'login.html', {'form': form})
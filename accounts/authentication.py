@@ -0,0 +1,151 @@
+"""
+Autenticación por token de la API con caché de token → usuario.
+
+``TokenAuthentication`` de DRF consulta ``authtoken_token`` + ``auth_user`` en
+cada petición autenticada. ``CachedTokenAuthentication`` guarda el usuario de
+cada token en dos capas durante ``ACCOUNTS_TOKEN_CACHE_TTL`` segundos:
+
+- Un LRU en memoria del proceso (como máximo ``ACCOUNTS_TOKEN_CACHE_LOCAL``
+  tokens).
+- La caché compartida entre workers ``ACCOUNTS_TOKEN_CACHE`` (Redis con
+  ``REDIS_URL``; clave con el SHA-256 del token, nunca el token en claro).
+
+Cuando se elimina un token o cambia un usuario (accounts/signals.py) se borran
+sus entradas de la caché compartida y se incrementa un contador de
+revocaciones en ella. Cada petición lee ese contador y, si ha cambiado, el
+proceso vacía su LRU, así que ningún worker sigue aceptando un token revocado.
+
+Sin caché compartida (``ACCOUNTS_TOKEN_CACHE = None``) la revocación no
+llegaría a los demás workers, así que no se cachea nada y cada petición
+consulta la base de datos, como ``TokenAuthentication``.
+
+Los cambios hechos sin señales (``QuerySet.update``) no se detectan hasta que
+caduca la entrada.
+"""
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+
+
+REVOCATIONS_KEY = 'accounts:tokens:revocaciones'
+
+
+def _cache_key(key):
+    return 'accounts:token:' + hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def get_cache():
+    """Caché compartida de tokens, o None si no hay ninguna configurada"""
+    if settings.ACCOUNTS_TOKEN_CACHE is None:
+        return None
+    return caches[settings.ACCOUNTS_TOKEN_CACHE]
+
+
+def get_generation(cache):
+    """Contador de revocaciones; si la caché lo pierde se crea a partir del reloj"""
+    generation = cache.get(REVOCATIONS_KEY)
+    if generation is None:
+        cache.add(REVOCATIONS_KEY, time.time_ns() // 1000, timeout=None)
+        generation = cache.get(REVOCATIONS_KEY)
+    return generation
+
+
+class LocalCache:
+    """LRU acotado con caducidad; se vacía entero cuando cambia la generación"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.generation = None
+
+    def get(self, key, generation):
+        with self.lock:
+            if generation != self.generation:
+                self.entries.clear()
+                self.generation = generation
+                return None
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return user
+
+    def set(self, key, user, generation, ttl):
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.entries[key] = (user, time.monotonic() + ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+_local_cache = None
+_local_cache_lock = threading.Lock()
+
+
+def get_local_cache():
+    global _local_cache
+    if _local_cache is None:
+        with _local_cache_lock:
+            if _local_cache is None:
+                _local_cache = LocalCache(settings.ACCOUNTS_TOKEN_CACHE_LOCAL)
+    return _local_cache
+
+
+def revoke(keys):
+    """Olvida los tokens indicados en la caché compartida y en el LRU de todos los procesos"""
+    cache = get_cache()
+    if cache is None:
+        return
+    cache.delete_many([_cache_key(key) for key in keys])
+    try:
+        cache.incr(REVOCATIONS_KEY)
+    except ValueError:
+        cache.add(REVOCATIONS_KEY, time.time_ns() // 1000, timeout=None)
+    get_local_cache().clear()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """``TokenAuthentication`` que solo consulta la base de datos si el token no está en caché"""
+
+    def authenticate_credentials(self, key):
+        cache = get_cache()
+        if cache is None:
+            return super().authenticate_credentials(key)
+
+        ttl = settings.ACCOUNTS_TOKEN_CACHE_TTL
+        generation = get_generation(cache)
+        local = get_local_cache()
+
+        user = local.get(key, generation)
+        if user is None:
+            cache_key = _cache_key(key)
+            user = cache.get(cache_key)
+            if user is None:
+                # Token inexistente o usuario inactivo: AuthenticationFailed, como en DRF
+                user, token = super().authenticate_credentials(key)
+                if get_generation(cache) != generation:
+                    # Se revocó algún token durante la consulta: no se guarda
+                    return user, token
+                cache.set(cache_key, user, ttl)
+            local.set(key, user, generation, ttl)
+
+        # Copia: el objeto en caché se comparte entre peticiones
+        user = copy.copy(user)
+        return user, self.get_model()(key=key, user=user)
@@ -0,0 +1,130 @@
+"""
+Disponibilidad de nombres de usuario y correos electrónicos.
+
+La página de registro pregunta por cada cambio en los campos, así que:
+
+- Las consultas usan índices: ``username`` es único y el correo tiene
+  ``accounts_user_email_idx`` (migración 0001 de accounts).
+- Usuario y correo se comprueban en una sola consulta (``check``).
+- Los valores ocupados se recuerdan en un LRU acotado del proceso
+  (``ACCOUNTS_OCUPADOS_MAX`` entradas, ``ACCOUNTS_OCUPADOS_TTL`` segundos): un
+  nombre ocupado casi nunca vuelve a quedar libre. Los libres siempre se
+  consultan, porque otro usuario puede registrarlos en cualquier momento.
+
+Al borrar o renombrar un usuario, accounts/signals.py llama a ``forget`` en el
+proceso que hizo el cambio. En los demás se verá ocupado hasta que caduque la
+entrada; el registro siempre valida contra la base de datos.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import Q
+
+
+USERNAME = 'username'
+EMAIL = 'email'
+
+
+class TakenCache:
+    """Conjunto LRU acotado de valores ocupados, con caducidad"""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def __contains__(self, key):
+        with self.lock:
+            expires = self.entries.get(key)
+            if expires is None:
+                return False
+            if expires < time.monotonic():
+                del self.entries[key]
+                return False
+            self.entries.move_to_end(key)
+            return True
+
+    def add(self, key):
+        with self.lock:
+            self.entries[key] = time.monotonic() + self.ttl
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def discard(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+
+_taken = None
+_taken_lock = threading.Lock()
+
+
+def get_taken_cache():
+    global _taken
+    if _taken is None:
+        with _taken_lock:
+            if _taken is None:
+                _taken = TakenCache(settings.ACCOUNTS_OCUPADOS_MAX, settings.ACCOUNTS_OCUPADOS_TTL)
+    return _taken
+
+
+def remember(username=None, email=None):
+    """Marca como ocupados el usuario y el correo de una cuenta"""
+    taken = get_taken_cache()
+    if username:
+        taken.add((USERNAME, username))
+    if email:
+        taken.add((EMAIL, email))
+
+
+def forget(username=None, email=None):
+    taken = get_taken_cache()
+    taken.discard((USERNAME, username))
+    taken.discard((EMAIL, email))
+
+
+def check(username=None, email=None, cached=True):
+    """
+    Devuelve ``{'username': bool, 'email': bool}`` (True si está libre) para
+    los valores indicados, con una consulta como mucho.
+    """
+    taken = get_taken_cache()
+    result = {}
+    query = Q()
+    if username:
+        if cached and (USERNAME, username) in taken:
+            result[USERNAME] = False
+        else:
+            query |= Q(username=username)
+    if email:
+        if cached and (EMAIL, email) in taken:
+            result[EMAIL] = False
+        else:
+            query |= Q(email=email)
+
+    if query:
+        found_usernames = set()
+        found_emails = set()
+        for found_username, found_email in User.objects.filter(query).values_list('username', 'email'):
+            found_usernames.add(found_username)
+            found_emails.add(found_email)
+            remember(found_username if found_username == username else None,
+                     found_email if found_email == email else None)
+        if username and USERNAME not in result:
+            result[USERNAME] = username not in found_usernames
+        if email and EMAIL not in result:
+            result[EMAIL] = email not in found_emails
+    return result
+
+
+def username_available(username, cached=True):
+    return check(username=username, cached=cached)[USERNAME]
+
+
+def email_available(email, cached=True):
+    return check(email=email, cached=cached)[EMAIL]
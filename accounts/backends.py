@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from . import hashing
+
+
+UserModel = get_user_model()
+
+
+class PooledModelBackend(ModelBackend):
+    """
+    ``ModelBackend`` que comprueba la contraseña en el pool de accounts/hashing.py.
+
+    Cada intento de inicio de sesión calcula un solo hash (también cuando el
+    usuario no existe, para no revelarlo por el tiempo de respuesta). Si el
+    hash guardado usa parámetros antiguos se actualiza, como hace Django.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            hashing.make_password(password)
+            return None
+
+        is_correct, must_update = hashing.verify_password(password, user.password)
+        if is_correct and must_update:
+            user.password = hashing.make_password(password)
+            user.save(update_fields=['password'])
+        if is_correct and self.user_can_authenticate(user):
+            return user
+        return None
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = await UserModel._default_manager.aget_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            await hashing.amake_password(password)
+            return None
+
+        is_correct, must_update = await hashing.averify_password(password, user.password)
+        if is_correct and must_update:
+            user.password = await hashing.amake_password(password)
+            await user.asave(update_fields=['password'])
+        if is_correct and self.user_can_authenticate(user):
+            return user
+        return None
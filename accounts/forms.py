@@ -1,5 +1,6 @@
 from django import forms
-from django.contrib.auth.models import User
+
+from . import availability
 
 class UserRegistrationForm(forms.Form):
     username = forms.CharField(
@@ -75,7 +76,7 @@ class UserRegistrationForm(forms.Form):
 
     def clean_email(self):
         email = self.cleaned_data.get("email")
-        if User.objects.filter(email=email).exists():
+        if not availability.email_available(email, cached=False):
             raise forms.ValidationError("Ya existe un usuario con este email.")
         return email
 
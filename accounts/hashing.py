@@ -0,0 +1,52 @@
+"""
+Hashes de contraseñas en un pool de hilos acotado.
+
+PBKDF2 ocupa un núcleo durante decenas de milisegundos por contraseña. Con un
+pico de inicios de sesión, calcularlo en el hilo de cada petición (o en el
+bucle de eventos, como hace ``acheck_password`` de Django) satura la CPU y
+bloquea al resto de peticiones.
+
+Aquí los hashes se calculan en un pool de ``ACCOUNTS_HASH_WORKERS`` hilos:
+hashlib libera el GIL, así que se reparten entre núcleos, y nunca hay más de
+ese número calculándose a la vez. Las vistas síncronas esperan el resultado y
+las asíncronas lo esperan sin bloquear el bucle de eventos.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.ACCOUNTS_HASH_WORKERS,
+                    thread_name_prefix='hash',
+                )
+    return _executor
+
+
+def make_password(password):
+    return get_executor().submit(hashers.make_password, password).result()
+
+
+async def amake_password(password):
+    return await asyncio.wrap_future(get_executor().submit(hashers.make_password, password))
+
+
+def verify_password(password, encoded):
+    """Devuelve (es_correcta, hay_que_actualizar_el_hash)"""
+    return get_executor().submit(hashers.verify_password, password, encoded).result()
+
+
+async def averify_password(password, encoded):
+    return await asyncio.wrap_future(get_executor().submit(hashers.verify_password, password, encoded))
@@ -0,0 +1,154 @@
+import asyncio
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from accounts.backends import PooledModelBackend
+
+
+PASSWORD = 'benchmark-login-123'
+MODES = ['anterior', 'directo', 'pool']
+LAG_INTERVAL = 0.01  # Segundos entre comprobaciones del bucle de eventos
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class Command(BaseCommand):
+    """
+    Mide cuántos inicios de sesión por segundo se pueden atender.
+
+    Crea un usuario temporal y lo autentica --logins veces con --concurrency
+    peticiones a la vez, en hilos (como un servidor WSGI) o con --async en
+    corrutinas (como un servidor ASGI). Compara:
+
+    - anterior: dos hashes por inicio de sesión en el hilo de la petición
+      (la vista HTML y luego la API autenticaban las mismas credenciales).
+    - directo: ``ModelBackend`` de Django, un hash en el hilo de la petición
+      (o en el bucle de eventos con --async).
+    - pool: ``PooledModelBackend``, un hash en el pool de accounts/hashing.py.
+
+    Con --async también se muestra el mayor bloqueo del bucle de eventos.
+
+    Uso: python manage.py benchmark_login --logins 200 --concurrency 16 --async
+    """
+    help = 'Mide el rendimiento del inicio de sesión con y sin el pool de hashes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=200,
+                            help='Inicios de sesión por modo')
+        parser.add_argument('--concurrency', type=int, default=16,
+                            help='Inicios de sesión simultáneos')
+        parser.add_argument('--async', action='store_true', dest='use_async',
+                            help='Usar corrutinas en lugar de hilos')
+        parser.add_argument('--modes', default=','.join(MODES),
+                            help=f'Modos separados por comas ({", ".join(MODES)})')
+
+    def handle(self, *args, **options):
+        modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f'Modos desconocidos: {", ".join(sorted(unknown))}')
+        logins = max(options['logins'], 1)
+        concurrency = max(options['concurrency'], 1)
+
+        self.stdout.write(
+            f'{logins} inicios de sesión, {concurrency} simultáneos, '
+            f'{"corrutinas" if options["use_async"] else "hilos"}, '
+            f'pool de {settings.ACCOUNTS_HASH_WORKERS} hilos'
+        )
+
+        username = f'benchmark-{uuid.uuid4().hex[:8]}'
+        user = User.objects.create_user(username, password=PASSWORD)
+        try:
+            for mode in modes:
+                if options['use_async']:
+                    elapsed, latencies, lag = asyncio.run(
+                        self.run_async(mode, username, logins, concurrency)
+                    )
+                else:
+                    elapsed, latencies = self.run_threads(mode, username, logins, concurrency)
+                    lag = None
+
+                line = (
+                    f'{mode:<9} {logins / elapsed:8.1f} logins/s   '
+                    f'p50 {percentile(latencies, 0.5) * 1000:7.1f} ms   '
+                    f'p95 {percentile(latencies, 0.95) * 1000:7.1f} ms'
+                )
+                if lag is not None:
+                    line += f'   bloqueo máx. del bucle {lag * 1000:7.1f} ms'
+                self.stdout.write(line)
+        finally:
+            user.delete()
+
+    def sync_login(self, mode, username):
+        if mode == 'pool':
+            return PooledModelBackend().authenticate(None, username=username, password=PASSWORD)
+        backend = ModelBackend()
+        if mode == 'anterior':
+            backend.authenticate(None, username=username, password=PASSWORD)
+        return backend.authenticate(None, username=username, password=PASSWORD)
+
+    async def async_login(self, mode, username):
+        if mode == 'pool':
+            return await PooledModelBackend().aauthenticate(None, username=username, password=PASSWORD)
+        backend = ModelBackend()
+        if mode == 'anterior':
+            await backend.aauthenticate(None, username=username, password=PASSWORD)
+        return await backend.aauthenticate(None, username=username, password=PASSWORD)
+
+    def run_threads(self, mode, username, logins, concurrency):
+        latencies = []
+
+        def worker(count):
+            try:
+                for _ in range(count):
+                    start = time.perf_counter()
+                    if self.sync_login(mode, username) is None:
+                        raise CommandError('La autenticación del usuario de prueba falló')
+                    latencies.append(time.perf_counter() - start)
+            finally:
+                connection.close()
+
+        # Cada hilo hace su parte de los inicios de sesión con su propia conexión
+        shares = [logins // concurrency + (i < logins % concurrency) for i in range(concurrency)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(worker, [share for share in shares if share]))
+        return time.perf_counter() - start, latencies
+
+    async def run_async(self, mode, username, logins, concurrency):
+        latencies = []
+        max_lag = 0.0
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def monitor():
+            # Si un hash bloquea el bucle, el sleep tarda más de lo pedido
+            nonlocal max_lag
+            while True:
+                start = time.perf_counter()
+                await asyncio.sleep(LAG_INTERVAL)
+                max_lag = max(max_lag, time.perf_counter() - start - LAG_INTERVAL)
+
+        async def login():
+            async with semaphore:
+                start = time.perf_counter()
+                if await self.async_login(mode, username) is None:
+                    raise CommandError('La autenticación del usuario de prueba falló')
+                latencies.append(time.perf_counter() - start)
+
+        monitor_task = asyncio.create_task(monitor())
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*(login() for _ in range(logins)))
+        finally:
+            monitor_task.cancel()
+        return time.perf_counter() - start, latencies, max_lag
@@ -0,0 +1,80 @@
+import statistics
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+class Command(BaseCommand):
+    """
+    Compara las estrategias de sesión (SESSION_STRATEGY en settings).
+
+    Con cada estrategia inicia la sesión de un usuario temporal y pide --path
+    --requests veces con el cliente de pruebas de Django (todos los
+    middlewares, sin red). Muestra las consultas a la base de datos por
+    petición, separando las de la tabla de sesiones, y el tiempo por petición.
+
+    La ruta por defecto es la de inicio de sesión: con la sesión iniciada solo
+    comprueba ``user.is_authenticated`` y redirige, sin llamar a la API de
+    Platzi. Con cached_db la caché es la configurada (Redis con REDIS_URL).
+
+    Uso: python manage.py benchmark_sessions --requests 100 --path /
+    """
+    help = 'Mide las consultas y el tiempo por petición de cada estrategia de sesión'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100,
+                            help='Peticiones por estrategia')
+        parser.add_argument('--path', default=None,
+                            help='Ruta pedida (por defecto la de inicio de sesión)')
+        parser.add_argument('--strategies', default=','.join(settings.SESSION_ENGINES),
+                            help='Estrategias separadas por comas')
+
+    def handle(self, *args, **options):
+        strategies = [name.strip() for name in options['strategies'].split(',') if name.strip()]
+        unknown = set(strategies) - set(settings.SESSION_ENGINES)
+        if unknown:
+            raise CommandError(f'Estrategias desconocidas: {", ".join(sorted(unknown))}')
+        requests = max(options['requests'], 1)
+        path = options['path'] or reverse('accounts:login')
+
+        self.stdout.write(f'{requests} peticiones a {path} con la sesión iniciada')
+
+        user = User.objects.create_user(f'benchmark-{uuid.uuid4().hex[:8]}')
+        try:
+            for strategy in strategies:
+                with override_settings(SESSION_ENGINE=settings.SESSION_ENGINES[strategy]):
+                    client = Client()
+                    client.force_login(user)
+                    try:
+                        queries, session_queries, durations = self.measure(client, path, requests)
+                    finally:
+                        client.logout()
+
+                self.stdout.write(
+                    f'{strategy:<15} '
+                    f'{queries / requests:5.2f} consultas/petición '
+                    f'({session_queries / requests:.2f} de sesiones)   '
+                    f'p50 {statistics.median(durations) * 1000:7.2f} ms'
+                )
+        finally:
+            user.delete()
+
+    def measure(self, client, path, requests):
+        queries = 0
+        session_queries = 0
+        durations = []
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                client.get(path)
+                durations.append(time.perf_counter() - start)
+            queries += len(captured.captured_queries)
+            session_queries += sum('django_session' in query['sql'] for query in captured.captured_queries)
+        return queries, session_queries, durations
@@ -0,0 +1,48 @@
+from django.db import migrations
+
+
+# auth_user.email no tiene índice y el registro lo consulta en cada alta y en
+# cada comprobación de disponibilidad. En PostgreSQL se crea CONCURRENTLY para
+# no bloquear las escrituras en auth_user (por eso la migración no es atómica).
+POSTGRES_FORWARDS = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS accounts_user_email_idx ON auth_user (email)",
+]
+
+POSTGRES_BACKWARDS = [
+    "DROP INDEX CONCURRENTLY IF EXISTS accounts_user_email_idx",
+]
+
+DEFAULT_FORWARDS = [
+    "CREATE INDEX IF NOT EXISTS accounts_user_email_idx ON auth_user (email)",
+]
+
+DEFAULT_BACKWARDS = [
+    "DROP INDEX IF EXISTS accounts_user_email_idx",
+]
+
+
+def run_for_vendor(postgres_sql, default_sql):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            statements = postgres_sql
+        else:
+            statements = default_sql
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor(POSTGRES_FORWARDS, DEFAULT_FORWARDS),
+            run_for_vendor(POSTGRES_BACKWARDS, DEFAULT_BACKWARDS),
+        ),
+    ]
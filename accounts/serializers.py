@@ -2,6 +2,11 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
 
+from . import availability, hashing
+
+
+CREDENCIALES_INCORRECTAS = 'Credenciales incorrectas. Por favor, verifica tu usuario y contraseña.'
+
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     """
@@ -47,7 +52,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         """
         Valida que el email no esté ya registrado en el sistema.
         """
-        if User.objects.filter(email=value).exists():
+        if not availability.email_available(value, cached=False):
             raise serializers.ValidationError(
                 'Ya existe un usuario con este correo electrónico'
             )
@@ -59,16 +64,22 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         """
         # Removemos password2 ya que no es parte del modelo User
         validated_data.pop('password2')
-        
-        # Creamos el usuario usando el método create_user para hashear la contraseña
-        user = User.objects.create_user(
-            username=validated_data['username'],
-            email=validated_data['email'],
-            password=validated_data['password'],
+
+        # El hash puede venir ya calculado (save(encoded_password=...)); si no,
+        # se calcula en el pool de accounts/hashing.py
+        encoded_password = validated_data.pop('encoded_password', None)
+        if encoded_password is None:
+            encoded_password = hashing.make_password(validated_data['password'])
+
+        user = User(
+            username=User.normalize_username(validated_data['username']),
+            email=User.objects.normalize_email(validated_data['email']),
             first_name=validated_data.get('first_name', ''),
-            last_name=validated_data.get('last_name', '')
+            last_name=validated_data.get('last_name', ''),
+            password=encoded_password,
         )
-        
+        user.save()
+
         return user
 
 
@@ -105,7 +116,7 @@ class UserLoginSerializer(serializers.Serializer):
             if not user:
                 # Si la autenticación falla, lanzamos un error
                 raise serializers.ValidationError(
-                    'Credenciales incorrectas. Por favor, verifica tu usuario y contraseña.',
+                    CREDENCIALES_INCORRECTAS,
                     code='authentication'
                 )
             
@@ -0,0 +1,93 @@
+"""
+Operaciones de cuentas (registro, inicio y cierre de sesión).
+
+Las usan tanto las vistas HTML como los endpoints de la API, así que cada
+operación se resuelve dentro de la misma petición y en una sola transacción,
+sin llamadas HTTP a nuestra propia API. Cada contraseña se hashea una sola
+vez, en el pool de accounts/hashing.py.
+
+Las variantes ``a*`` son para las vistas asíncronas: esperan el hash sin
+bloquear el bucle de eventos.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth import aauthenticate, login, logout
+from django.db import transaction
+from rest_framework.authtoken.models import Token
+
+from . import hashing
+from .serializers import CREDENCIALES_INCORRECTAS, UserRegistrationSerializer, UserLoginSerializer
+
+
+class AccountError(Exception):
+    """Datos no válidos; ``errors`` tiene el mismo formato que los del serializer"""
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def register_user(data):
+    """Valida y crea un usuario con su token. Devuelve (user, token)"""
+    serializer = UserRegistrationSerializer(data=data)
+    if not serializer.is_valid():
+        raise AccountError(serializer.errors)
+
+    return create_user(serializer)
+
+
+async def aregister_user(data):
+    serializer = UserRegistrationSerializer(data=data)
+    if not await sync_to_async(serializer.is_valid)():
+        raise AccountError(serializer.errors)
+
+    encoded_password = await hashing.amake_password(serializer.validated_data['password'])
+    return await sync_to_async(create_user)(serializer, encoded_password)
+
+
+def create_user(serializer, encoded_password=None):
+    with transaction.atomic():
+        user = serializer.save(encoded_password=encoded_password)
+        token, _ = Token.objects.get_or_create(user=user)
+    return user, token
+
+
+def login_user(request, username, password, with_token=True):
+    """
+    Comprueba las credenciales e inicia la sesión. Devuelve (user, token); el
+    token de la API solo se crea con ``with_token`` (la web no lo necesita).
+    """
+    serializer = UserLoginSerializer(
+        data={'username': username, 'password': password},
+        context={'request': request},
+    )
+    if not serializer.is_valid():
+        raise AccountError(serializer.errors)
+
+    user = serializer.validated_data['user']
+    return user, start_session(request, user, with_token)
+
+
+async def alogin_user(request, username, password, with_token=True):
+    user = None
+    if username and password:
+        user = await aauthenticate(request, username=username, password=password)
+    if user is None:
+        raise AccountError({'non_field_errors': [CREDENCIALES_INCORRECTAS]})
+    return user, await sync_to_async(start_session)(request, user, with_token)
+
+
+def start_session(request, user, with_token=True):
+    """Inicia la sesión de Django y devuelve el token de la API del usuario (o None)"""
+    with transaction.atomic():
+        login(request, user)
+        if not with_token:
+            return None
+        token, _ = Token.objects.get_or_create(user=user)
+    return token
+
+
+def logout_user(request, revoke_token=True):
+    """Cierra la sesión y, si se pide, elimina el token de la API del usuario"""
+    if revoke_token and request.user.is_authenticated:
+        Token.objects.filter(user=request.user).delete()
+    logout(request)
@@ -0,0 +1,53 @@
+"""
+Invalidación de la caché de tokens de la API (ver accounts/authentication.py)
+y de los nombres ocupados (ver accounts/availability.py).
+"""
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from . import availability
+from .authentication import revoke
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    # logout_api, cierre de sesión desde la web o borrado en el admin
+    revoke([instance.key])
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created=False, update_fields=None, **kwargs):
+    # Cada inicio de sesión guarda last_login: no cambia nada de lo que hay en caché
+    if created or (update_fields is not None and set(update_fields) <= {'last_login'}):
+        return
+    keys = list(Token.objects.filter(user=instance).values_list('key', flat=True))
+    if keys:
+        revoke(keys)
+
+
+@receiver(pre_save, sender=User)
+def load_previous_identity(sender, instance, update_fields=None, **kwargs):
+    # Usuario y correo antes del cambio, para liberarlos si se renombra
+    instance._previous_identity = None
+    if instance.pk is None or (update_fields is not None and not {'username', 'email'} & set(update_fields)):
+        return
+    instance._previous_identity = User.objects.filter(pk=instance.pk).values_list('username', 'email').first()
+
+
+@receiver(post_save, sender=User)
+def remember_user(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_identity', None)
+    if previous is not None:
+        username, email = previous
+        availability.forget(
+            username if username != instance.username else None,
+            email if email != instance.email else None,
+        )
+    availability.remember(instance.username, instance.email)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    availability.forget(instance.username, instance.email)
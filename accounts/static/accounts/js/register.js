@@ -0,0 +1,186 @@
+// IDs de los campos y URL de disponibilidad: vienen del formulario (data-* del <script>)
+const registerScript = document.currentScript;
+const AVAILABILITY_DELAY = 400; // ms sin escribir antes de consultar la disponibilidad
+
+document.addEventListener('DOMContentLoaded', function() {
+    // Toggle password visibility
+    const togglePassword1 = document.getElementById('togglePassword1');
+    const togglePassword2 = document.getElementById('togglePassword2');
+    const password1 = document.getElementById(registerScript.dataset.password1Id);
+    const password2 = document.getElementById(registerScript.dataset.password2Id);
+
+    if (togglePassword1 && password1) {
+        togglePassword1.addEventListener('click', function() {
+            const type = password1.getAttribute('type') === 'password' ? 'text' : 'password';
+            password1.setAttribute('type', type);
+            togglePassword1.querySelector('.eye-icon').style.opacity = type === 'text' ? '0.7' : '1';
+        });
+    }
+
+    if (togglePassword2 && password2) {
+        togglePassword2.addEventListener('click', function() {
+            const type = password2.getAttribute('type') === 'password' ? 'text' : 'password';
+            password2.setAttribute('type', type);
+            togglePassword2.querySelector('.eye-icon').style.opacity = type === 'text' ? '0.7' : '1';
+        });
+    }
+
+    // Password strength indicator
+    if (password1) {
+        password1.addEventListener('input', function() {
+            checkPasswordStrength(this.value);
+        });
+    }
+
+    // Password confirmation check
+    if (password1 && password2) {
+        password2.addEventListener('input', function() {
+            checkPasswordMatch(password1.value, this.value);
+        });
+    }
+
+    // Username/email availability (una sola petición para ambos campos)
+    const username = document.getElementById(registerScript.dataset.usernameId);
+    const email = document.getElementById(registerScript.dataset.emailId);
+    if (username && email && registerScript.dataset.availabilityUrl) {
+        let timer = null;
+        const schedule = function() {
+            clearTimeout(timer);
+            timer = setTimeout(function() {
+                checkAvailability(username.value.trim(), email.value.trim());
+            }, AVAILABILITY_DELAY);
+        };
+        username.addEventListener('input', schedule);
+        email.addEventListener('input', schedule);
+    }
+
+    // Form submission
+    const form = document.getElementById('registerForm');
+    if (form) {
+        form.addEventListener('submit', function(e) {
+            const submitBtn = document.getElementById('submitBtn');
+            const spinner = document.getElementById('spinner');
+            const submitIcon = document.getElementById('submitIcon');
+            const submitText = document.getElementById('submitText');
+
+            if (submitBtn && spinner && submitIcon && submitText) {
+                submitBtn.disabled = true;
+                spinner.style.display = 'inline-block';
+                submitIcon.style.display = 'none';
+                submitText.textContent = 'Creando cuenta...';
+            }
+        });
+    }
+});
+
+function checkPasswordStrength(password) {
+    const strengthFill = document.getElementById('strengthFill');
+    const strengthText = document.getElementById('strengthText');
+
+    if (!strengthFill || !strengthText) return;
+
+    let strength = 0;
+    let message = '';
+    let strengthClass = '';
+
+    if (password.length === 0) {
+        message = 'Ingresa una contraseña';
+        strengthClass = '';
+    } else if (password.length < 8) {
+        message = 'Muy corta';
+        strengthClass = 'strength-weak';
+    } else {
+        // Check for other strength criteria
+        if (/[A-Z]/.test(password)) strength++;
+        if (/[0-9]/.test(password)) strength++;
+        if (/[^A-Za-z0-9]/.test(password)) strength++;
+
+        if (password.length > 10) strength++;
+
+        if (strength < 2) {
+            message = 'Débil';
+            strengthClass = 'strength-weak';
+        } else if (strength < 4) {
+            message = 'Mediana';
+            strengthClass = 'strength-medium';
+        } else {
+            message = 'Fuerte';
+            strengthClass = 'strength-strong';
+        }
+    }
+
+    strengthFill.className = 'strength-fill ' + strengthClass;
+    strengthText.textContent = message;
+    strengthText.style.color = strengthClass === 'strength-weak' ? 'var(--error-color)' : 
+                              strengthClass === 'strength-medium' ? 'var(--warning-color)' : 
+                              strengthClass === 'strength-strong' ? 'var(--success-color)' : 'var(--gray-600)';
+}
+
+function checkPasswordMatch(password1, password2) {
+    const matchElement = document.getElementById('passwordMatch');
+    if (!matchElement) return;
+
+    if (password2.length === 0) {
+        matchElement.textContent = '';
+    } else if (password1 === password2) {
+        matchElement.textContent = 'Las contraseñas coinciden';
+        matchElement.style.color = 'var(--success-color)';
+    } else {
+        matchElement.textContent = 'Las contraseñas no coinciden';
+        matchElement.style.color = 'var(--error-color)';
+    }
+}
+
+// Respuestas ya recibidas: volver a escribir un valor no repite la petición
+const availabilityResults = new Map();
+let availabilityController = null;
+
+function checkAvailability(username, email) {
+    const usernameElement = document.getElementById('usernameAvailability');
+    const emailElement = document.getElementById('emailAvailability');
+    const params = new URLSearchParams();
+    // Los valores demasiado cortos o incompletos no se consultan
+    if (username.length >= 3 && !availabilityResults.has('username:' + username)) {
+        params.set('username', username);
+    }
+    if (email.includes('@') && !availabilityResults.has('email:' + email)) {
+        params.set('email', email);
+    }
+
+    const show = function() {
+        showAvailability(usernameElement, username.length >= 3 ? availabilityResults.get('username:' + username) : null);
+        showAvailability(emailElement, email.includes('@') ? availabilityResults.get('email:' + email) : null);
+    };
+
+    if (!params.toString()) {
+        show();
+        return;
+    }
+
+    // Solo cuenta la última consulta: las anteriores se cancelan
+    if (availabilityController) availabilityController.abort();
+    availabilityController = new AbortController();
+
+    fetch(registerScript.dataset.availabilityUrl + '?' + params.toString(), {
+        headers: {'Accept': 'application/json'},
+        signal: availabilityController.signal
+    })
+        .then(function(response) { return response.ok ? response.json() : null; })
+        .then(function(data) {
+            if (!data) return;
+            if (data.username) availabilityResults.set('username:' + username, data.username);
+            if (data.email) availabilityResults.set('email:' + email, data.email);
+            show();
+        })
+        .catch(function() {});
+}
+
+function showAvailability(element, result) {
+    if (!element) return;
+    if (!result) {
+        element.textContent = '';
+        return;
+    }
+    element.textContent = result.message;
+    element.style.color = result.available ? 'var(--success-color)' : 'var(--error-color)';
+}
@@ -1,3 +1,122 @@
-from django.test import TestCase
+import tempfile
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from . import availability, throttling
+
+
+class Throttle(throttling.AnonRateThrottle):
+    rate = '3/min'
+
+    def __init__(self, now):
+        super().__init__()
+        self.now = now
+
+    def timer(self):
+        return self.now
+
+
+class SlidingWindowTestsMixin:
+    """Pruebas comunes a los dos almacenes de contadores"""
+
+    def setUp(self):
+        patcher = mock.patch.object(throttling, '_store', self.make_store())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        request = APIRequestFactory().get('/api/', REMOTE_ADDR='10.0.0.1')
+        request.user = AnonymousUser()
+        self.request = Request(request)
+
+    def allow(self, now):
+        throttle = Throttle(now)
+        return throttle.allow_request(self.request, None), throttle
+
+    def test_permite_hasta_el_limite(self):
+        results = [self.allow(60 + i)[0] for i in range(4)]
+        self.assertEqual(results, [True, True, True, False])
+
+    def test_las_peticiones_rechazadas_no_cuentan(self):
+        for i in range(3):
+            self.allow(60 + i)
+        for _ in range(5):
+            self.assertFalse(self.allow(63)[0])
+        # Al final de la ventana siguiente la anterior ya casi no pesa
+        self.assertTrue(self.allow(179)[0])
+
+    def test_la_ventana_anterior_pesa_segun_lo_transcurrido(self):
+        for i in range(3):
+            self.allow(60 + i)
+        # A mitad de la ventana siguiente: 3 * 0.5 + 1 <= 3
+        self.assertTrue(self.allow(150)[0])
+        # 3 * 0.5 + 2 > 3
+        allowed, throttle = self.allow(150)
+        self.assertFalse(allowed)
+        self.assertGreater(throttle.wait(), 0)
+        self.assertLessEqual(throttle.wait(), 30)
+
+    def test_la_cuenta_caduca_tras_dos_ventanas(self):
+        for i in range(3):
+            self.allow(60 + i)
+        self.assertFalse(self.allow(70)[0])
+        results = [self.allow(180 + i)[0] for i in range(4)]
+        self.assertEqual(results, [True, True, True, False])
+
+    def test_clientes_distintos_no_comparten_contador(self):
+        for i in range(3):
+            self.allow(60 + i)
+        request = APIRequestFactory().get('/api/', REMOTE_ADDR='10.0.0.2')
+        request.user = AnonymousUser()
+        self.assertTrue(Throttle(63).allow_request(Request(request), None))
+
+
+class CacheStoreTests(SlidingWindowTestsMixin, SimpleTestCase):
+    def make_store(self):
+        cache = caches['default']
+        cache.clear()
+        self.addCleanup(cache.clear)
+        return throttling.CacheStore(cache)
+
+
+class SQLiteStoreTests(SlidingWindowTestsMixin, SimpleTestCase):
+    def make_store(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store = throttling.SQLiteStore(Path(directory.name) / 'throttle.sqlite3')
+        self.addCleanup(lambda: store.connection().close())
+        return store
+
+
+class AvailabilityTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(availability, '_taken', availability.TakenCache(100, 3600))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user('ana', 'ana@example.com', 'clave-123')
+
+    def test_los_ocupados_no_vuelven_a_consultarse(self):
+        self.assertEqual(availability.check('ana', 'ana@example.com'), {'username': False, 'email': False})
+        with self.assertNumQueries(0):
+            self.assertFalse(availability.username_available('ana'))
+
+    def test_renombrar_libera_el_nombre_anterior(self):
+        self.assertFalse(availability.username_available('ana'))
+        self.user.username = 'ana2'
+        self.user.email = 'ana2@example.com'
+        self.user.save()
+        self.assertEqual(availability.check('ana', 'ana@example.com'), {'username': True, 'email': True})
+        self.assertFalse(availability.username_available('ana2'))
+
+    def test_borrar_libera_el_nombre(self):
+        self.assertFalse(availability.username_available('ana'))
+        self.user.delete()
+        self.assertTrue(availability.username_available('ana'))
+
+    def test_guardar_last_login_no_consulta_el_usuario_anterior(self):
+        with self.assertNumQueries(1):
+            self.user.save(update_fields=['last_login'])
@@ -0,0 +1,160 @@
+"""
+Límites de peticiones de la API compartidos entre workers y nodos.
+
+Los throttles de DRF guardan en la caché la lista de instantes de cada
+cliente y la reescriben entera en cada petición; con la caché en memoria,
+además, cada worker lleva su propia cuenta. Aquí se usa una ventana deslizante
+aproximada con dos contadores por cliente (ventana actual y anterior):
+
+    estimación = anterior * (1 - fracción transcurrida de la actual) + actual
+
+Cada comprobación es un incremento atómico y una lectura, sin importar el
+límite. El almacén se elige en settings:
+
+- ``API_THROTTLE_CACHE``: alias de una caché compartida (Redis en producción,
+  ver ``REDIS_URL``), común a todos los nodos.
+- Si no hay ninguno, un archivo SQLite local (``API_THROTTLE_SQLITE``),
+  común a los workers de la misma máquina. Pensado para desarrollo.
+"""
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import throttling
+
+
+CLEANUP_PROBABILITY = 0.01  # Fracción de peticiones que borran contadores caducados (SQLite)
+
+
+class CacheStore:
+    """Contadores en una caché de Django (incr es atómico en Redis y Memcached)"""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def hit(self, previous_key, current_key, ttl):
+        """Suma una petición a la ventana actual; devuelve (anterior, actual)"""
+        try:
+            current = self.cache.incr(current_key)
+        except ValueError:
+            if self.cache.add(current_key, 1, timeout=ttl):
+                current = 1
+            else:
+                current = self.cache.incr(current_key)
+        return self.cache.get(previous_key, 0), current
+
+    def undo(self, key):
+        try:
+            self.cache.decr(key)
+        except ValueError:
+            pass
+
+
+class SQLiteStore:
+    """Contadores en un archivo SQLite compartido por los procesos de una máquina"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.local = threading.local()
+
+    def connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS throttle ('
+                'key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires REAL NOT NULL)'
+            )
+            self.local.conn = conn
+        return conn
+
+    def hit(self, previous_key, current_key, ttl):
+        conn = self.connection()
+        now = time.time()
+        if random.random() < CLEANUP_PROBABILITY:
+            conn.execute('DELETE FROM throttle WHERE expires < ?', (now,))
+        (current,) = conn.execute(
+            'INSERT INTO throttle (key, count, expires) VALUES (?, 1, ?) '
+            'ON CONFLICT (key) DO UPDATE SET count = count + 1 RETURNING count',
+            (current_key, now + ttl),
+        ).fetchone()
+        row = conn.execute(
+            'SELECT count FROM throttle WHERE key = ? AND expires >= ?', (previous_key, now),
+        ).fetchone()
+        return (row[0] if row else 0), current
+
+    def undo(self, key):
+        self.connection().execute('UPDATE throttle SET count = count - 1 WHERE key = ?', (key,))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if settings.API_THROTTLE_CACHE:
+                    _store = CacheStore(caches[settings.API_THROTTLE_CACHE])
+                else:
+                    _store = SQLiteStore(settings.API_THROTTLE_SQLITE)
+    return _store
+
+
+class SlidingWindowMixin:
+    """Sustituye la lista de instantes de ``SimpleRateThrottle`` por dos contadores"""
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        window = int(now // self.duration)
+        self.elapsed = now - window * self.duration
+        current_key = f'{self.key}:{window}'
+        # Los contadores viven dos ventanas: la actual y la siguiente, donde es la anterior
+        self.previous, self.current = get_store().hit(
+            f'{self.key}:{window - 1}', current_key, 2 * self.duration,
+        )
+
+        weight = 1 - self.elapsed / self.duration
+        if self.previous * weight + self.current > self.num_requests:
+            # Las peticiones rechazadas no cuentan
+            get_store().undo(current_key)
+            self.current -= 1
+            return self.throttle_failure()
+        return self.throttle_success()
+
+    def throttle_success(self):
+        return True
+
+    def wait(self):
+        """Segundos hasta que la estimación deje sitio para una petición más"""
+        remaining = self.duration - self.elapsed
+        if self.previous <= 0:
+            return remaining
+        # previous * (1 - (elapsed + t) / duration) + current + 1 <= num_requests
+        free = self.num_requests - self.current - 1
+        wait = self.duration * (1 - free / self.previous) - self.elapsed
+        return max(0.0, min(wait, remaining))
+
+
+class AnonRateThrottle(SlidingWindowMixin, throttling.AnonRateThrottle):
+    pass
+
+
+class UserRateThrottle(SlidingWindowMixin, throttling.UserRateThrottle):
+    pass
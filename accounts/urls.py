@@ -1,8 +1,12 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 
 app_name = 'accounts'
 
+# Con ACCOUNTS_ASYNC_VIEWS (servidores ASGI) el hash de la contraseña no ocupa el hilo de las vistas
+account_views = async_views if settings.ACCOUNTS_ASYNC_VIEWS else views
+
 urlpatterns = [
     # URLs de la API de autenticación
     path('api/register/', views.register_api, name='api_register'),
@@ -10,7 +14,8 @@ urlpatterns = [
     path('api/logout/', views.logout_api, name='api_logout'),
     path('api/profile/', views.user_profile_api, name='api_profile'),
     path('api/check-username/', views.check_username_api, name='api_check_username'),
-    path('login/', views.login_view, name='login'),
-    path('register/', views.register_view, name='register'),
+    path('api/check-availability/', views.check_availability_api, name='api_check_availability'),
+    path('login/', account_views.login_view, name='login'),
+    path('register/', account_views.register_view, name='register'),
     path('logout/', views.logout_view, name='logout'),
 ]
\ No newline at end of file
@@ -1,32 +1,17 @@
-import requests
-import json
 from django.shortcuts import render, redirect
-from django.contrib.auth import authenticate, login, logout
-from django.contrib.auth.models import User
 from django.contrib import messages
-from django.urls import reverse
 from django.views.decorators.cache import never_cache
 from django.views.decorators.csrf import csrf_protect
-from django.conf import settings
 from .forms import UserRegistrationForm, UserLoginForm
 
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.authtoken.models import Token
-from django.contrib.auth import login, logout
-from django.contrib.auth.models import User
-from .serializers import (
-    UserRegistrationSerializer,
-    UserLoginSerializer,
-    UserSerializer
-)
+from . import availability, services
+from .serializers import UserSerializer
 
 
-# URL base de tu API (configurable desde settings)
-API_BASE_URL = "http://127.0.0.1:8000/api/"
-
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def register_api(request):
@@ -47,34 +32,22 @@ def register_api(request):
     - 201: Usuario creado exitosamente
     - 400: Error en validación de datos
     """
-    if request.method == 'POST':
-        # Creamos el serializer con los datos recibidos
-        serializer = UserRegistrationSerializer(data=request.data)
-        
-        if serializer.is_valid():
-            # Guardamos el nuevo usuario
-            user = serializer.save()
-            
-            # Creamos o obtenemos el token de autenticación para el usuario
-            token, created = Token.objects.get_or_create(user=user)
-            
-            # Preparamos la respuesta con los datos del usuario y su token
-            response_data = {
-                'success': True,
-                'message': 'Usuario registrado satisfactoriamente',
-                'user': UserSerializer(user).data,
-                'token': token.key
-            }
-            
-            return Response(response_data, status=status.HTTP_201_CREATED)
-        
-        # Si hay errores de validación, los devolvemos
+    try:
+        user, token = services.register_user(request.data)
+    except services.AccountError as e:
         return Response({
             'success': False,
             'message': 'Error en el registro',
-            'errors': serializer.errors
+            'errors': e.errors
         }, status=status.HTTP_400_BAD_REQUEST)
 
+    return Response({
+        'success': True,
+        'message': 'Usuario registrado satisfactoriamente',
+        'user': UserSerializer(user).data,
+        'token': token.key
+    }, status=status.HTTP_201_CREATED)
+
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -92,40 +65,24 @@ def login_api(request):
     - 200: Autenticación exitosa
     - 400: Error en credenciales
     """
-    if request.method == 'POST':
-        # Creamos el serializer con los datos de login
-        serializer = UserLoginSerializer(
-            data=request.data,
-            context={'request': request}
+    try:
+        user, token = services.login_user(
+            request, request.data.get('username'), request.data.get('password')
         )
-        
-        if serializer.is_valid():
-            # Obtenemos el usuario validado
-            user = serializer.validated_data['user']
-            
-            # Iniciamos sesión en Django (opcional, para mantener sesión)
-            login(request, user)
-            
-            # Creamos o obtenemos el token de autenticación
-            token, created = Token.objects.get_or_create(user=user)
-            
-            # Preparamos la respuesta exitosa
-            response_data = {
-                'success': True,
-                'message': 'Autenticación satisfactoria',
-                'user': UserSerializer(user).data,
-                'token': token.key
-            }
-            
-            return Response(response_data, status=status.HTTP_200_OK)
-        
-        # Si hay errores de autenticación
+    except services.AccountError as e:
         return Response({
             'success': False,
             'message': 'Error en la autenticación',
-            'errors': serializer.errors
+            'errors': e.errors
         }, status=status.HTTP_400_BAD_REQUEST)
 
+    return Response({
+        'success': True,
+        'message': 'Autenticación satisfactoria',
+        'user': UserSerializer(user).data,
+        'token': token.key
+    }, status=status.HTTP_200_OK)
+
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -140,25 +97,12 @@ def logout_api(request):
     - 200: Sesión cerrada exitosamente
     - 401: No autorizado (sin token válido)
     """
-    if request.method == 'POST':
-        try:
-            # Eliminamos el token del usuario
-            request.user.auth_token.delete()
-            
-            # Cerramos la sesión de Django
-            logout(request)
-            
-            return Response({
-                'success': True,
-                'message': 'Sesión cerrada exitosamente'
-            }, status=status.HTTP_200_OK)
-            
-        except Exception as e:
-            return Response({
-                'success': False,
-                'message': 'Error al cerrar sesión',
-                'error': str(e)
-            }, status=status.HTTP_400_BAD_REQUEST)
+    services.logout_user(request)
+
+    return Response({
+        'success': True,
+        'message': 'Sesión cerrada exitosamente'
+    }, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
@@ -206,16 +150,62 @@ def check_username_api(request):
             'message': 'Debe proporcionar un nombre de usuario'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # Verificamos si el username existe
-    exists = User.objects.filter(username=username).exists()
+    available = availability.username_available(username)
     
     return Response({
         'success': True,
-        'available': not exists,
-        'message': 'Nombre de usuario no disponible' if exists else 'Nombre de usuario disponible'
+        'available': available,
+        'message': 'Nombre de usuario disponible' if available else 'Nombre de usuario no disponible'
     }, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def check_availability_api(request):
+    """
+    Vista API para verificar a la vez la disponibilidad de usuario y correo.
+    
+    Endpoint: GET /api/check-availability/?username=nombreusuario&email=correo
+    
+    Parámetros de query (al menos uno):
+    - username: nombre de usuario a verificar
+    - email: correo electrónico a verificar
+    
+    Respuestas:
+    - 200: Disponibilidad de cada valor indicado
+    - 400: Sin parámetros
+    """
+    username = request.GET.get('username', '').strip()
+    email = request.GET.get('email', '').strip()
+    
+    if not username and not email:
+        return Response({
+            'success': False,
+            'message': 'Debe proporcionar un nombre de usuario o un correo electrónico'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    result = availability.check(username=username, email=email)
+    messages_by_field = {
+        'username': ('Nombre de usuario disponible', 'Nombre de usuario no disponible'),
+        'email': ('Correo electrónico disponible', 'Ya existe un usuario con este correo electrónico'),
+    }
+    response_data = {'success': True}
+    for field, available in result.items():
+        response_data[field] = {
+            'available': available,
+            'message': messages_by_field[field][0 if available else 1],
+        }
+    
+    return Response(response_data, status=status.HTTP_200_OK)
+
+
+def registration_errors(form, errors):
+    """Asocia los errores del serializer de registro a los campos del formulario"""
+    fields = {'username': 'username', 'email': 'email', 'password': 'password1'}
+    for field, field_errors in errors.items():
+        form.add_error(fields.get(field), field_errors[0] if isinstance(field_errors, list) else field_errors)
+
+
 @csrf_protect
 @never_cache
 def register_view(request):
@@ -229,7 +219,6 @@ def register_view(request):
     if request.method == 'POST':
         form = UserRegistrationForm(request.POST)
         if form.is_valid():
-            # Datos para enviar a la API
             user_data = {
                 'username': form.cleaned_data['username'],
                 'email': form.cleaned_data['email'],
@@ -240,75 +229,15 @@ def register_view(request):
             }
             
             try:
-                # Llamada a la API de registro
-                response = requests.post(
-                    f"{API_BASE_URL}register/",
-                    json=user_data,
-                    headers={
-                        'Content-Type': 'application/json'
-                    },
-                    timeout=10
+                user, _ = services.register_user(user_data)
+            except services.AccountError as e:
+                registration_errors(form, e.errors)
+            else:
+                messages.success(
+                    request, 
+                    f'¡Registro exitoso! Bienvenido {user.first_name}. Tu cuenta ha sido creada.'
                 )
-                
-                if response.status_code == 201:
-                    # Registro exitoso
-                    response_data = response.json()
-                    
-                    # Verificar si el usuario ya existe localmente
-                    if User.objects.filter(username=user_data['username']).exists():
-                        messages.success(
-                            request, 
-                            f'¡Registro exitoso! Bienvenido {user_data["first_name"]}. Ya puedes iniciar sesión.'
-                        )
-                        return redirect('accounts:login')
-                    
-                    # Crear usuario localmente en Django
-                    try:
-                        user = User.objects.create_user(
-                            username=user_data['username'],
-                            email=user_data['email'],
-                            first_name=user_data['first_name'],
-                            last_name=user_data['last_name'],
-                            password=user_data['password']
-                        )
-                        messages.success(
-                            request, 
-                            f'¡Registro exitoso! Bienvenido {user.first_name}. Tu cuenta ha sido creada.'
-                        )
-                        return redirect('accounts:login')
-                    
-                    except Exception as e:
-                        # Si falla la creación local, el usuario igual puede iniciar sesión
-                        messages.warning(
-                            request, 
-                            f'Registro completado. Por favor, inicia sesión con tus credenciales.'
-                        )
-                        return redirect('accounts:login')
-                        
-                elif response.status_code == 400:
-                    # Error en el registro - procesar errores específicos
-                    try:
-                        error_data = response.json()
-                        errors = error_data.get('errors', {})
-                        
-                        if 'username' in errors:
-                            form.add_error('username', errors['username'][0] if isinstance(errors['username'], list) else errors['username'])
-                        if 'email' in errors:
-                            form.add_error('email', errors['email'][0] if isinstance(errors['email'], list) else errors['email'])
-                        if 'password' in errors:
-                            form.add_error('password1', errors['password'][0] if isinstance(errors['password'], list) else errors['password'])
-                        
-                        # Si no hay errores específicos de campos
-                        if not errors:
-                            error_message = error_data.get('message', 'Error en el registro. Verifica tus datos.')
-                            form.add_error(None, error_message)
-                    except:
-                        form.add_error(None, 'Error en el servidor. Intenta más tarde.')
-                else:
-                    form.add_error(None, f'Error del servidor: {response.status_code}')
-                        
-            except requests.RequestException as e:
-                form.add_error(None, 'Error de conexión con el servidor. Verifica tu conexión a internet.')
+                return redirect('accounts:login')
                 
     else:
         form = UserRegistrationForm()
@@ -329,91 +258,21 @@ def login_view(request):
     if request.method == 'POST':
         form = UserLoginForm(request.POST)
         if form.is_valid():
-            username = form.cleaned_data['username']
-            password = form.cleaned_data['password']
-            
-            # Intentar autenticar localmente primero
-            user = authenticate(request, username=username, password=password)
-            
-            if user and user.is_active:
-                # Usuario autenticado localmente
-                login(request, user)
+            try:
+                user, _ = services.login_user(
+                    request, form.cleaned_data['username'], form.cleaned_data['password'],
+                    with_token=False,
+                )
+            except services.AccountError:
+                form.add_error(None, 'Credenciales inválidas. Verifica tu usuario y contraseña.')
+            else:
                 messages.success(
                     request, 
                     f'¡Bienvenido de nuevo, {user.first_name or user.username}!'
                 )
                 
-                # Opcional: sincronizar con la API
-                try:
-                    login_data = {'username': username, 'password': password}
-                    response = requests.post(
-                        f"{API_BASE_URL}login/",
-                        json=login_data,
-                        headers={'Content-Type': 'application/json'},
-                        timeout=5
-                    )
-                    
-                    if response.status_code == 200:
-                        response_data = response.json()
-                        if 'token' in response_data:
-                            request.session['api_token'] = response_data['token']
-                except:
-                    pass  # Si falla la API, continuar con login local
-                
                 next_url = request.GET.get('next', 'productos:inicio')
                 return redirect(next_url)
-            else:
-                # Si falla localmente, intentar con la API
-                login_data = {'username': username, 'password': password}
-                
-                try:
-                    response = requests.post(
-                        f"{API_BASE_URL}login/",
-                        json=login_data,
-                        headers={'Content-Type': 'application/json'},
-                        timeout=10
-                    )
-                    
-                    if response.status_code == 200:
-                        response_data = response.json()
-                        
-                        # Crear usuario localmente si no existe
-                        try:
-                            user, created = User.objects.get_or_create(
-                                username=username,
-                                defaults={
-                                    'email': response_data.get('user', {}).get('email', ''),
-                                    'first_name': response_data.get('user', {}).get('first_name', ''),
-                                    'last_name': response_data.get('user', {}).get('last_name', '')
-                                }
-                            )
-                            
-                            if created:
-                                user.set_password(password)
-                                user.save()
-                            
-                            # Autenticar al usuario
-                            user = authenticate(request, username=username, password=password)
-                            if user:
-                                login(request, user)
-                                
-                                if 'token' in response_data:
-                                    request.session['api_token'] = response_data['token']
-                                
-                                messages.success(
-                                    request, 
-                                    f'¡Bienvenido, {user.first_name or user.username}!'
-                                )
-                                
-                                next_url = request.GET.get('next', 'productos:inicio')
-                                return redirect(next_url)
-                        except Exception as e:
-                            form.add_error(None, 'Error al sincronizar usuario. Contacta al administrador.')
-                    else:
-                        form.add_error(None, 'Credenciales inválidas. Verifica tu usuario y contraseña.')
-                        
-                except requests.RequestException:
-                    form.add_error(None, 'Error de conexión. Verifica tu conexión a internet.')
                 
     else:
         form = UserLoginForm()
@@ -427,29 +286,12 @@ def logout_view(request):
     """
     username = request.user.username if request.user.is_authenticated else None
     
-    # Opcional: llamar al endpoint de logout de la API
-    if 'api_token' in request.session:
-        try:
-            requests.post(
-                f"{API_BASE_URL}logout/",
-                headers={
-                    'Authorization': f'Token {request.session["api_token"]}',
-                    'Content-Type': 'application/json'
-                },
-                timeout=5
-            )
-        except:
-            pass  # Si falla, continuar con el logout local
-        
-        # Limpiar tokens de la sesión
-        del request.session['api_token']
-    
-    # Cerrar sesión en Django
-    logout(request)
+    # La web no usa tokens de la API: los de otros clientes del usuario siguen válidos
+    services.logout_user(request, revoke_token=False)
     
     if username:
         messages.success(request, f'Has cerrado sesión exitosamente, {username}. ¡Hasta pronto!')
     else:
         messages.success(request, 'Has cerrado sesión exitosamente.')
     
-    return redirect('accounts:login')
\ No newline at end of file
+    return redirect('accounts:login')
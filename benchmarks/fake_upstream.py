@@ -0,0 +1,306 @@
+"""
+Imitación local de la API de Platzi (api.escuelajs.co/api/v1) para pruebas de carga.
+
+Responde a las rutas que usa la tienda (``products`` con offset/limit,
+``products/<id>``, alta, edición y borrado, y ``categories``) con un catálogo
+generado, añadiendo a cada respuesta una latencia configurable y, con la
+probabilidad indicada, un error 500.
+
+Las imágenes de los productos apuntan a ``/images/<id>.jpg`` de este mismo
+servidor (una imagen JPEG generada al arrancar). El proxy de imágenes de la tienda no
+descarga de direcciones locales salvo de los hosts de
+``PRODUCTOS_IMAGENES_HOSTS_PERMITIDOS``; benchmarks/run.py permite 127.0.0.1
+para que las pruebas midan la generación de miniaturas. Sin ese ajuste las
+peticiones acaban en la redirección a la imagen original.
+
+Uso independiente:
+    python -m benchmarks.fake_upstream --port 8765 --latency 80 --error-rate 0.02 --products 1000
+Y en otra terminal:
+    PLATZI_API_URL=http://127.0.0.1:8765/api/v1/ PRODUCTOS_IMAGENES_HOSTS_PERMITIDOS=127.0.0.1 \
+        python manage.py runserver
+"""
+import argparse
+import io
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+API_PREFIX = '/api/v1/'
+TIMESTAMP = '2024-01-01T00:00:00.000Z'
+WORDS = [
+    'camiseta', 'zapatillas', 'mochila', 'reloj', 'gorra', 'chaqueta', 'auriculares',
+    'lámpara', 'silla', 'mesa', 'taza', 'libreta', 'bolso', 'gafas', 'pantalón',
+]
+COLORS = ['roja', 'azul', 'negra', 'blanca', 'verde', 'gris', 'amarilla']
+
+
+class Catalog:
+    """Productos y categorías en memoria, protegidos por un candado"""
+
+    def __init__(self, products, categories, base_url, seed=0):
+        rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.categories = [
+            {
+                'id': i,
+                'name': f'Categoría {i}',
+                'slug': f'categoria-{i}',
+                'image': f'{base_url}images/categoria-{i}.jpg',
+                'creationAt': TIMESTAMP,
+                'updatedAt': TIMESTAMP,
+            }
+            for i in range(1, categories + 1)
+        ]
+        self.products = {}
+        for i in range(1, products + 1):
+            title = f'{rng.choice(WORDS).capitalize()} {rng.choice(COLORS)} {i}'
+            self.products[i] = {
+                'id': i,
+                'title': title,
+                'slug': f'producto-{i}',
+                'price': rng.randint(5, 500),
+                'description': f'{title}: descripción de prueba del producto número {i}.',
+                'category': self.categories[i % len(self.categories)],
+                'images': [f'{base_url}images/{i}.jpg'],
+                'creationAt': TIMESTAMP,
+                'updatedAt': TIMESTAMP,
+            }
+        self.next_id = products + 1
+
+    def page(self, offset, limit):
+        with self.lock:
+            ids = sorted(self.products)
+            return [self.products[pk] for pk in ids[offset:offset + limit]]
+
+    def get(self, product_id):
+        with self.lock:
+            return self.products.get(product_id)
+
+    def save(self, data, product_id=None):
+        with self.lock:
+            if product_id is None:
+                product_id = self.next_id
+                self.next_id += 1
+                product = {'id': product_id, 'slug': f'producto-{product_id}',
+                           'creationAt': TIMESTAMP, 'images': []}
+            else:
+                product = self.products.get(product_id)
+                if product is None:
+                    return None
+                product = dict(product)
+            for field in ('title', 'price', 'description', 'images'):
+                if field in data:
+                    product[field] = data[field]
+            category_id = data.get('categoryId')
+            if category_id is not None:
+                product['category'] = self.categories[(int(category_id) - 1) % len(self.categories)]
+            product.setdefault('category', self.categories[0])
+            product['updatedAt'] = TIMESTAMP
+            self.products[product_id] = product
+            return product
+
+    def delete(self, product_id):
+        with self.lock:
+            return self.products.pop(product_id, None) is not None
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Conexiones keep-alive, como la API real
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def upstream(self):
+        return self.server.upstream
+
+    def send_json(self, status, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return {}
+
+    def route(self):
+        """Devuelve (ruta relativa a la API, query) o None si no es de la API"""
+        parsed = urlparse(self.path)
+        if not parsed.path.startswith(API_PREFIX):
+            return None
+        return parsed.path[len(API_PREFIX):].strip('/'), parse_qs(parsed.query)
+
+    def simulate(self):
+        """Aplica la latencia configurada; devuelve True si hay que responder con error"""
+        self.upstream.wait()
+        if self.upstream.should_fail():
+            self.send_json(500, {'message': 'Error simulado', 'statusCode': 500})
+            return True
+        return False
+
+    def product_id(self, path):
+        try:
+            return int(path.split('/', 1)[1])
+        except (IndexError, ValueError):
+            return None
+
+    def not_found(self):
+        # La API real responde 400 cuando el ID no existe
+        self.send_json(400, {'message': 'Producto no encontrado', 'statusCode': 400})
+
+    def do_GET(self):
+        if urlparse(self.path).path.startswith('/images/'):
+            body = self.upstream.image
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/jpeg')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        route = self.route()
+        if route is None:
+            return self.send_json(404, {'message': 'Not found'})
+        path, query = route
+        if self.simulate():
+            return
+
+        catalog = self.upstream.catalog
+        if path == 'categories':
+            return self.send_json(200, catalog.categories)
+        if path == 'products':
+            offset = int(query.get('offset', ['0'])[0])
+            limit = int(query.get('limit', ['10'])[0])
+            return self.send_json(200, catalog.page(offset, limit))
+        if path.startswith('products/'):
+            product = catalog.get(self.product_id(path))
+            return self.send_json(200, product) if product else self.not_found()
+        self.send_json(404, {'message': 'Not found'})
+
+    def do_POST(self):
+        route = self.route()
+        data = self.read_json()
+        if route is None or route[0] != 'products':
+            return self.send_json(404, {'message': 'Not found'})
+        if self.simulate():
+            return
+        self.send_json(201, self.upstream.catalog.save(data))
+
+    def do_PUT(self):
+        route = self.route()
+        data = self.read_json()
+        if route is None or not route[0].startswith('products/'):
+            return self.send_json(404, {'message': 'Not found'})
+        if self.simulate():
+            return
+        product = self.upstream.catalog.save(data, self.product_id(route[0]))
+        return self.send_json(200, product) if product else self.not_found()
+
+    def do_DELETE(self):
+        route = self.route()
+        if route is None or not route[0].startswith('products/'):
+            return self.send_json(404, {'message': 'Not found'})
+        if self.simulate():
+            return
+        if self.upstream.catalog.delete(self.product_id(route[0])):
+            return self.send_json(200, True)
+        self.not_found()
+
+
+def make_image():
+    """JPEG de 800x800 para las imágenes de los productos"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return b''
+    output = io.BytesIO()
+    Image.new('RGB', (800, 800), (200, 120, 60)).save(output, 'JPEG', quality=80)
+    return output.getvalue()
+
+
+class FakeUpstream:
+    """Servidor en un hilo en segundo plano: ``start()`` devuelve la URL base de la API"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=50, jitter=10, error_rate=0.0,
+                 products=200, categories=5, seed=0):
+        self.latency = latency / 1000
+        self.jitter = jitter / 1000
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.server.upstream = self
+        host, port = self.server.server_address[:2]
+        self.url = f'http://{host}:{port}{API_PREFIX}'
+        self.catalog = Catalog(products, categories, f'http://{host}:{port}/', seed)
+        self.image = make_image()
+        self.thread = None
+
+    def wait(self):
+        with self.random_lock:
+            delay = self.random.gauss(self.latency, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def should_fail(self):
+        with self.random_lock:
+            return self.random.random() < self.error_rate
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self.url
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def add_arguments(parser):
+    parser.add_argument('--latency', type=float, default=50,
+                        help='Latencia media de la API falsa en milisegundos')
+    parser.add_argument('--jitter', type=float, default=10,
+                        help='Desviación típica de la latencia en milisegundos')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fracción de peticiones que responden 500 (0-1)')
+    parser.add_argument('--products', type=int, default=200,
+                        help='Productos en el catálogo')
+    parser.add_argument('--categories', type=int, default=5,
+                        help='Categorías en el catálogo')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Semilla para el catálogo, la latencia y los errores')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API de Platzi falsa para pruebas de carga')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    upstream = FakeUpstream(
+        args.host, args.port, args.latency, args.jitter, args.error_rate,
+        args.products, args.categories, args.seed,
+    )
+    print(f'API falsa en {upstream.url}', flush=True)
+    try:
+        upstream.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        upstream.server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,442 @@
+"""
+Pruebas de carga de la tienda contra una API de Platzi falsa.
+
+1. Arranca benchmarks/fake_upstream.py con la latencia, la tasa de errores y
+   el tamaño de catálogo indicados.
+2. Prepara una base de datos SQLite temporal (DB_PROFILE=local_sqlite) y
+   arranca la tienda apuntando a la API falsa (runserver, gunicorn o uvicorn).
+3. Lanza --requests peticiones a cada ruta de productos/urls.py y
+   accounts/urls.py, con --concurrency peticiones a la vez.
+4. Escribe en JSON, por ruta, el rendimiento (peticiones/s), las latencias
+   p50/p95/p99 y los códigos de respuesta, para comparar ejecuciones.
+
+Las rutas que necesitan un estado previo (cerrar sesión, /api/logout/) lo
+preparan antes de cada petición, fuera de la medición. Antes de empezar se
+crean los usuarios de prueba y los cambios encolados que consulta
+``estado_mutacion``. La API falsa escucha en 127.0.0.1, así que el proxy de
+imágenes la tiene permitida (``PRODUCTOS_IMAGENES_HOSTS_PERMITIDOS``) para
+que ``imagen`` mida las miniaturas y no solo la redirección.
+
+Uso:
+    python -m benchmarks.run --latency 80 --error-rate 0.01 --products 1000 \\
+        --concurrency 8 --requests 200 --output resultados.json
+    python -m benchmarks.run --routes inicio,buscar,api_profile --server uvicorn --workers 2
+    python -m benchmarks.run --env PRODUCTOS_ESCRITURA_DIFERIDA=1 --sync-catalog
+"""
+import argparse
+import itertools
+import json
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from .fake_upstream import FakeUpstream, add_arguments
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PASSWORD = 'benchmark-123'
+START_TIMEOUT = 60  # Segundos de espera a que arranque la tienda
+MUTATIONS = 50  # Cambios encolados que consulta la ruta estado_mutacion
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class Context:
+    """Datos compartidos por las rutas: URL de la tienda, catálogo y usuarios de prueba"""
+
+    def __init__(self, base_url, products, per_page=12):
+        self.base_url = base_url
+        self.products = products
+        self.pages = max(1, -(-products // per_page))
+        self.run_id = secrets.token_hex(3)
+        self.image_url = None
+        self.username = f'bench-{self.run_id}'
+        # /api/logout/ borra el token del usuario, así que usa otro distinto
+        self.logout_username = f'bench-{self.run_id}-salida'
+        self.token = None
+        self.mutation_ids = []
+        self.counter = itertools.count()
+
+    def url(self, path):
+        return self.base_url + path
+
+    def product_id(self, i):
+        return i % self.products + 1
+
+    def unique(self, prefix):
+        return f'{prefix}-{self.run_id}-{next(self.counter)}'
+
+
+def new_session():
+    """Sesión HTTP con un token CSRF propio (cookie y cabecera con el mismo valor)"""
+    session = requests.Session()
+    csrf = secrets.token_hex(16)
+    session.cookies.set('csrftoken', csrf)
+    session.headers['X-CSRFToken'] = csrf
+    return session
+
+
+def reset_session(session):
+    csrf = session.headers['X-CSRFToken']
+    session.cookies.clear()
+    session.cookies.set('csrftoken', csrf)
+
+
+def product_form(ctx, i):
+    return {
+        'title': f'Producto de prueba {i}',
+        'price': '19.99',
+        'description': 'Producto creado durante la prueba de carga.',
+        'category': '1',
+        'image': 'https://placehold.co/600x400.jpg',
+    }
+
+
+def build_routes(ctx):
+    """
+    Rutas de productos/urls.py y accounts/urls.py. Cada una es
+    (preparar, enviar): ``preparar(session, i)`` se ejecuta antes de la
+    petición y no se mide; ``enviar(session, i)`` hace la petición medida.
+    """
+    def api_token(session):
+        return {'Authorization': f'Token {ctx.token}'}
+
+    def login_api(session, i):
+        reset_session(session)
+        response = session.post(
+            ctx.url('/api/login/'), json={'username': ctx.logout_username, 'password': PASSWORD},
+        )
+        session.headers['Authorization'] = f'Token {response.json()["token"]}'
+
+    def login_web(session, i):
+        reset_session(session)
+        session.post(ctx.url('/login/'), data={'username': ctx.username, 'password': PASSWORD})
+
+    def ensure_login_web(session, i):
+        if 'sessionid' not in session.cookies:
+            login_web(session, i)
+
+    def logout_api(session, i):
+        response = session.post(ctx.url('/api/logout/'))
+        session.headers.pop('Authorization', None)
+        return response
+
+    def register_data(i):
+        name = ctx.unique('reg')
+        return {'username': name, 'email': f'{name}@example.com', 'first_name': 'Bench',
+                'last_name': 'Mark', 'password1': PASSWORD, 'password2': PASSWORD}
+
+    def api_register_data(i):
+        name = ctx.unique('api')
+        return {'username': name, 'email': f'{name}@example.com',
+                'password': PASSWORD, 'password2': PASSWORD}
+
+    return {
+        # productos/urls.py
+        'inicio': (None, lambda s, i: s.get(ctx.url('/'), params={'page': i % ctx.pages + 1})),
+        'buscar': (None, lambda s, i: s.get(ctx.url('/buscar/'), params={'q': 'camiseta'})),
+        'buscar_ids': (None, lambda s, i: s.post(
+            ctx.url('/buscar/'), data={'product_id': f'{ctx.product_id(i)}-{ctx.product_id(i) + 4}'},
+        )),
+        'autocompletar': (None, lambda s, i: s.get(ctx.url('/buscar/autocompletar/'), params={'q': 'cam'})),
+        'crear_form': (None, lambda s, i: s.get(ctx.url('/crear/'))),
+        'crear': (None, lambda s, i: s.post(ctx.url('/crear/'), data=product_form(ctx, i))),
+        'editar_form': (None, lambda s, i: s.get(ctx.url(f'/editar/{ctx.product_id(i)}/'))),
+        'editar': (None, lambda s, i: s.post(
+            ctx.url(f'/editar/{ctx.product_id(i)}/'), data=product_form(ctx, i),
+        )),
+        'eliminar': (None, lambda s, i: s.post(
+            ctx.url(f'/eliminar/{ctx.product_id(i)}/'), allow_redirects=False,
+        )),
+        'estado_mutacion': (ensure_login_web, lambda s, i: s.get(
+            ctx.url(f'/mutaciones/{ctx.mutation_ids[i % len(ctx.mutation_ids)]}/'),
+        )),
+        'imagen': (None, lambda s, i: s.get(ctx.image_url, allow_redirects=False)),
+        # accounts/urls.py
+        'api_register': (None, lambda s, i: s.post(ctx.url('/api/register/'), json=api_register_data(i))),
+        'api_login': (lambda s, i: reset_session(s), lambda s, i: s.post(
+            ctx.url('/api/login/'), json={'username': ctx.username, 'password': PASSWORD},
+        )),
+        'api_logout': (login_api, logout_api),
+        'api_profile': (None, lambda s, i: s.get(ctx.url('/api/profile/'), headers=api_token(s))),
+        'api_check_username': (None, lambda s, i: s.get(
+            ctx.url('/api/check-username/'), params={'username': ctx.unique('libre')},
+        )),
+        'api_check_availability': (None, lambda s, i: s.get(
+            ctx.url('/api/check-availability/'),
+            params={'username': ctx.username, 'email': f'{ctx.unique("libre")}@example.com'},
+        )),
+        'login_form': (None, lambda s, i: s.get(ctx.url('/login/'))),
+        'login': (lambda s, i: reset_session(s), lambda s, i: s.post(
+            ctx.url('/login/'), data={'username': ctx.username, 'password': PASSWORD}, allow_redirects=False,
+        )),
+        'register_form': (None, lambda s, i: s.get(ctx.url('/register/'))),
+        'register': (lambda s, i: reset_session(s), lambda s, i: s.post(
+            ctx.url('/register/'), data=register_data(i), allow_redirects=False,
+        )),
+        'logout': (login_web, lambda s, i: s.get(ctx.url('/logout/'), allow_redirects=False)),
+    }
+
+
+def run_route(prepare, send, requests_count, concurrency):
+    """Lanza las peticiones de una ruta y devuelve sus estadísticas"""
+    indexes = iter(range(requests_count))
+    indexes_lock = threading.Lock()
+    latencies = []
+    statuses = {}
+    failures = 0
+    stats_lock = threading.Lock()
+
+    def worker():
+        nonlocal failures
+        session = new_session()
+        while True:
+            with indexes_lock:
+                i = next(indexes, None)
+            if i is None:
+                return
+            try:
+                if prepare is not None:
+                    prepare(session, i)
+                start = time.perf_counter()
+                response = send(session, i)
+                elapsed = time.perf_counter() - start
+            except (requests.RequestException, ValueError, KeyError):
+                with stats_lock:
+                    failures += 1
+                continue
+            with stats_lock:
+                latencies.append(elapsed)
+                statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    wall = time.perf_counter() - start
+
+    result = {
+        'requests': requests_count,
+        'concurrency': concurrency,
+        'seconds': round(wall, 3),
+        'throughput_rps': round(len(latencies) / wall, 2) if wall else 0,
+        'status': dict(sorted(statuses.items())),
+        'connection_errors': failures,
+        'server_errors': sum(count for status, count in statuses.items() if status.startswith('5')),
+    }
+    if latencies:
+        result['latency_ms'] = {
+            'p50': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99': round(percentile(latencies, 0.99) * 1000, 2),
+            'mean': round(sum(latencies) / len(latencies) * 1000, 2),
+            'max': round(max(latencies) * 1000, 2),
+        }
+    return result
+
+
+def server_command(args, port):
+    address = f'127.0.0.1:{port}'
+    if args.server == 'gunicorn':
+        return ['gunicorn', 'platzi_project.wsgi', '-b', address, '-w', str(args.workers),
+                '--threads', str(args.concurrency)]
+    if args.server == 'uvicorn':
+        return ['uvicorn', 'platzi_project.asgi:application', '--host', '127.0.0.1',
+                '--port', str(port), '--workers', str(args.workers)]
+    return [sys.executable, 'manage.py', 'runserver', address, '--noreload']
+
+
+def manage(env, *command):
+    subprocess.run([sys.executable, 'manage.py', *command], cwd=BASE_DIR, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+
+
+def wait_until_ready(base_url, process):
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('La tienda terminó al arrancar (ver el log del servidor)')
+        try:
+            requests.get(base_url + '/login/', timeout=2)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f'La tienda no respondió en {START_TIMEOUT} segundos')
+
+
+def create_mutations(env, username, count=MUTATIONS):
+    """Crea cambios ya completados del usuario de prueba y devuelve sus IDs"""
+    code = (
+        'from django.contrib.auth import get_user_model\n'
+        'from productos.models import Mutation\n'
+        f'user = get_user_model().objects.get(username={username!r})\n'
+        'mutations = Mutation.objects.bulk_create(\n'
+        '    Mutation(action=Mutation.UPDATE, product_id=i + 1, status=Mutation.DONE, user=user)\n'
+        f'    for i in range({count}))\n'
+        'print(",".join(str(m.pk) for m in mutations))\n'
+    )
+    output = subprocess.run([sys.executable, 'manage.py', 'shell', '-c', code], cwd=BASE_DIR, env=env,
+                            check=True, capture_output=True, text=True).stdout
+    return [int(pk) for pk in output.strip().splitlines()[-1].split(',')]
+
+
+def setup(ctx, routes, env):
+    """Crea los usuarios y cambios de prueba y localiza una URL de imagen del proxy"""
+    session = new_session()
+    for username in (ctx.username, ctx.logout_username):
+        response = session.post(ctx.url('/api/register/'), json={
+            'username': username, 'email': f'{username}@example.com',
+            'password': PASSWORD, 'password2': PASSWORD,
+        })
+        response.raise_for_status()
+    ctx.token = requests.post(ctx.url('/api/login/'), json={
+        'username': ctx.username, 'password': PASSWORD,
+    }).json()['token']
+
+    if 'estado_mutacion' in routes:
+        ctx.mutation_ids = create_mutations(env, ctx.username)
+
+    if 'imagen' in routes:
+        html = session.get(ctx.url('/')).text
+        marker = html.find('/imagenes/')
+        if marker != -1:
+            end = min(html.find(char, marker) for char in '"\' ' if html.find(char, marker) != -1)
+            ctx.image_url = ctx.url(html[marker:end].split(' ')[0])
+        else:
+            routes.remove('imagen')
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=BASE_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pruebas de carga de la tienda con una API falsa')
+    add_arguments(parser)
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='Peticiones simultáneas por ruta')
+    parser.add_argument('--requests', type=int, default=100,
+                        help='Peticiones por ruta')
+    parser.add_argument('--routes', default=None,
+                        help='Rutas separadas por comas (por defecto todas)')
+    parser.add_argument('--server', choices=['runserver', 'gunicorn', 'uvicorn'], default='runserver')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='Procesos del servidor (gunicorn/uvicorn)')
+    parser.add_argument('--sync-catalog', action='store_true',
+                        help='Copiar el catálogo al espejo local antes de empezar')
+    parser.add_argument('--env', action='append', default=[], metavar='CLAVE=VALOR',
+                        help='Variable de entorno extra para la tienda (se puede repetir)')
+    parser.add_argument('--output', default=None,
+                        help='Archivo JSON de resultados (por defecto la salida estándar)')
+    args = parser.parse_args()
+
+    upstream = FakeUpstream(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        products=args.products, categories=args.categories, seed=args.seed,
+    )
+    upstream_url = upstream.start()
+
+    workdir = tempfile.mkdtemp(prefix='platzi-bench-')
+    env = dict(os.environ)
+    env.pop('DJANGO_SETTINGS_MODULE', None)
+    env.update({
+        'DJANGO_SETTINGS_MODULE': 'platzi_project.settings',
+        'DB_PROFILE': 'local_sqlite',
+        'DB_NAME': os.path.join(workdir, 'db.sqlite3'),
+        'PLATZI_API_URL': upstream_url,
+        # Sin límites de peticiones: se mide la aplicación, no el throttling
+        'API_THROTTLE_ANON': '1000000/hour',
+        'API_THROTTLE_USER': '1000000/hour',
+        # La API falsa (y sus imágenes) está en 127.0.0.1
+        'PRODUCTOS_IMAGENES_HOSTS_PERMITIDOS': '127.0.0.1',
+    })
+    for item in args.env:
+        key, _, value = item.partition('=')
+        env[key] = value
+
+    manage(env, 'migrate', '--noinput')
+    if args.sync_catalog:
+        manage(env, 'sync_catalog')
+
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    log_path = os.path.join(workdir, 'server.log')
+    with open(log_path, 'wb') as log:
+        process = subprocess.Popen(server_command(args, port), cwd=BASE_DIR, env=env,
+                                   stdout=log, stderr=subprocess.STDOUT)
+    try:
+        wait_until_ready(base_url, process)
+
+        ctx = Context(base_url, args.products)
+        routes = build_routes(ctx)
+        selected = [name.strip() for name in args.routes.split(',')] if args.routes else list(routes)
+        unknown = [name for name in selected if name not in routes]
+        if unknown:
+            parser.error(f'Rutas desconocidas: {", ".join(unknown)}')
+        setup(ctx, selected, env)
+
+        results = {}
+        for name in selected:
+            prepare, send = routes[name]
+            print(f'{name}...', file=sys.stderr, flush=True)
+            results[name] = run_route(prepare, send, max(args.requests, 1), max(args.concurrency, 1))
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        upstream.stop()
+
+    report = {
+        'config': {
+            'commit': git_commit(),
+            'server': args.server,
+            'workers': args.workers,
+            'concurrency': args.concurrency,
+            'requests': args.requests,
+            'upstream': {
+                'latency_ms': args.latency,
+                'jitter_ms': args.jitter,
+                'error_rate': args.error_rate,
+                'products': args.products,
+                'categories': args.categories,
+                'seed': args.seed,
+            },
+            'sync_catalog': args.sync_catalog,
+            'env': args.env,
+            'server_log': log_path,
+        },
+        'routes': results,
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output + '\n', encoding='utf-8')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -13,4 +13,10 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'platzi_project.settings')
 
+# Bajo un servidor ASGI (uvicorn, daphne...) las vistas de productos y cuentas son asíncronas
+os.environ.setdefault('PRODUCTOS_ASYNC_VIEWS', '1')
+os.environ.setdefault('ACCOUNTS_ASYNC_VIEWS', '1')
+# Las conexiones persistentes por hilo no se cierran bien bajo ASGI: usar DB_POOL=1
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
+
 application = get_asgi_application()
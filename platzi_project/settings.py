@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -27,7 +30,25 @@ DEBUG = True
 
 ALLOWED_HOSTS = ['*']
 
-API_BASE_URL = "http://127.0.0.1:8000/accounts/api/"
+# Cliente HTTP hacia la API de Platzi (ver productos/api.py)
+PLATZI_API_URL = os.environ.get('PLATZI_API_URL', 'https://api.escuelajs.co/api/v1/')
+PLATZI_API_POOL_CONNECTIONS = int(os.environ.get('PLATZI_API_POOL_CONNECTIONS', 10))  # Hosts distintos en el pool
+PLATZI_API_POOL_MAXSIZE = int(os.environ.get('PLATZI_API_POOL_MAXSIZE', 20))  # Conexiones keep-alive por host
+PLATZI_API_TIMEOUT = (3.05, 10)  # (conexión, lectura) en segundos
+PLATZI_API_MAX_CONCURRENCY = 8  # Peticiones simultáneas como máximo en consultas por lote
+
+# Protección ante degradación de la API (ver productos/circuit.py)
+PLATZI_API_CIRCUITO_FALLOS = 5  # Fallos seguidos que abren el circuito de un endpoint
+PLATZI_API_CIRCUITO_ESPERA = 30  # Segundos con el circuito abierto antes de probar de nuevo
+PLATZI_API_PRESUPUESTO = 8  # Segundos máximos de espera a la API por petición
+PLATZI_API_HEDGE = os.environ.get('PLATZI_API_HEDGE', '0') == '1'  # Duplicar GETs lentos (más que el p95)
+PLATZI_API_HEDGE_MIN_MUESTRAS = 20  # Latencias necesarias antes de calcular el p95
+
+# Vistas asíncronas de productos (ver productos/async_views.py). asgi.py las activa por defecto.
+PRODUCTOS_ASYNC_VIEWS = os.environ.get('PRODUCTOS_ASYNC_VIEWS', '0') == '1'
+
+# Vistas asíncronas de registro e inicio de sesión (ver accounts/async_views.py)
+ACCOUNTS_ASYNC_VIEWS = os.environ.get('ACCOUNTS_ASYNC_VIEWS', '0') == '1'
 
 
 # Application definition
@@ -47,27 +68,43 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'productos.circuit.LatencyBudgetMiddleware',
 ]
 
 ROOT_URLCONF = 'platzi_project.urls'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
+        # Las apps guardan sus plantillas en 'Templates' (con mayúscula), que
+        # app_directories no encuentra en sistemas de archivos que distinguen mayúsculas
+        'DIRS': [
+            BASE_DIR / 'templates',
+            BASE_DIR / 'productos' / 'Templates',
+            BASE_DIR / 'accounts' / 'Templates',
+        ],
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # En producción las plantillas se compilan una vez por proceso
+            'loaders': TEMPLATE_LOADERS if DEBUG else [
+                ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+            ],
         },
     },
 ]
@@ -80,17 +117,199 @@ WSGI_APPLICATION = 'platzi_project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Perfil de base de datos (DB_PROFILE):
+# - rds: PostgreSQL de producción en RDS (por defecto).
+# - local_postgres: PostgreSQL local, para pruebas de carga sin salir de la máquina.
+# - local_sqlite: archivo db.sqlite3 del proyecto, sin servicios externos.
+# Los datos de conexión se pueden cambiar con DB_NAME, DB_USER, DB_PASSWORD, DB_HOST y DB_PORT.
+DB_PROFILE = os.environ.get('DB_PROFILE', 'rds')
+
+# Conexiones a PostgreSQL: cada hilo reutiliza la suya hasta DB_CONN_MAX_AGE
+# segundos y se comprueba antes de usarla en una nueva petición. Con DB_POOL=1
+# se usa en su lugar el pool de psycopg 3 (requiere psycopg[pool]), que es lo
+# recomendado bajo ASGI (asgi.py desactiva las conexiones persistentes).
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 600))  # Segundos
+DB_POOL = os.environ.get('DB_POOL', '0') == '1'
+DB_POOL_MIN = int(os.environ.get('DB_POOL_MIN', 2))  # Conexiones abiertas siempre por proceso
+DB_POOL_MAX = int(os.environ.get('DB_POOL_MAX', 10))  # Conexiones como máximo por proceso
+DB_POOL_MAX_LIFETIME = int(os.environ.get('DB_POOL_MAX_LIFETIME', 1800))  # Segundos antes de renovar una conexión
+DB_POOL_TIMEOUT = 10  # Segundos de espera por una conexión libre del pool
+
+
+def postgres_database(name, user, password, host, port):
+    database = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('DB_NAME', name),
+        'USER': os.environ.get('DB_USER', user),
+        'PASSWORD': os.environ.get('DB_PASSWORD', password),
+        'HOST': os.environ.get('DB_HOST', host),
+        'PORT': os.environ.get('DB_PORT', port),
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'connect_timeout': 5,
+        },
+    }
+    if DB_POOL:
+        try:
+            from psycopg_pool import ConnectionPool
+        except ImportError:
+            raise ImproperlyConfigured('DB_POOL=1 requiere instalar psycopg[pool]')
+
+        # El pool gestiona la vida de las conexiones; Django exige CONN_MAX_AGE = 0
+        database['CONN_MAX_AGE'] = 0
+        database['OPTIONS']['pool'] = {
+            'min_size': DB_POOL_MIN,
+            'max_size': DB_POOL_MAX,
+            'max_lifetime': DB_POOL_MAX_LIFETIME,
+            'timeout': DB_POOL_TIMEOUT,
+            'check': ConnectionPool.check_connection,  # Comprueba cada conexión al sacarla del pool
+        }
+    return database
+
+
+if DB_PROFILE == 'rds':
+    default_database = postgres_database(
+        'postgres', 'masteruser', 'masterpassword',
+        'db-platzi-store.cxmy46480its.us-east-2.rds.amazonaws.com', '5432',
+    )
+elif DB_PROFILE == 'local_postgres':
+    default_database = postgres_database('platzi_store', 'postgres', 'postgres', 'localhost', '5432')
+elif DB_PROFILE == 'local_sqlite':
+    default_database = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        # Varios hilos y workers escriben a la vez (pruebas de carga): WAL deja leer
+        # mientras otro escribe y las transacciones toman el bloqueo de escritura
+        # al empezar, así que esperan hasta 'timeout' segundos en vez de fallar
+        # con "database is locked" al pasar de lectura a escritura.
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+            'init_command': 'PRAGMA journal_mode=WAL',
+        },
+    }
+else:
+    raise ImproperlyConfigured(f'DB_PROFILE desconocido: {DB_PROFILE}')
+
 DATABASES = {
+    'default': default_database,
+}
+
+
+# Caché
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'postgres',
-        'USER': 'masteruser',
-        'PASSWORD': 'masterpassword',
-        'HOST': 'db-platzi-store.cxmy46480its.us-east-2.rds.amazonaws.com',
-        'PORT': '5432'
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'platzi-store',
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,  # Límite duro de entradas por proceso
+            'CULL_FREQUENCY': 3,  # Al llenarse se elimina 1/3 de las entradas
+        },
     }
 }
 
+# Límites de peticiones de la API compartidos entre workers (ver accounts/throttling.py).
+# Con REDIS_URL se guardan en Redis (comunes a todos los nodos); sin él, en un
+# SQLite local común a los workers de la máquina (desarrollo).
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES['throttle'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    }
+API_THROTTLE_CACHE = 'throttle' if REDIS_URL else None
+API_THROTTLE_SQLITE = BASE_DIR / 'cache' / 'throttle.sqlite3'
+
+# Almacenamiento de las sesiones: 'db', 'cached_db' o 'signed_cookies'.
+# - cached_db: se leen de Redis y solo se consulta la base de datos si no están.
+#   Necesita REDIS_URL: con la caché en memoria de cada worker, un cierre de
+#   sesión en uno no se vería en los demás.
+# - signed_cookies: sin consultas; los datos van firmados (no cifrados) en la cookie.
+# La sesión solo se guarda cuando cambia (SESSION_SAVE_EVERY_REQUEST = False).
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_STRATEGY = os.environ.get('SESSION_STRATEGY', 'cached_db' if REDIS_URL else 'db')
+if SESSION_STRATEGY not in SESSION_ENGINES:
+    raise ImproperlyConfigured(f'SESSION_STRATEGY desconocida: {SESSION_STRATEGY}')
+if SESSION_STRATEGY == 'cached_db' and not REDIS_URL:
+    raise ImproperlyConfigured('SESSION_STRATEGY=cached_db requiere REDIS_URL')
+SESSION_ENGINE = SESSION_ENGINES[SESSION_STRATEGY]
+SESSION_SAVE_EVERY_REQUEST = False
+if REDIS_URL:
+    CACHES['sessions'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    }
+    SESSION_CACHE_ALIAS = 'sessions'
+
+# Coalescencia de cargas concurrentes de la misma entrada (ver productos/singleflight.py).
+# Entre workers solo tiene efecto con una caché compartida (Redis, Memcached...).
+PRODUCTOS_SINGLEFLIGHT_DISTRIBUIDO = os.environ.get('PRODUCTOS_SINGLEFLIGHT_DISTRIBUIDO', '0') == '1'
+PRODUCTOS_SINGLEFLIGHT_ESPERA = 5  # Segundos que se espera a la carga de otro worker
+
+# Listado de productos de la página de inicio (ver productos/cache.py)
+PRODUCTOS_CACHE_TTL = 60  # Segundos que el listado se considera fresco
+PRODUCTOS_CACHE_STALE_TTL = 300  # Segundos extra en los que se sirve mientras se refresca
+
+PRODUCTOS_POR_PAGINA = 12  # Productos por página en la página de inicio
+PRODUCTOS_ESPEJO_MAX_EDAD = int(os.environ.get('PRODUCTOS_ESPEJO_MAX_EDAD', 86400))  # Segundos que se sirve un producto del espejo sin confirmarlo con la API
+PRODUCTOS_FRAGMENTOS_TTL = 600  # Segundos que se cachea el HTML de cada tarjeta de producto
+
+# Proxy de imágenes de productos con miniaturas (ver productos/images.py)
+PRODUCTOS_IMAGENES_DIR = BASE_DIR / 'cache' / 'imagenes'
+PRODUCTOS_IMAGENES_MAX_DISCO = 512 * 1024 * 1024  # Bytes que puede ocupar la caché en disco
+PRODUCTOS_IMAGENES_MAX_ORIGEN = 15 * 1024 * 1024  # Tamaño máximo de una imagen original
+PRODUCTOS_IMAGENES_MAX_AGE = 30 * 24 * 3600  # Segundos de caché en el navegador y la CDN
+PRODUCTOS_IMAGENES_TIMEOUT = (3.05, 15)  # (conexión, lectura) en segundos al descargar una original
+# Hosts internos de los que el proxy sí puede descargar (separados por comas). Solo
+# para pruebas de carga contra la API falsa (benchmarks/run.py); vacío en producción.
+PRODUCTOS_IMAGENES_HOSTS_PERMITIDOS = [
+    host.strip() for host in os.environ.get('PRODUCTOS_IMAGENES_HOSTS_PERMITIDOS', '').split(',') if host.strip()
+]
+PRODUCTOS_BUSQUEDA_MAX_IDS = 50  # IDs como máximo en una búsqueda por lote
+
+# Índice de autocompletado en memoria (ver productos/autocomplete.py): cada
+# cuántos segundos como máximo se comprueba si el catálogo cambió en otro proceso.
+PRODUCTOS_AUTOCOMPLETAR_COMPROBACION = 5
+
+# Categorías de los formularios de productos (ver productos/categories.py)
+PRODUCTOS_CATEGORIAS_TTL = int(os.environ.get('PRODUCTOS_CATEGORIAS_TTL', 3600))
+PRODUCTOS_CATEGORIAS_STALE_TTL = 86400
+
+# Escritura diferida: crear/editar/eliminar se encolan en la tabla Mutation y
+# los envía a la API `python manage.py procesar_mutaciones` (ver productos/mutations.py)
+PRODUCTOS_ESCRITURA_DIFERIDA = os.environ.get('PRODUCTOS_ESCRITURA_DIFERIDA', '0') == '1'
+PRODUCTOS_MUTACIONES_LOTE = 20  # Cambios enviados a la API por lote
+PRODUCTOS_MUTACIONES_REINTENTOS = 5  # Intentos antes de marcar un cambio como fallido
+PRODUCTOS_MUTACIONES_BLOQUEO = 300  # Segundos tras los que se reintenta un cambio que se quedó enviando
+
+
+# Las contraseñas se comprueban en un pool de hilos acotado (ver accounts/hashing.py)
+AUTHENTICATION_BACKENDS = ['accounts.backends.PooledModelBackend']
+ACCOUNTS_HASH_WORKERS = int(os.environ.get('ACCOUNTS_HASH_WORKERS', os.cpu_count() or 2))  # Hashes calculados a la vez
+
+# Caché de token → usuario de la API (ver accounts/authentication.py). Solo se
+# activa con una caché compartida (REDIS_URL): con la caché en memoria de cada
+# worker, un token revocado en uno seguiría valiendo en los demás.
+if REDIS_URL:
+    CACHES['tokens'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    }
+ACCOUNTS_TOKEN_CACHE = 'tokens' if REDIS_URL else None
+ACCOUNTS_TOKEN_CACHE_TTL = 300  # Segundos que se reutiliza un usuario sin consultar la base de datos
+ACCOUNTS_TOKEN_CACHE_LOCAL = 10000  # Tokens como máximo en el LRU de cada proceso
+
+# Usuarios y correos ocupados recordados por cada proceso (ver accounts/availability.py)
+ACCOUNTS_OCUPADOS_MAX = 50000
+ACCOUNTS_OCUPADOS_TTL = 3600  # Segundos
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -127,6 +346,18 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'  # Destino de `python manage.py collectstatic`
+
+# collectstatic genera copias con el hash del contenido en el nombre y sus
+# versiones .gz y .br; WhiteNoise las sirve con caché inmutable de un año
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -136,7 +367,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     # Configuración de autenticación por defecto
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'accounts.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     
@@ -164,12 +395,12 @@ REST_FRAMEWORK = {
     
     # Configuración de throttling (límite de peticiones)
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'accounts.throttling.AnonRateThrottle',
+        'accounts.throttling.UserRateThrottle'
     ],
     'DEFAULT_THROTTLE_RATES': {
-        'anon': '100/hour',  # Para usuarios anónimos
-        'user': '1000/hour'   # Para usuarios autenticados
+        'anon': os.environ.get('API_THROTTLE_ANON', '100/hour'),  # Para usuarios anónimos
+        'user': os.environ.get('API_THROTTLE_USER', '1000/hour'),  # Para usuarios autenticados
     }
 }
 
@@ -1,3 +1,23 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Category, Mutation, Product
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'slug', 'synced_at']
+    search_fields = ['name']
+
+
+@admin.register(Product)
+class ProductAdmin(admin.ModelAdmin):
+    list_display = ['id', 'title', 'price', 'category', 'synced_at']
+    list_filter = ['category']
+    search_fields = ['title']
+
+
+@admin.register(Mutation)
+class MutationAdmin(admin.ModelAdmin):
+    list_display = ['id', 'action', 'product_id', 'user', 'status', 'attempts', 'created_at', 'updated_at']
+    list_filter = ['status', 'action']
+    search_fields = ['product_id']
@@ -0,0 +1,304 @@
+"""
+Cliente HTTP compartido para la API de Platzi (api.escuelajs.co).
+
+Todas las vistas de productos pasan por este módulo. El proceso mantiene un
+único pool de conexiones keep-alive (``HTTPAdapter``) y cada hilo usa su propia
+``requests.Session`` montada sobre ese pool, de modo que las conexiones TCP/TLS
+se reutilizan entre peticiones y todas las llamadas tienen un timeout.
+
+Para las vistas asíncronas (ver productos/async_views.py) hay un cliente
+``httpx.AsyncClient`` por event loop con los mismos límites y timeouts.
+
+Cada llamada pasa por el circuito de su endpoint y respeta el presupuesto de
+latencia de la petición (ver productos/circuit.py). Un timeout que se acortó
+para caber en el presupuesto no cuenta como fallo de la API: solo dice que a
+la petición no le quedaba tiempo. Con ``PLATZI_API_HEDGE``,
+un GET que tarda más que el p95 de su endpoint lanza una copia y se usa la
+primera respuesta.
+"""
+import asyncio
+import threading
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urljoin
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+from . import circuit
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """El circuito del endpoint está abierto: la llamada falla sin salir a la red"""
+
+
+class LatencyBudgetExceeded(requests.exceptions.Timeout):
+    """La petición ya agotó su presupuesto de tiempo para llamar a la API"""
+
+
+class AsyncCircuitOpenError(httpx.ConnectError):
+    """Versión para el cliente asíncrono de ``CircuitOpenError``"""
+
+
+class AsyncLatencyBudgetExceeded(httpx.TimeoutException):
+    """Versión para el cliente asíncrono de ``LatencyBudgetExceeded``"""
+
+
+_local = threading.local()
+_adapter = None
+_adapter_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()
+_hedge_executor = None
+
+
+def get_adapter():
+    """Devuelve el adaptador (pool de conexiones) compartido por el proceso"""
+    global _adapter
+    if _adapter is None:
+        with _adapter_lock:
+            if _adapter is None:
+                _adapter = HTTPAdapter(
+                    pool_connections=settings.PLATZI_API_POOL_CONNECTIONS,
+                    pool_maxsize=settings.PLATZI_API_POOL_MAXSIZE,
+                    pool_block=False,
+                )
+    return _adapter
+
+
+def get_session():
+    """Devuelve la sesión HTTP del hilo actual"""
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        adapter = get_adapter()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({'Accept': 'application/json'})
+        _local.session = session
+    return session
+
+
+def build_url(path):
+    """Construye la URL absoluta de un recurso de la API (ej: 'products/4')"""
+    return urljoin(settings.PLATZI_API_URL, path.lstrip('/'))
+
+
+def budget_timeout(timeout):
+    """
+    Ajusta un timeout (conexión, lectura) a lo que queda del presupuesto de la
+    petición. Devuelve None si el presupuesto ya se agotó.
+    """
+    remaining = circuit.remaining_budget()
+    if remaining is None:
+        return timeout
+    if remaining <= 0:
+        return None
+    connect_timeout, read_timeout = timeout
+    return (min(connect_timeout, remaining), min(read_timeout, remaining))
+
+
+def get_hedge_executor():
+    global _hedge_executor
+    if _hedge_executor is None:
+        with _adapter_lock:
+            if _hedge_executor is None:
+                _hedge_executor = ThreadPoolExecutor(
+                    max_workers=settings.PLATZI_API_POOL_MAXSIZE,
+                    thread_name_prefix='platzi-api-hedge',
+                )
+    return _hedge_executor
+
+
+def hedge_delay(endpoint):
+    """Segundos tras los que se duplica un GET, o None si no hay que hacerlo"""
+    if not settings.PLATZI_API_HEDGE:
+        return None
+    return circuit.get_latency_tracker(endpoint).p95(settings.PLATZI_API_HEDGE_MIN_MUESTRAS)
+
+
+def hedged_get(url, delay, **kwargs):
+    """GET que lanza una segunda petición si la primera tarda más de ``delay``"""
+    executor = get_hedge_executor()
+    pending = {executor.submit(lambda: get_session().get(url, **kwargs))}
+    done, pending = wait(pending, timeout=delay)
+    if not done:
+        pending.add(executor.submit(lambda: get_session().get(url, **kwargs)))
+
+    error = None
+    while pending or done:
+        for future in done:
+            try:
+                return future.result()
+            except requests.exceptions.RequestException as e:
+                error = e
+        if not pending:
+            break
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+    raise error
+
+
+def request(method, path, **kwargs):
+    """
+    Realiza una petición a la API usando el pool, el timeout por defecto, el
+    presupuesto de latencia de la petición y el circuito del endpoint.
+    """
+    endpoint = circuit.endpoint_key(method, path)
+    full_timeout = kwargs.pop('timeout', settings.PLATZI_API_TIMEOUT)
+    timeout = budget_timeout(full_timeout)
+    if timeout is None:
+        raise LatencyBudgetExceeded(f'Presupuesto de latencia agotado antes de llamar a {endpoint}')
+    clamped = tuple(timeout) != tuple(full_timeout)
+
+    breaker = circuit.get_breaker(endpoint)
+    if not breaker.allow():
+        raise CircuitOpenError(f'Circuito abierto para {endpoint}: la API no está respondiendo')
+
+    url = build_url(path)
+    delay = hedge_delay(endpoint) if method == 'GET' else None
+    start = time.monotonic()
+    try:
+        if delay is None:
+            response = get_session().request(method, url, timeout=timeout, **kwargs)
+        else:
+            response = hedged_get(url, delay, timeout=timeout, **kwargs)
+    except requests.exceptions.Timeout:
+        if clamped:
+            breaker.release()
+        else:
+            breaker.record_failure()
+        raise
+    except requests.exceptions.RequestException:
+        breaker.record_failure()
+        raise
+    except BaseException:
+        breaker.release()
+        raise
+
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+        circuit.get_latency_tracker(endpoint).record(time.monotonic() - start)
+    return response
+
+
+def get(path, **kwargs):
+    return request('GET', path, **kwargs)
+
+
+def post(path, **kwargs):
+    return request('POST', path, **kwargs)
+
+
+def put(path, **kwargs):
+    return request('PUT', path, **kwargs)
+
+
+def delete(path, **kwargs):
+    return request('DELETE', path, **kwargs)
+
+
+def get_async_client():
+    """Devuelve el cliente asíncrono del event loop actual"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        connect_timeout, read_timeout = settings.PLATZI_API_TIMEOUT
+        client = httpx.AsyncClient(
+            base_url=settings.PLATZI_API_URL,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=settings.PLATZI_API_POOL_MAXSIZE,
+                max_keepalive_connections=settings.PLATZI_API_POOL_MAXSIZE,
+            ),
+            headers={'Accept': 'application/json'},
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def ahedged_get(path, delay, **kwargs):
+    """Versión asíncrona de ``hedged_get``: la petición que pierde se cancela"""
+    client = get_async_client()
+    pending = {asyncio.ensure_future(client.get(path, **kwargs))}
+    done, pending = await asyncio.wait(pending, timeout=delay)
+    if not done:
+        pending.add(asyncio.ensure_future(client.get(path, **kwargs)))
+
+    error = None
+    try:
+        while pending or done:
+            for task in done:
+                try:
+                    return task.result()
+                except httpx.HTTPError as e:
+                    error = e
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def arequest(method, path, **kwargs):
+    """Versión asíncrona de ``request``"""
+    endpoint = circuit.endpoint_key(method, path)
+    timeout = budget_timeout(settings.PLATZI_API_TIMEOUT)
+    if timeout is None:
+        raise AsyncLatencyBudgetExceeded(f'Presupuesto de latencia agotado antes de llamar a {endpoint}')
+    clamped = tuple(timeout) != tuple(settings.PLATZI_API_TIMEOUT)
+
+    breaker = circuit.get_breaker(endpoint)
+    if not breaker.allow():
+        raise AsyncCircuitOpenError(f'Circuito abierto para {endpoint}: la API no está respondiendo')
+
+    connect_timeout, read_timeout = timeout
+    kwargs['timeout'] = httpx.Timeout(read_timeout, connect=connect_timeout)
+    path = path.lstrip('/')
+    delay = hedge_delay(endpoint) if method == 'GET' else None
+    start = time.monotonic()
+    try:
+        if delay is None:
+            response = await get_async_client().request(method, path, **kwargs)
+        else:
+            response = await ahedged_get(path, delay, **kwargs)
+    except httpx.TimeoutException:
+        if clamped:
+            breaker.release()
+        else:
+            breaker.record_failure()
+        raise
+    except httpx.HTTPError:
+        breaker.record_failure()
+        raise
+    except BaseException:
+        breaker.release()
+        raise
+
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+        circuit.get_latency_tracker(endpoint).record(time.monotonic() - start)
+    return response
+
+
+async def aget(path, **kwargs):
+    return await arequest('GET', path, **kwargs)
+
+
+async def apost(path, **kwargs):
+    return await arequest('POST', path, **kwargs)
+
+
+async def aput(path, **kwargs):
+    return await arequest('PUT', path, **kwargs)
+
+
+async def adelete(path, **kwargs):
+    return await arequest('DELETE', path, **kwargs)
@@ -0,0 +1,303 @@
+"""
+Versiones asíncronas de las vistas de productos.
+
+Se activan con ``PRODUCTOS_ASYNC_VIEWS`` (por defecto al arrancar desde
+platzi_project/asgi.py). Las llamadas a la API usan el cliente httpx de
+productos/api.py y las que son independientes se lanzan en paralelo. El ORM y
+el render de plantillas se ejecutan con ``sync_to_async``.
+"""
+import asyncio
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.http import HttpResponse
+from django.shortcuts import render, redirect
+
+from . import api, invalidation, mirror, mutations, views
+from .cache import aget_or_refresh
+from .categories import build_categories, cache_key, cargar_categorias, ultimas_categorias
+from .forms import BuscarProductoForm, CrearProductoForm
+from .models import Mutation
+
+
+arender = sync_to_async(render)
+aenqueue = sync_to_async(mutations.enqueue)
+
+
+async def adescargar_pagina_productos(page, per_page):
+    """Descargar una página de productos desde la API usando offset/limit"""
+    response = await api.aget('products', params={
+        'offset': (page - 1) * per_page,
+        'limit': per_page + 1,
+    })
+    response.raise_for_status()
+    return views.build_page(response.json(), per_page)
+
+
+async def acargar_pagina_productos(page, per_page):
+    """Obtener una página de productos del espejo local o, si falta, de la API"""
+    page_data = await sync_to_async(mirror.get_page)(page, per_page)
+    if page_data is None:
+        try:
+            page_data = await adescargar_pagina_productos(page, per_page)
+        except httpx.HTTPError:
+            # API caída o circuito abierto: se sirve lo que haya en el espejo
+            page_data = await sync_to_async(mirror.get_page)(page, per_page, partial=True)
+            if page_data is None:
+                raise
+            raise views.PaginaDegradada(page_data)
+        await sync_to_async(mirror.fill)(mirror.save_page, page, per_page, page_data)
+    return page_data
+
+
+async def aget_product(product_id):
+    """Obtener un producto del espejo local o, si no está, de la API"""
+    product_data = await sync_to_async(mirror.get_product)(product_id)
+    if product_data is None:
+        response = await api.aget(f'products/{product_id}')
+        response.raise_for_status()
+        product_data = response.json()
+        if product_data.get('id') is not None:
+            await sync_to_async(mirror.fill)(mirror.save_product, product_data)
+    return product_data
+
+
+async def adescargar_producto(product_id, semaphore):
+    """Descargar un producto de la API; los fallos se devuelven como {'error': ...}"""
+    async with semaphore:
+        try:
+            response = await api.aget(f'products/{product_id}')
+            if response.status_code in (400, 404):
+                # La API responde 400 cuando el ID no existe
+                return views.check_product(product_id, {})
+            response.raise_for_status()
+            return views.check_product(product_id, response.json())
+        except httpx.HTTPError as e:
+            return {'id': product_id, 'error': f'Producto {product_id}: error al conectar con la API: {e}'}
+
+
+async def aget_products(product_ids):
+    """
+    Obtener varios productos: los del espejo local con una sola consulta y el
+    resto de la API en paralelo (como máximo PLATZI_API_MAX_CONCURRENCY a la vez).
+    """
+    found = await sync_to_async(mirror.get_products)(product_ids)
+    missing = [pk for pk in product_ids if pk not in found]
+
+    if missing:
+        semaphore = asyncio.Semaphore(settings.PLATZI_API_MAX_CONCURRENCY)
+        downloaded = await asyncio.gather(*(adescargar_producto(pk, semaphore) for pk in missing))
+        await sync_to_async(mirror.fill)(mirror.save_products, [p for p in downloaded if 'error' not in p])
+        found.update(zip(missing, downloaded))
+
+    return [found[pk] for pk in product_ids]
+
+
+async def acargar_categorias():
+    """Descargar las categorías desde la API"""
+    response = await api.aget('categories')
+    response.raise_for_status()
+    return await sync_to_async(build_categories)(response.json())
+
+
+async def aget_categories():
+    """Obtener categorías (cacheadas) desde la API"""
+    try:
+        return await aget_or_refresh(
+            await sync_to_async(cache_key)(),
+            acargar_categorias,
+            cargar_categorias,
+            ttl=settings.PRODUCTOS_CATEGORIAS_TTL,
+            stale_ttl=settings.PRODUCTOS_CATEGORIAS_STALE_TTL,
+        )
+    except httpx.HTTPError:
+        # Si la API falla se usa la última lista conocida
+        return await sync_to_async(ultimas_categorias)()
+
+
+@views.condicional(views.validadores_inicio)
+async def inicio(request):
+    page = views.get_page_number(request)
+    per_page = settings.PRODUCTOS_POR_PAGINA
+    page_data = {'products': [], 'has_next': False, 'degradada': True}
+
+    try:
+        page_data = await aget_or_refresh(
+            await sync_to_async(invalidation.list_key)(page, per_page),
+            lambda: acargar_pagina_productos(page, per_page),
+            lambda: views.cargar_pagina_productos(page, per_page),
+            ttl=settings.PRODUCTOS_CACHE_TTL,
+            stale_ttl=settings.PRODUCTOS_CACHE_STALE_TTL,
+        )
+
+    except views.PaginaDegradada as e:
+        page_data = e.page_data
+    except httpx.HTTPError as e:
+        print(f'Error al conectar con la API: {e}')
+
+    context = await sync_to_async(views.build_page_context)(page, page_data)
+    response = await arender(request, 'inicio.html', context)
+    return views.degradada(response) if page_data.get('degradada') else response
+
+
+@views.condicional(views.validadores_busqueda)
+async def buscar_producto_view(request):
+    products_data = []
+    form = BuscarProductoForm()
+    search_form, search_results = await sync_to_async(views.buscar_por_palabras)(
+        request, await aget_categories()
+    )
+
+    if request.method == 'POST':
+        form = BuscarProductoForm(request.POST)
+        if form.is_valid():
+            # Lista de IDs ya sin repetidos (ver BuscarProductoForm.clean_product_id)
+            products_data = await aget_products(form.cleaned_data['product_id'])
+
+    context = {
+        'form': form,
+        'products_data': products_data,
+        'search_form': search_form,
+        'search_results': search_results,
+    }
+    return await arender(request, 'buscar_producto.html', context)
+
+
+async def crear_producto_view(request):
+    message = None
+    mutation_id = None
+    categories = await aget_categories()
+
+    if request.method == 'POST':
+        form = CrearProductoForm(request.POST)
+        form.fields['category'].choices = categories
+        if form.is_valid():
+            payload = views.build_payload(form.cleaned_data)
+
+            if settings.PRODUCTOS_ESCRITURA_DIFERIDA:
+                mutation = await aenqueue(Mutation.CREATE, payload, user=await request.auser())
+                mutation_id = mutation.id
+                message = f'Producto "{payload["title"]}" en cola para crearse (cambio #{mutation.id})'
+                form = CrearProductoForm()
+                form.fields['category'].choices = categories
+            else:
+                try:
+                    response = await api.apost('products', json=payload)
+
+                    if response.status_code == 201:
+                        new_product = response.json()
+                        if new_product.get('id') is not None:
+                            await sync_to_async(mirror.fill)(mirror.save_product, new_product)
+                            await sync_to_async(invalidation.product_changed)(new_product['id'], created=True)
+                        message = f'¡Producto "{new_product.get("title", "")}" creado con éxito!'
+                        form = CrearProductoForm()
+                        form.fields['category'].choices = categories
+                    else:
+                        try:
+                            error_data = response.json()
+                            message = f'Error de la API: {error_data}'
+                        except ValueError:
+                            message = f'Error HTTP {response.status_code}: {response.text}'
+                except httpx.HTTPError as e:
+                    message = f'Error de conexión: {e}'
+    else:
+        form = CrearProductoForm()
+        form.fields['category'].choices = categories
+
+    context = {
+        'form': form,
+        'message': message,
+        'mutation_id': mutation_id,
+        'edit_mode': False,
+    }
+    return await arender(request, 'crear_producto.html', context)
+
+
+async def eliminar_producto_view(request, product_id):
+    if request.method == 'POST':
+        if settings.PRODUCTOS_ESCRITURA_DIFERIDA:
+            mutation = await aenqueue(Mutation.DELETE, product_id=product_id, user=await request.auser())
+            messages.success(request, f'Producto en cola para eliminarse (cambio #{mutation.id})')
+            return redirect('productos:inicio')
+
+        try:
+            response = await api.adelete(f'products/{product_id}')
+            response.raise_for_status()
+            await sync_to_async(mirror.delete_product)(product_id)
+            await sync_to_async(invalidation.product_changed)(product_id, deleted=True)
+            messages.success(request, 'Producto eliminado exitosamente')
+
+        except httpx.HTTPError as e:
+            messages.error(request, f'Error al eliminar: {e}')
+            return await arender(request, 'error.html', {'error_message': f'Error al eliminar: {e}'})
+
+    return redirect('productos:inicio')
+
+
+@views.condicional(views.validadores_edicion)
+async def editar_producto_view(request, product_id):
+    product_path = f'products/{product_id}'
+    message = None
+    mutation_id = None
+
+    if request.method == 'POST':
+        categories = await aget_categories()
+        form = CrearProductoForm(request.POST)
+        form.fields['category'].choices = categories
+        if form.is_valid():
+            payload = views.build_payload(form.cleaned_data)
+
+            if settings.PRODUCTOS_ESCRITURA_DIFERIDA:
+                mutation = await aenqueue(Mutation.UPDATE, payload, product_id=product_id, user=await request.auser())
+                mutation_id = mutation.id
+                message = f'Cambios del producto {product_id} en cola (cambio #{mutation.id})'
+            else:
+                try:
+                    response = await api.aput(product_path, json=payload)
+
+                    if response.status_code in [200, 201]:
+                        response_data = response.json()
+                        if response_data.get('id') is not None:
+                            await sync_to_async(mirror.fill)(mirror.save_product, response_data)
+                        await sync_to_async(invalidation.product_changed)(product_id)
+                        message = f'¡Producto actualizado con éxito! ID: {response_data.get("id", product_id)}'
+                    else:
+                        try:
+                            error_data = response.json()
+                            message = f'Error de la API: {error_data}'
+                        except ValueError:
+                            message = f'Error HTTP {response.status_code}: {response.text}'
+
+                except httpx.TimeoutException:
+                    message = 'Error: Tiempo de espera agotado. Inténtalo de nuevo.'
+                except httpx.ConnectError:
+                    message = 'Error: No se pudo conectar con la API. Verifica tu conexión.'
+                except httpx.HTTPError as e:
+                    message = f'Error de conexión: {e}'
+
+    else:
+        try:
+            # Categorías y producto son independientes: se piden en paralelo
+            categories, product_data = await asyncio.gather(
+                aget_categories(),
+                aget_product(product_id),
+            )
+        except httpx.HTTPStatusError as e:
+            return HttpResponse(f'Error al obtener el producto: Status {e.response.status_code}', status=400)
+        except httpx.HTTPError as e:
+            return HttpResponse(f'Error al obtener los datos del producto: {e}', status=500)
+
+        form = CrearProductoForm(initial=views.build_initial_data(product_data))
+        form.fields['category'].choices = categories
+
+    context = {
+        'form': form,
+        'product_id': product_id,
+        'edit_mode': True,
+        'message': message,
+        'mutation_id': mutation_id,
+    }
+
+    return await arender(request, 'crear_producto.html', context)
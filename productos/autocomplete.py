@@ -0,0 +1,205 @@
+"""
+Índice invertido en memoria para el autocompletado de productos.
+
+Cada proceso construye el índice a partir de los títulos del espejo local
+(tabla Product). Los cambios que hace el propio proceso se aplican al momento
+(ver productos/mirror.py); los del resto (otros workers, ``sync_catalog``,
+``procesar_mutaciones``) se detectan con el contador 'catalogo' de
+productos/invalidation.py, que se comprueba como mucho cada
+``PRODUCTOS_AUTOCOMPLETAR_COMPROBACION`` segundos: si cambió, se construye un
+índice nuevo y sustituye al anterior. Estructuras:
+
+- ``postings``: token -> array ordenado con los IDs de los productos.
+- ``sorted_tokens``: lista ordenada de tokens para buscar por prefijo con bisect.
+- ``trigrams``: trigrama -> tokens que lo contienen, para tolerar erratas.
+"""
+import heapq
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+
+from django.conf import settings
+
+from . import invalidation
+from .models import Product
+from .search import tokenize
+
+
+MAX_PREFIX_TOKENS = 50  # Tokens como máximo que se expanden para un prefijo
+MAX_TYPOS = 1  # Distancia de edición tolerada en términos de 3 o más letras
+
+
+def trigrams_of(token):
+    padded = f'  {token} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def within_distance(a, b, max_distance):
+    """Distancia de Levenshtein acotada: True si a y b difieren en <= max_distance ediciones"""
+    if abs(len(a) - len(b)) > max_distance:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        if min(current) > max_distance:
+            return False
+        previous = current
+    return previous[-1] <= max_distance
+
+
+class ProductIndex:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        self.built = False
+        self.version = None  # Contador 'catalogo' con el que se construyó
+        self.postings = {}
+        self.sorted_tokens = []
+        self.trigrams = {}
+        self.titles = {}
+        self.doc_tokens = {}
+
+    def build(self, products):
+        """Construye el índice a partir de pares (id, título)"""
+        with self.lock:
+            self.clear()
+            for product_id, title in products:
+                self.add(product_id, title)
+            self.built = True
+
+    def add(self, product_id, title):
+        with self.lock:
+            self.remove(product_id)
+            tokens = set(tokenize(title))
+            self.titles[product_id] = title
+            self.doc_tokens[product_id] = tokens
+            for token in tokens:
+                ids = self.postings.get(token)
+                if ids is None:
+                    ids = self.postings[token] = array('i')
+                    insort(self.sorted_tokens, token)
+                    for trigram in trigrams_of(token):
+                        self.trigrams.setdefault(trigram, set()).add(token)
+                insort(ids, product_id)
+
+    def remove(self, product_id):
+        with self.lock:
+            for token in self.doc_tokens.pop(product_id, ()):
+                ids = self.postings[token]
+                del ids[bisect_left(ids, product_id)]
+                if not ids:
+                    del self.postings[token]
+                    del self.sorted_tokens[bisect_left(self.sorted_tokens, token)]
+                    for trigram in trigrams_of(token):
+                        self.trigrams[trigram].discard(token)
+            self.titles.pop(product_id, None)
+
+    def prefix_tokens(self, prefix):
+        start = bisect_left(self.sorted_tokens, prefix)
+        tokens = []
+        for token in self.sorted_tokens[start:start + MAX_PREFIX_TOKENS]:
+            if not token.startswith(prefix):
+                break
+            tokens.append(token)
+        return tokens
+
+    def fuzzy_tokens(self, term):
+        """Tokens del índice a MAX_TYPOS ediciones o menos de ``term``"""
+        if len(term) < 3:
+            return []
+        candidates = set()
+        for trigram in trigrams_of(term):
+            candidates.update(self.trigrams.get(trigram, ()))
+        return [t for t in candidates if within_distance(term, t, MAX_TYPOS)]
+
+    def matching_ids(self, term, prefix):
+        """IDs de productos que contienen ``term`` (o un token que empiece por él)"""
+        if prefix:
+            tokens = self.prefix_tokens(term)
+        else:
+            tokens = [term] if term in self.postings else []
+        if not tokens:
+            tokens = self.fuzzy_tokens(term)
+
+        ids = set()
+        for token in tokens:
+            ids.update(self.postings[token])
+        return ids
+
+    def suggest(self, query, limit=8):
+        """
+        Devuelve hasta ``limit`` productos cuyo título contiene todos los
+        términos de ``query``. El último término se trata como prefijo.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        with self.lock:
+            ids = None
+            for position, term in enumerate(terms):
+                matches = self.matching_ids(term, prefix=position == len(terms) - 1)
+                ids = matches if ids is None else ids & matches
+                if not ids:
+                    return []
+
+            # Primero los títulos que empiezan por la consulta, después los más cortos
+            query_lower = query.strip().lower()
+            ranked = heapq.nsmallest(
+                limit,
+                ids,
+                key=lambda pk: (
+                    not self.titles[pk].lower().startswith(query_lower),
+                    len(self.titles[pk]),
+                    pk,
+                ),
+            )
+            return [{'id': pk, 'title': self.titles[pk]} for pk in ranked]
+
+
+index = ProductIndex()
+_build_lock = threading.Lock()
+_checked_at = 0.0  # time.monotonic() de la última comprobación del contador
+
+
+def is_current():
+    return index.built and time.monotonic() - _checked_at < settings.PRODUCTOS_AUTOCOMPLETAR_COMPROBACION
+
+
+def get_index():
+    """Devuelve el índice del proceso, reconstruyéndolo si el catálogo cambió"""
+    global index, _checked_at
+    if is_current():
+        return index
+    with _build_lock:
+        if is_current():
+            return index
+        # El contador se lee antes que los títulos: un cambio posterior forzará otra reconstrucción
+        version = invalidation.get_counters([invalidation.CATALOGO])[invalidation.CATALOGO]
+        if not index.built or index.version != version:
+            new_index = ProductIndex()
+            new_index.build(Product.objects.values_list('id', 'title').iterator())
+            new_index.version = version
+            index = new_index
+        _checked_at = time.monotonic()
+    return index
+
+
+def update_product(product_id, title):
+    """Actualiza un producto en el índice (si este proceso ya lo construyó)"""
+    if index.built:
+        index.add(product_id, title)
+
+
+def remove_product(product_id):
+    if index.built:
+        index.remove(product_id)
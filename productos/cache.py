@@ -0,0 +1,147 @@
+"""
+Caché con stale-while-revalidate para las respuestas de la API de Platzi.
+
+Las entradas se guardan en la caché por defecto de Django (ver ``CACHES`` en
+settings, que limita el número de entradas) junto con el instante hasta el que
+se consideran frescas. Pasado ese instante la entrada sigue sirviéndose
+durante ``stale_ttl`` segundos mientras un único hilo en segundo plano la
+refresca.
+
+Cuando falta una entrada, las peticiones concurrentes que la necesitan se
+agrupan en una sola llamada a la API (ver productos/singleflight.py). Con
+``PRODUCTOS_SINGLEFLIGHT_DISTRIBUIDO`` y una caché compartida, un candado en
+la caché hace lo mismo entre workers.
+"""
+import asyncio
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from . import singleflight
+
+
+logger = logging.getLogger(__name__)
+
+# Tiempo máximo que un refresco en segundo plano puede retener su candado
+REFRESH_LOCK_TIMEOUT = 30
+# Intervalo de sondeo mientras otro worker carga la misma entrada
+LOAD_POLL_INTERVAL = 0.05
+
+
+def set_entry(key, value, ttl, stale_ttl):
+    """Guarda un valor fresco durante ``ttl`` y servible hasta ``ttl + stale_ttl``"""
+    cache.set(key, (value, time.time() + ttl), timeout=ttl + stale_ttl)
+
+
+def _refresh(key, loader, ttl, stale_ttl, lock_key):
+    try:
+        set_entry(key, loader(), ttl, stale_ttl)
+    except Exception:
+        # Si el refresco falla se sigue sirviendo el valor anterior
+        logger.exception('Error al refrescar la entrada de caché %s', key)
+    finally:
+        cache.delete(lock_key)
+        connections.close_all()
+
+
+def refresh_in_background(key, loader, ttl, stale_ttl):
+    """Lanza un refresco en segundo plano salvo que ya haya uno en curso"""
+    lock_key = f'{key}:refresh'
+    if not cache.add(lock_key, True, timeout=REFRESH_LOCK_TIMEOUT):
+        return
+    thread = threading.Thread(
+        target=_refresh,
+        args=(key, loader, ttl, stale_ttl, lock_key),
+        daemon=True,
+    )
+    thread.start()
+
+
+def get_or_refresh(key, loader, ttl, stale_ttl):
+    """
+    Devuelve el valor cacheado para ``key``.
+
+    - Si no existe, llama a ``loader()`` de forma síncrona y lo guarda.
+    - Si existe pero está vencido, lo devuelve igualmente y lanza un refresco
+      en segundo plano.
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        value, fresh_until = entry
+        if time.time() >= fresh_until:
+            refresh_in_background(key, loader, ttl, stale_ttl)
+        return value
+
+    return singleflight.group.do(key, lambda: load_entry(key, loader, ttl, stale_ttl))
+
+
+def load_entry(key, loader, ttl, stale_ttl):
+    """Carga una entrada ausente, esperando a otro worker si ya la está cargando"""
+    lock_key = f'{key}:load'
+    locked = False
+    if settings.PRODUCTOS_SINGLEFLIGHT_DISTRIBUIDO:
+        locked = cache.add(lock_key, True, timeout=REFRESH_LOCK_TIMEOUT)
+        if not locked:
+            deadline = time.monotonic() + settings.PRODUCTOS_SINGLEFLIGHT_ESPERA
+            while time.monotonic() < deadline:
+                time.sleep(LOAD_POLL_INTERVAL)
+                entry = cache.get(key)
+                if entry is not None:
+                    return entry[0]
+            # El otro worker no terminó a tiempo: se carga aquí
+
+    try:
+        value = loader()
+        set_entry(key, value, ttl, stale_ttl)
+        return value
+    finally:
+        if locked:
+            cache.delete(lock_key)
+
+
+async def aget_or_refresh(key, aloader, loader, ttl, stale_ttl):
+    """
+    Versión asíncrona de ``get_or_refresh``: si falta la entrada se espera a
+    ``aloader()``; el refresco de entradas vencidas sigue usando ``loader``
+    en un hilo en segundo plano.
+    """
+    entry = await cache.aget(key)
+    if entry is not None:
+        value, fresh_until = entry
+        if time.time() >= fresh_until:
+            refresh_in_background(key, loader, ttl, stale_ttl)
+        return value
+
+    return await singleflight.ado(key, lambda: aload_entry(key, aloader, ttl, stale_ttl))
+
+
+async def aload_entry(key, aloader, ttl, stale_ttl):
+    """Versión asíncrona de ``load_entry``"""
+    lock_key = f'{key}:load'
+    locked = False
+    if settings.PRODUCTOS_SINGLEFLIGHT_DISTRIBUIDO:
+        locked = await cache.aadd(lock_key, True, timeout=REFRESH_LOCK_TIMEOUT)
+        if not locked:
+            deadline = time.monotonic() + settings.PRODUCTOS_SINGLEFLIGHT_ESPERA
+            while time.monotonic() < deadline:
+                await asyncio.sleep(LOAD_POLL_INTERVAL)
+                entry = await cache.aget(key)
+                if entry is not None:
+                    return entry[0]
+
+    try:
+        value = await aloader()
+        await cache.aset(key, (value, time.time() + ttl), timeout=ttl + stale_ttl)
+        return value
+    finally:
+        if locked:
+            await cache.adelete(lock_key)
+
+
+def invalidate(key):
+    """Elimina una entrada para que la siguiente lectura la recargue"""
+    cache.delete(key)
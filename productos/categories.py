@@ -0,0 +1,59 @@
+"""
+Categorías de los formularios de productos, cacheadas con stale-while-revalidate.
+
+La clave en caché incluye el contador de versión 'categorias' (ver
+productos/invalidation.py). Como el contador está en la base de datos,
+``invalidar_categorias`` tiene efecto en todos los procesos aunque se llame
+desde un comando como ``sync_catalog``.
+
+Cada descarga se guarda en el espejo (tabla ``Category``). Si la API falla,
+los formularios usan las categorías del espejo, también en un worker recién
+arrancado que aún no ha podido descargarlas.
+"""
+import requests
+from django.conf import settings
+
+from . import api, invalidation, mirror
+from .cache import get_or_refresh
+from .models import Category
+
+
+def cache_key():
+    return f'productos:categorias:{invalidation.get_version(invalidation.CATEGORIAS)[0]}'
+
+
+def cargar_categorias():
+    """Descargar las categorías desde la API"""
+    response = api.get('categories')
+    response.raise_for_status()
+    return build_categories(response.json())
+
+
+def build_categories(data):
+    """Convertir la respuesta de la API en opciones del formulario y guardarlas en el espejo"""
+    mirror.fill(mirror.save_categories, data)
+    return [(str(cat["id"]), cat["name"]) for cat in data]
+
+
+def ultimas_categorias():
+    """Categorías guardadas en el espejo local (última lista conocida)"""
+    return [(str(pk), name) for pk, name in Category.objects.values_list('id', 'name')]
+
+
+def get_categories():
+    """Obtener categorías (cacheadas) desde la API"""
+    try:
+        return get_or_refresh(
+            cache_key(),
+            cargar_categorias,
+            ttl=settings.PRODUCTOS_CATEGORIAS_TTL,
+            stale_ttl=settings.PRODUCTOS_CATEGORIAS_STALE_TTL,
+        )
+    except requests.exceptions.RequestException:
+        # Si la API falla se usa la última lista conocida
+        return ultimas_categorias()
+
+
+def invalidar_categorias():
+    """Forzar que la próxima llamada a get_categories() consulte la API (en cualquier proceso)"""
+    invalidation.bump_version(invalidation.CATEGORIAS)
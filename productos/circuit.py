@@ -0,0 +1,158 @@
+"""
+Protección de las llamadas a la API de Platzi cuando el servicio se degrada.
+
+- ``CircuitBreaker``: un circuito por endpoint (ej: 'GET products/:id'). Tras
+  ``PLATZI_API_CIRCUITO_FALLOS`` fallos seguidos se abre y las llamadas fallan
+  al instante durante ``PLATZI_API_CIRCUITO_ESPERA`` segundos. Después deja
+  pasar una única llamada de prueba (half-open) que decide si se cierra o se
+  vuelve a abrir.
+- Presupuesto de latencia: ``LatencyBudgetMiddleware`` fija cuánto tiempo
+  total puede pasar una petición esperando a la API. Cada llamada ajusta su
+  timeout a lo que queda.
+- ``LatencyTracker``: guarda las latencias recientes de cada endpoint para
+  calcular el p95 que usan las peticiones duplicadas (hedging) de productos/api.py.
+"""
+import contextvars
+import re
+import threading
+import time
+from collections import deque
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+ID_RE = re.compile(r'/\d+(?=/|$)')
+
+
+def endpoint_key(method, path):
+    """Agrupa las rutas por endpoint: 'products/4' -> 'GET products/:id'"""
+    return f"{method} {ID_RE.sub('/:id', '/' + path.strip('/'))[1:]}"
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold, reset_timeout):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+
+    def allow(self):
+        """Indica si se puede llamar al endpoint (y reserva la llamada de prueba)"""
+        with self.lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = HALF_OPEN
+                self.trial_in_flight = False
+            if self.state == HALF_OPEN:
+                if self.trial_in_flight:
+                    return False
+                self.trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.trial_in_flight = False
+
+    def release(self):
+        """Libera la llamada de prueba si terminó sin resultado (ej: cancelada)"""
+        with self.lock:
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(endpoint):
+    breaker = _breakers.get(endpoint)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(endpoint, CircuitBreaker(
+                endpoint,
+                failure_threshold=settings.PLATZI_API_CIRCUITO_FALLOS,
+                reset_timeout=settings.PLATZI_API_CIRCUITO_ESPERA,
+            ))
+    return breaker
+
+
+class LatencyTracker:
+    """Latencias recientes (en segundos) de un endpoint"""
+
+    def __init__(self, size=200):
+        self.samples = deque(maxlen=size)
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+
+    def p95(self, min_samples):
+        samples = sorted(self.samples)
+        if len(samples) < min_samples:
+            return None
+        return samples[int(len(samples) * 0.95) - 1]
+
+
+_latencies = {}
+
+
+def get_latency_tracker(endpoint):
+    return _latencies.setdefault(endpoint, LatencyTracker())
+
+
+# Instante (time.monotonic) en el que se agota el presupuesto de la petición actual
+_deadline = contextvars.ContextVar('platzi_api_deadline', default=None)
+
+
+def remaining_budget():
+    """Segundos que le quedan a la petición actual, o None si no hay presupuesto"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+class LatencyBudgetMiddleware:
+    """Fija el presupuesto de latencia (PLATZI_API_PRESUPUESTO) de cada petición"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = _deadline.set(time.monotonic() + settings.PLATZI_API_PRESUPUESTO)
+        try:
+            return self.get_response(request)
+        finally:
+            _deadline.reset(token)
+
+    async def __acall__(self, request):
+        token = _deadline.set(time.monotonic() + settings.PLATZI_API_PRESUPUESTO)
+        try:
+            return await self.get_response(request)
+        finally:
+            _deadline.reset(token)
@@ -1,14 +1,96 @@
 from django import forms
+from django.conf import settings
 from django.core.validators import URLValidator, MinValueValidator
 from django.core.exceptions import ValidationError
 
 class BuscarProductoForm(forms.Form):
-    product_id = forms.IntegerField(
+    # Acepta un ID, una lista y/o rangos: "4", "1, 5, 9", "10-15"
+    product_id = forms.CharField(
         label='ID del Producto', 
+        max_length=500,
         required=True,
-        validators=[MinValueValidator(1, message="El ID debe ser mayor a 0")]
     )
 
+    def clean_product_id(self):
+        """Convierte la entrada en una lista de IDs sin repetidos (en orden)"""
+        value = self.cleaned_data.get('product_id', '')
+        product_ids = []
+        for part in value.replace(';', ',').split(','):
+            part = part.strip()
+            if not part:
+                continue
+            try:
+                if '-' in part:
+                    start, end = (int(n) for n in part.split('-', 1))
+                    if end < start:
+                        raise ValidationError(f"Rango inválido: {part}")
+                    if end - start >= settings.PRODUCTOS_BUSQUEDA_MAX_IDS:
+                        raise ValidationError(
+                            f"Puedes consultar como máximo {settings.PRODUCTOS_BUSQUEDA_MAX_IDS} productos a la vez."
+                        )
+                    product_ids.extend(range(start, end + 1))
+                else:
+                    product_ids.append(int(part))
+            except ValueError:
+                raise ValidationError(f"ID inválido: {part}")
+
+        if not product_ids:
+            raise ValidationError("Ingresa al menos un ID.")
+        if min(product_ids) < 1:
+            raise ValidationError("El ID debe ser mayor a 0")
+
+        product_ids = list(dict.fromkeys(product_ids))
+        if len(product_ids) > settings.PRODUCTOS_BUSQUEDA_MAX_IDS:
+            raise ValidationError(
+                f"Puedes consultar como máximo {settings.PRODUCTOS_BUSQUEDA_MAX_IDS} productos a la vez."
+            )
+        return product_ids
+
+class BusquedaProductoForm(forms.Form):
+    q = forms.CharField(
+        label='Palabras clave',
+        max_length=100,
+        required=True,
+        widget=forms.TextInput(attrs={
+            'placeholder': 'Ej: camiseta azul',
+            'class': 'form-input'
+        })
+    )
+
+    category = forms.ChoiceField(
+        label='Categoría',
+        choices=[('', 'Todas las categorías')],
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-input'})
+    )
+
+    min_price = forms.DecimalField(
+        label='Precio mínimo',
+        max_digits=10,
+        decimal_places=2,
+        required=False,
+        validators=[MinValueValidator(0, message="El precio no puede ser negativo")],
+        widget=forms.NumberInput(attrs={'step': '0.01', 'placeholder': '0', 'class': 'form-input'})
+    )
+
+    max_price = forms.DecimalField(
+        label='Precio máximo',
+        max_digits=10,
+        decimal_places=2,
+        required=False,
+        validators=[MinValueValidator(0, message="El precio no puede ser negativo")],
+        widget=forms.NumberInput(attrs={'step': '0.01', 'placeholder': '1000', 'class': 'form-input'})
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        min_price = cleaned_data.get('min_price')
+        max_price = cleaned_data.get('max_price')
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise ValidationError("El precio mínimo no puede ser mayor que el máximo.")
+        return cleaned_data
+
+
 class CrearProductoForm(forms.Form):
     title = forms.CharField(
         label='Título', 
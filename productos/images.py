@@ -0,0 +1,353 @@
+"""
+Proxy de imágenes de productos con miniaturas y caché en disco.
+
+Las plantillas no enlazan la imagen original de la API sino una URL firmada
+(``miniatura_url``) que apunta a ``imagen_view``. La primera vez se descarga
+la imagen original y se guarda en disco; cada miniatura (tamaño y formato) se
+genera con Pillow cuando se pide por primera vez. Las siguientes peticiones
+se sirven desde disco con caché de larga duración.
+
+Las imágenes se descargan con su propio pool de conexiones y sus propios
+timeouts (``PRODUCTOS_IMAGENES_TIMEOUT``): cada host de imágenes ocuparía una
+plaza del pool de la API y expulsaría sus conexiones keep-alive.
+
+Las URLs de las imágenes las elige quien crea el producto, así que el proxy
+no descarga de la red interna: se comprueba el host antes de cada petición
+(``check_public_host``) y, como el DNS puede responder otra cosa al conectar
+(DNS rebinding), también la IP a la que se conectó cada socket.
+
+La caché en disco está limitada a ``PRODUCTOS_IMAGENES_MAX_DISCO`` bytes: al
+superarse se borran los archivos usados hace más tiempo (LRU por mtime, que se
+actualiza al servir cada archivo).
+"""
+import hashlib
+import io
+import ipaddress
+import os
+import socket
+import tempfile
+import threading
+import time
+from urllib.parse import urljoin, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+from PIL import Image, ImageOps
+
+from . import singleflight
+
+
+SIGNING_SALT = 'productos.imagenes'
+
+SIZES = {
+    'sm': 200,
+    'md': 400,
+    'lg': 800,
+}
+FORMATS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpeg': ('JPEG', 'image/jpeg'),
+}
+
+MAX_PIXELS = 40_000_000  # Imágenes más grandes se rechazan (bombas de descompresión)
+MAX_REDIRECTS = 3
+TOUCH_INTERVAL = 60  # Segundos mínimos entre actualizaciones del mtime de un archivo
+EVICT_TARGET = 0.9  # Al limpiar se deja la caché en este porcentaje del máximo
+
+
+class ImageError(Exception):
+    """No se pudo obtener o procesar la imagen original"""
+
+
+def sign_url(url):
+    # Sin marca de tiempo: la misma imagen siempre tiene la misma URL (cacheable)
+    return signing.Signer(salt=SIGNING_SALT).sign_object(url)
+
+
+def miniatura_url(url, size='md', fmt='jpeg'):
+    """URL del proxy para una imagen de producto (o la propia URL si no es http/https)"""
+    if not isinstance(url, str) or not url.startswith(('http://', 'https://')):
+        return url
+    return reverse('productos:imagen', args=[fmt, size, sign_url(url)])
+
+
+def unsign_url(token):
+    """Devuelve la URL original de un token firmado, o None si no es válido"""
+    try:
+        return signing.Signer(salt=SIGNING_SALT).unsign_object(token)
+    except signing.BadSignature:
+        return None
+
+
+def check_public_host(url):
+    """
+    Evita que el proxy acceda a la red interna (localhost, IPs privadas...),
+    salvo a los hosts de ``PRODUCTOS_IMAGENES_HOSTS_PERMITIDOS``.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        raise ImageError(f'URL de imagen no válida: {url}')
+    if parsed.hostname in settings.PRODUCTOS_IMAGENES_HOSTS_PERMITIDOS:
+        return
+    try:
+        addresses = socket.getaddrinfo(parsed.hostname, parsed.port or 443, proto=socket.IPPROTO_TCP)
+    except socket.gaierror as e:
+        raise ImageError(f'No se pudo resolver {parsed.hostname}: {e}')
+    for address in addresses:
+        check_public_address(parsed.hostname, address[4][0])
+
+
+def check_public_address(hostname, address):
+    if not ipaddress.ip_address(address).is_global:
+        raise ImageError(f'Host no permitido: {hostname}')
+
+
+class PublicPeerMixin:
+    """Conexión que solo se usa si la IP a la que se conectó es pública"""
+
+    def _new_conn(self):
+        sock = super()._new_conn()
+        if self.host not in settings.PRODUCTOS_IMAGENES_HOSTS_PERMITIDOS:
+            try:
+                check_public_address(self.host, sock.getpeername()[0])
+            except ImageError:
+                sock.close()
+                raise
+        return sock
+
+
+class PublicHTTPConnection(PublicPeerMixin, HTTPConnection):
+    pass
+
+
+class PublicHTTPSConnection(PublicPeerMixin, HTTPSConnection):
+    pass
+
+
+class PublicHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = PublicHTTPConnection
+
+
+class PublicHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = PublicHTTPSConnection
+
+
+class PublicHostAdapter(HTTPAdapter):
+    """Adaptador cuyas conexiones comprueban la IP del servidor (ver ``PublicPeerMixin``)"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': PublicHTTPConnectionPool,
+            'https': PublicHTTPSConnectionPool,
+        }
+
+
+_local = threading.local()
+_adapter = None
+_adapter_lock = threading.Lock()
+
+
+def get_session():
+    """Sesión HTTP del hilo actual para descargar imágenes (pool propio, separado del de la API)"""
+    global _adapter
+    session = getattr(_local, 'session', None)
+    if session is None:
+        if _adapter is None:
+            with _adapter_lock:
+                if _adapter is None:
+                    _adapter = PublicHostAdapter(pool_block=False)
+        session = requests.Session()
+        # Sin proxies del entorno: la IP comprobada tiene que ser la del servidor de la imagen
+        session.trust_env = False
+        session.mount('https://', _adapter)
+        session.mount('http://', _adapter)
+        session.headers.update({'Accept': 'image/*'})
+        _local.session = session
+    return session
+
+
+def download(url):
+    """Descarga la imagen original (como máximo PRODUCTOS_IMAGENES_MAX_ORIGEN bytes)"""
+    max_bytes = settings.PRODUCTOS_IMAGENES_MAX_ORIGEN
+    for _ in range(MAX_REDIRECTS + 1):
+        check_public_host(url)
+        try:
+            response = get_session().get(
+                url,
+                timeout=settings.PRODUCTOS_IMAGENES_TIMEOUT,
+                stream=True,
+                allow_redirects=False,
+            )
+        except requests.exceptions.RequestException as e:
+            raise ImageError(f'Error al descargar {url}: {e}')
+
+        with response:
+            # Las redirecciones se siguen a mano para comprobar cada destino
+            if response.is_redirect:
+                url = urljoin(url, response.headers['Location'])
+                continue
+            if response.status_code != 200:
+                raise ImageError(f'Error HTTP {response.status_code} al descargar {url}')
+
+            data = bytearray()
+            for chunk in response.iter_content(64 * 1024):
+                data += chunk
+                if len(data) > max_bytes:
+                    raise ImageError(f'La imagen supera {max_bytes} bytes: {url}')
+            return bytes(data)
+
+    raise ImageError(f'Demasiadas redirecciones: {url}')
+
+
+def make_thumbnail(source, size, fmt):
+    """Genera una miniatura de como máximo ``size`` x ``size`` píxeles"""
+    pil_format, _ = FORMATS[fmt]
+    try:
+        image = Image.open(io.BytesIO(source))
+        if image.width * image.height > MAX_PIXELS:
+            raise ImageError('Imagen demasiado grande')
+        # En JPEG decodifica directamente a una escala reducida (mucho más rápido)
+        image.draft('RGB', (size, size))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((size, size))
+
+        if pil_format == 'JPEG' or image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGB' if pil_format == 'JPEG' else 'RGBA')
+
+        output = io.BytesIO()
+        image.save(output, pil_format, quality=80, optimize=pil_format == 'JPEG', method=4)
+        return output.getvalue()
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise ImageError(f'No se pudo procesar la imagen: {e}')
+
+
+class DiskCache:
+    """Archivos en un directorio con tamaño total limitado y expulsión LRU"""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.size = None
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def get(self, name):
+        """Ruta del archivo si está en caché (y lo marca como usado), o None"""
+        path = self.path(name)
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            return None
+        now = time.time()
+        if now - mtime > TOUCH_INTERVAL:
+            try:
+                os.utime(path, (now, now))
+            except FileNotFoundError:
+                return None
+        return path
+
+    def put(self, name, data):
+        os.makedirs(self.directory, exist_ok=True)
+        # Escritura atómica: otro proceso nunca ve un archivo a medias
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path(name))
+
+        with self.lock:
+            if self.size is None:
+                self.size = self.disk_usage()
+            else:
+                self.size += len(data)
+            if self.size > self.max_bytes:
+                self.evict()
+        return self.path(name)
+
+    def entries(self):
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.startswith('.tmp-'):
+                    continue
+                try:
+                    yield entry.name, entry.stat()
+                except FileNotFoundError:
+                    pass  # Borrado por otro proceso
+
+    def disk_usage(self):
+        return sum(stat.st_size for _, stat in self.entries())
+
+    def evict(self):
+        """Borra los archivos usados hace más tiempo hasta bajar de EVICT_TARGET"""
+        entries = sorted(self.entries(), key=lambda entry: entry[1].st_mtime)
+        size = sum(stat.st_size for _, stat in entries)
+        target = self.max_bytes * EVICT_TARGET
+        for name, stat in entries:
+            if size <= target:
+                break
+            try:
+                os.remove(self.path(name))
+            except FileNotFoundError:
+                pass
+            size -= stat.st_size
+        self.size = size
+
+
+_disk_cache = None
+_disk_cache_lock = threading.Lock()
+
+
+def get_disk_cache():
+    global _disk_cache
+    if _disk_cache is None:
+        with _disk_cache_lock:
+            if _disk_cache is None:
+                _disk_cache = DiskCache(
+                    str(settings.PRODUCTOS_IMAGENES_DIR),
+                    settings.PRODUCTOS_IMAGENES_MAX_DISCO,
+                )
+    return _disk_cache
+
+
+def get_source(url, name):
+    disk = get_disk_cache()
+    path = disk.get(name)
+    if path is not None:
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            pass  # Expulsado de la caché entre medias
+    data = download(url)
+    disk.put(name, data)
+    return data
+
+
+def get_thumbnail(url, size, fmt):
+    """
+    Ruta en disco de la miniatura de ``url``. Si varias peticiones piden a la
+    vez la misma, solo una la descarga y la genera.
+    """
+    key = hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]
+    name = f'{key}-{size}.{fmt}'
+    disk = get_disk_cache()
+
+    path = disk.get(name)
+    if path is not None:
+        return path
+
+    def build():
+        cached = disk.get(name)
+        if cached is not None:
+            return cached
+        source = singleflight.group.do(f'imagen:{key}', lambda: get_source(url, f'{key}.orig'))
+        return disk.put(name, make_thumbnail(source, SIZES[size], fmt))
+
+    return singleflight.group.do(f'imagen:{name}', build)
@@ -0,0 +1,146 @@
+"""
+Invalidación de la caché cuando cambia el catálogo y contadores de versión.
+
+Cada recurso ('catalogo', 'categorias', 'listas', 'producto:<id>' y cada
+página del listado) tiene un contador en la tabla ``Version`` que se
+incrementa cada vez que cambia, junto con el instante del último cambio. Las
+vistas los usan para las cabeceras ETag/Last-Modified (ver ``condicional`` en
+productos/views.py) y los contadores de 'listas' y de cada página forman
+parte de la clave de las páginas cacheadas del listado.
+
+Al estar en la base de datos, los cambios hechos por otro worker, por
+``sync_catalog`` o por ``procesar_mutaciones`` cambian las claves y los ETag
+de todos los procesos, aunque cada uno tenga su propia caché en memoria.
+
+Solo los cambios escriben en la tabla: leer la versión de un recurso que no
+tiene fila devuelve ``NUNCA`` sin crearla, así que pedir páginas o productos
+arbitrarios no la hace crecer. Un contador nuevo empieza en el reloj
+(microsegundos), así que si se borra la fila no repite un valor anterior y los
+ETag antiguos dejan de coincidir.
+"""
+import time
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Product, SyncState, Version
+
+
+CATALOGO = 'catalogo'
+CATEGORIAS = 'categorias'
+LISTAS = 'listas'
+
+BATCH_SIZE = 500  # Contadores por consulta (límite de parámetros de SQLite)
+# Versión de un recurso sin fila. Los contadores creados al cambiar empiezan en
+# el reloj, así que nunca coinciden con este valor.
+NUNCA = (0, 0.0)
+
+
+def producto(product_id):
+    return f'producto:{product_id}'
+
+
+def pagina(page, per_page):
+    return f'lista:{per_page}:{page}'
+
+
+def _new_counter():
+    return time.time_ns() // 1000
+
+
+def _batches(names):
+    names = list(names)
+    for i in range(0, len(names), BATCH_SIZE):
+        yield names[i:i + BATCH_SIZE]
+
+
+def get_versions(names):
+    """
+    Devuelve {nombre: (contador, timestamp del último cambio)} con una sola
+    consulta. Las lecturas no escriben: un recurso que aún no ha cambiado nunca
+    (ej: una página cualquiera en ``?page=N``) no tiene fila y vale ``NUNCA``.
+    """
+    names = list(names)
+    rows = {
+        name: (counter, modified_at.timestamp())
+        for name, counter, modified_at in Version.objects.filter(name__in=set(names)).values_list(
+            'name', 'counter', 'modified_at',
+        )
+    }
+    return {name: rows.get(name, NUNCA) for name in names}
+
+
+def get_version(name):
+    """Devuelve (contador, timestamp del último cambio) de un recurso"""
+    return get_versions([name])[name]
+
+
+def get_counters(names):
+    """Contadores de varios recursos con una sola consulta"""
+    return {name: counter for name, (counter, _) in get_versions(names).items()}
+
+
+def bump_versions(names):
+    """Incrementa los contadores de varios recursos"""
+    now = timezone.now()
+    for batch in _batches(dict.fromkeys(names)):
+        updated = Version.objects.filter(name__in=batch).update(counter=F('counter') + 1, modified_at=now)
+        if updated < len(batch):
+            existing = set(Version.objects.filter(name__in=batch).values_list('name', flat=True))
+            Version.objects.bulk_create(
+                [Version(name=name, counter=_new_counter(), modified_at=now)
+                 for name in batch if name not in existing],
+                ignore_conflicts=True,
+            )
+
+
+def bump_version(name):
+    bump_versions([name])
+
+
+def list_key(page, per_page):
+    """Clave en caché de una página del listado de la página de inicio"""
+    versions = get_counters([LISTAS, pagina(page, per_page)])
+    return f'productos:lista:{versions[LISTAS]}:{versions[pagina(page, per_page)]}:{page}:{per_page}'
+
+
+def mirror_covers(product_id):
+    """Indica si el espejo tiene el listado completo hasta ``product_id``"""
+    state = SyncState.objects.filter(name='products').first()
+    if state is None:
+        return False
+    return state.completed_at is not None or (state.last_id is not None and product_id <= state.last_id)
+
+
+def products_saved(product_ids):
+    """Registra productos nuevos o modificados en el espejo (los ETag dejan de coincidir)"""
+    if product_ids:
+        bump_versions([producto(product_id) for product_id in product_ids] + [CATALOGO])
+
+
+def product_changed(product_id, created=False, deleted=False):
+    """
+    Invalida lo que depende de un producto tras crearlo, editarlo o eliminarlo
+    desde la aplicación. Se llama después de actualizar el espejo.
+    """
+    names = [producto(product_id), CATALOGO]
+    per_page = settings.PRODUCTOS_POR_PAGINA
+    if mirror_covers(product_id):
+        page = Product.objects.filter(id__lt=product_id).count() // per_page + 1
+        if created or deleted:
+            # Las altas y bajas desplazan los productos de las páginas siguientes
+            last_page = Product.objects.count() // per_page + 2
+            pages = range(page, last_page + 1)
+        else:
+            pages = [page]
+        names.extend(pagina(p, per_page) for p in pages)
+    else:
+        # No se sabe en qué página está: se descartan todas
+        names.append(LISTAS)
+    bump_versions(names)
+
+
+def catalog_synced(product_ids):
+    """Invalida listados y versiones tras una sincronización con cambios"""
+    bump_versions([producto(product_id) for product_id in product_ids] + [CATALOGO, LISTAS])
@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from productos.mutations import process_batch
+
+
+class Command(BaseCommand):
+    """
+    Envía a la API los cambios de productos encolados por las vistas cuando
+    ``PRODUCTOS_ESCRITURA_DIFERIDA`` está activo (ver productos/mutations.py).
+
+    Sin --once se queda en bucle: procesa lotes mientras haya cambios listos y
+    espera --interval segundos cuando la cola está vacía.
+
+    Uso: python manage.py procesar_mutaciones --batch-size 20
+    """
+    help = 'Envía a la API de Platzi los cambios de productos pendientes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.PRODUCTOS_MUTACIONES_LOTE,
+                            help='Cambios enviados a la API por lote')
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help='Segundos de espera cuando no hay cambios pendientes')
+        parser.add_argument('--once', action='store_true',
+                            help='Procesar los cambios listos y terminar')
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+
+        try:
+            while True:
+                processed = process_batch(batch_size)
+                if processed:
+                    self.stdout.write(f'{processed} cambios procesados')
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS('Cola de cambios procesada'))
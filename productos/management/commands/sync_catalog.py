@@ -0,0 +1,190 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from productos import api, invalidation
+from productos.categories import invalidar_categorias
+from productos.mirror import CATEGORY_FIELDS, PRODUCT_FIELDS, category_from_api, product_from_api
+from productos.models import Category, Product, SyncState
+
+
+CHECKPOINT_NAME = 'sync_catalog:products'
+
+
+class Command(BaseCommand):
+    """
+    Sincroniza el espejo local (Product/Category) con la API de Platzi.
+
+    Recorre el listado de productos por páginas (offset/limit), compara la
+    huella de contenido de cada fila con la guardada y solo escribe las filas
+    nuevas o modificadas, en lotes. Tras cada página guarda un punto de control
+    para poder reanudar si el proceso se interrumpe; en la misma transacción
+    incrementa las versiones de lo que cambió (ver productos/invalidation.py),
+    así que lo ya escrito se invalida aunque el proceso no llegue al final.
+
+    Uso: python manage.py sync_catalog --page-size 100 --concurrency 4
+    """
+    help = 'Sincroniza productos y categorías de la API de Platzi con la base de datos local'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100,
+                            help='Productos pedidos a la API por página')
+        parser.add_argument('--concurrency', type=int, default=4,
+                            help='Páginas descargadas en paralelo')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Filas por consulta de bulk_create/bulk_update')
+        parser.add_argument('--restart', action='store_true',
+                            help='Ignorar el punto de control y empezar desde el principio')
+        parser.add_argument('--prune', action='store_true',
+                            help='Eliminar productos locales que ya no existen en la API')
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        page_size = options['page_size']
+        concurrency = max(options['concurrency'], 1)
+
+        try:
+            self.sync_categories()
+
+            checkpoint, _ = SyncState.objects.get_or_create(name=CHECKPOINT_NAME)
+            if options['restart']:
+                checkpoint.offset = 0
+            start = checkpoint.offset
+            if start:
+                self.stdout.write(f'Reanudando desde el offset {start}')
+
+            seen_ids = set()
+            offset = start
+            finished = False
+
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                while not finished:
+                    offsets = [offset + i * page_size for i in range(concurrency)]
+                    pages = executor.map(lambda o: self.fetch_page(o, page_size), offsets)
+
+                    # Las páginas se aplican en orden para que el punto de control sea válido
+                    for page_offset, page in zip(offsets, pages):
+                        with transaction.atomic():
+                            created, updated = self.apply_products(page)
+                            changed_ids = [product.pk for product in created + updated]
+                            if changed_ids:
+                                invalidation.catalog_synced(changed_ids)
+
+                            offset = page_offset + len(page)
+                            checkpoint.offset = offset
+                            checkpoint.save(update_fields=['offset', 'updated_at'])
+                        seen_ids.update(p['id'] for p in page if p.get('id') is not None)
+                        self.stdout.write(
+                            f'Offset {page_offset}: {len(page)} productos, '
+                            f'{len(created)} nuevos, {len(updated)} actualizados'
+                        )
+
+                        if len(page) < page_size:
+                            finished = True
+                            break
+
+        except requests.exceptions.RequestException as e:
+            raise CommandError(f'Error al conectar con la API: {e}')
+
+        if options['prune']:
+            if start:
+                self.stdout.write(self.style.WARNING(
+                    'Se omite --prune: la sincronización se reanudó desde un punto de control'
+                ))
+            else:
+                with transaction.atomic():
+                    stale = Product.objects.exclude(id__in=seen_ids)
+                    stale_ids = list(stale.values_list('id', flat=True))
+                    deleted, _ = stale.delete()
+                    if stale_ids:
+                        invalidation.catalog_synced(stale_ids)
+                self.stdout.write(f'{deleted} productos eliminados')
+
+        # Sincronización completa: el espejo ya puede servir todo el listado
+        checkpoint.offset = 0
+        checkpoint.completed_at = timezone.now()
+        checkpoint.save()
+        SyncState.objects.update_or_create(
+            name='products',
+            defaults={
+                'last_id': Product.objects.order_by('-id').values_list('id', flat=True).first(),
+                'completed_at': timezone.now(),
+            },
+        )
+
+        self.stdout.write(self.style.SUCCESS('Catálogo sincronizado'))
+
+    def fetch_page(self, offset, limit):
+        response = api.get('products', params={'offset': offset, 'limit': limit})
+        response.raise_for_status()
+        data = response.json()
+        return data if isinstance(data, list) else [data]
+
+    def sync_categories(self):
+        response = api.get('categories')
+        response.raise_for_status()
+        categories = [category_from_api(c) for c in response.json() if c.get('id') is not None]
+
+        created, updated = self.apply_changes(Category, categories, CATEGORY_FIELDS)
+        if created or updated:
+            invalidar_categorias()
+        self.stdout.write(f'Categorías: {len(created)} nuevas, {len(updated)} actualizadas')
+
+    def apply_products(self, page):
+        products = [product_from_api(p) for p in page if p.get('id') is not None]
+
+        # Categorías que aparecen en productos pero no en /categories
+        category_ids = {p.category_id for p in products if p.category_id is not None}
+        known = set(Category.objects.filter(id__in=category_ids).values_list('id', flat=True))
+        missing = {
+            p['category']['id']: category_from_api(p['category'])
+            for p in page
+            if (p.get('category') or {}).get('id') in category_ids - known
+        }
+        if missing:
+            Category.objects.bulk_create(missing.values(), ignore_conflicts=True)
+
+        return self.apply_changes(Product, products, PRODUCT_FIELDS)
+
+    def apply_changes(self, model, objects, fields):
+        """
+        Inserta las filas nuevas y actualiza solo las que cambiaron de huella.
+        Devuelve las listas de filas creadas y actualizadas.
+        """
+        objects = {obj.pk: obj for obj in objects}
+        hashes = dict(
+            model.objects.filter(pk__in=objects.keys()).values_list('pk', 'content_hash')
+        )
+
+        now = timezone.now()
+        to_create = []
+        to_update = []
+        unchanged = []
+        for pk, obj in objects.items():
+            obj.synced_at = now
+            if pk not in hashes:
+                to_create.append(obj)
+            elif hashes[pk] != obj.content_hash:
+                to_update.append(obj)
+            else:
+                unchanged.append(pk)
+
+        with transaction.atomic():
+            # Las vistas también insertan en el espejo (read-through): si otra petición
+            # crea la fila entre la lectura de huellas y esta inserción, se actualiza
+            model.objects.bulk_create(
+                to_create,
+                batch_size=self.batch_size,
+                update_conflicts=True,
+                unique_fields=['id'],
+                update_fields=fields + ['synced_at'],
+            )
+            model.objects.bulk_update(to_update, fields + ['synced_at'], batch_size=self.batch_size)
+            # Las filas sin cambios también quedan confirmadas (ver PRODUCTOS_ESPEJO_MAX_EDAD)
+            for i in range(0, len(unchanged), self.batch_size):
+                model.objects.filter(pk__in=unchanged[i:i + self.batch_size]).update(synced_at=now)
+
+        return to_create, to_update
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('slug', models.CharField(blank=True, max_length=255)),
+                ('image', models.TextField(blank=True)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'categoría',
+                'verbose_name_plural': 'categorías',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SyncState',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('last_id', models.IntegerField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Product',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('slug', models.CharField(blank=True, max_length=255)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('description', models.TextField(blank=True)),
+                ('images', models.JSONField(blank=True, default=list)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='products', to='productos.category')),
+            ],
+            options={
+                'verbose_name': 'producto',
+                'verbose_name_plural': 'productos',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['category', 'price'], name='producto_categoria_precio_idx'), models.Index(fields=['price'], name='producto_precio_idx'), models.Index(fields=['title'], name='producto_titulo_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,84 @@
+from django.db import migrations
+
+
+# Índice de texto completo sobre título (peso A) y descripción (peso B).
+# Se usa la configuración 'simple' porque el catálogo mezcla idiomas.
+POSTGRES_FORWARDS = [
+    """
+    ALTER TABLE productos_product ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX producto_busqueda_gin_idx ON productos_product USING GIN (search_vector)",
+]
+
+POSTGRES_BACKWARDS = [
+    "DROP INDEX IF EXISTS producto_busqueda_gin_idx",
+    "ALTER TABLE productos_product DROP COLUMN IF EXISTS search_vector",
+]
+
+# Tabla FTS5 de contenido externo, mantenida por triggers sobre productos_product
+SQLITE_FORWARDS = [
+    """
+    CREATE VIRTUAL TABLE productos_product_fts USING fts5(
+        title, description,
+        content='productos_product', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER productos_product_fts_ai AFTER INSERT ON productos_product BEGIN
+        INSERT INTO productos_product_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER productos_product_fts_ad AFTER DELETE ON productos_product BEGIN
+        INSERT INTO productos_product_fts(productos_product_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER productos_product_fts_au AFTER UPDATE ON productos_product BEGIN
+        INSERT INTO productos_product_fts(productos_product_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO productos_product_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO productos_product_fts(productos_product_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARDS = [
+    "DROP TRIGGER IF EXISTS productos_product_fts_ai",
+    "DROP TRIGGER IF EXISTS productos_product_fts_ad",
+    "DROP TRIGGER IF EXISTS productos_product_fts_au",
+    "DROP TABLE IF EXISTS productos_product_fts",
+]
+
+
+def run_for_vendor(postgres_sql, sqlite_sql):
+    def run(apps, schema_editor):
+        statements = {
+            'postgresql': postgres_sql,
+            'sqlite': sqlite_sql,
+        }.get(schema_editor.connection.vendor, [])
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0002_content_hash_sync_offset'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor(POSTGRES_FORWARDS, SQLITE_FORWARDS),
+            run_for_vendor(POSTGRES_BACKWARDS, SQLITE_BACKWARDS),
+        ),
+    ]
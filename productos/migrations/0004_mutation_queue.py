@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0003_product_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Mutation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('create', 'Crear'), ('update', 'Editar'), ('delete', 'Eliminar')], max_length=10)),
+                ('product_id', models.IntegerField(blank=True, null=True)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('processing', 'Enviando'), ('done', 'Completado'), ('failed', 'Fallido')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'cambio pendiente',
+                'verbose_name_plural': 'cambios pendientes',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'id'], name='mutacion_estado_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,225 @@
+"""
+Espejo local (read-through) del catálogo de la API de Platzi.
+
+Las vistas leen primero de las tablas ``Product``/``Category``. Cuando un
+producto o una página no están en el espejo se piden a la API y se guardan,
+de modo que la siguiente lectura es una única consulta indexada.
+
+``synced_at`` guarda la última vez que la API confirmó cada producto (aunque
+no hubiera cambiado). Los productos confirmados hace más de
+``PRODUCTOS_ESPEJO_MAX_EDAD`` segundos se tratan como ausentes y se vuelven a
+pedir a la API; solo se sirven si la API no responde (``partial``).
+
+Las vistas rellenan el espejo con ``fill``: si la escritura falla (base de
+datos bloqueada, caída...) se registra el error y se sirven igualmente los
+datos que ya llegaron de la API.
+"""
+import hashlib
+import json
+import logging
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from . import autocomplete, invalidation
+from .models import Category, Product, SyncState
+
+
+PRODUCT_FIELDS = ['title', 'slug', 'price', 'description', 'images', 'category', 'content_hash']
+CATEGORY_FIELDS = ['name', 'slug', 'image', 'content_hash']
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(*values):
+    """Huella del contenido de una fila, para detectar cambios sin compararla campo a campo"""
+    raw = json.dumps(values, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def category_from_api(data):
+    """Construye una Category (sin guardar) a partir de la respuesta de la API"""
+    category = Category(
+        id=data['id'],
+        name=data.get('name', ''),
+        slug=data.get('slug') or '',
+        image=data.get('image') or '',
+    )
+    category.content_hash = content_hash(category.name, category.slug, category.image)
+    return category
+
+
+def product_from_api(data):
+    """Construye un Product (sin guardar) a partir de la respuesta de la API"""
+    try:
+        price = Decimal(str(data.get('price', 0)))
+    except InvalidOperation:
+        price = Decimal('0')
+
+    category = data.get('category') or {}
+    images = data.get('images') or []
+
+    product = Product(
+        id=data['id'],
+        title=data.get('title', ''),
+        slug=data.get('slug') or '',
+        price=price,
+        description=data.get('description') or '',
+        images=[image for image in images if isinstance(image, str)],
+        category_id=category.get('id'),
+    )
+    product.content_hash = content_hash(
+        product.title, product.slug, product.price, product.description,
+        product.images, product.category_id,
+    )
+    return product
+
+
+def save_categories(categories_data):
+    """Inserta o actualiza varias categorías en una sola consulta; devuelve los IDs que cambiaron"""
+    categories = {c['id']: category_from_api(c) for c in categories_data if c.get('id') is not None}
+    if not categories:
+        return []
+
+    hashes = dict(Category.objects.filter(pk__in=categories.keys()).values_list('pk', 'content_hash'))
+    changed = [pk for pk, category in categories.items() if hashes.get(pk) != category.content_hash]
+    if changed:
+        Category.objects.bulk_create(
+            [categories[pk] for pk in changed],
+            update_conflicts=True,
+            unique_fields=['id'],
+            update_fields=CATEGORY_FIELDS,
+        )
+        invalidation.bump_version(invalidation.CATEGORIAS)
+    return changed
+
+
+def save_products(products_data):
+    """Inserta o actualiza varios productos (y sus categorías); solo escribe los que cambiaron"""
+    products_data = [p for p in products_data if p.get('id') is not None]
+    save_categories([p['category'] for p in products_data if p.get('category')])
+
+    products = {p['id']: product_from_api(p) for p in products_data}
+    if products:
+        hashes = dict(Product.objects.filter(pk__in=products.keys()).values_list('pk', 'content_hash'))
+        changed = [pk for pk, product in products.items() if hashes.get(pk) != product.content_hash]
+        unchanged = products.keys() - set(changed)
+        if unchanged:
+            # La API los ha confirmado: vuelven a contar como recientes
+            Product.objects.filter(pk__in=unchanged).update(synced_at=timezone.now())
+        if not changed:
+            return
+
+        Product.objects.bulk_create(
+            [products[pk] for pk in changed],
+            update_conflicts=True,
+            unique_fields=['id'],
+            update_fields=PRODUCT_FIELDS + ['synced_at'],
+        )
+        for pk in changed:
+            autocomplete.update_product(pk, products[pk].title)
+        invalidation.products_saved(changed)
+
+
+def save_product(product_data):
+    save_products([product_data])
+
+
+def delete_product(product_id):
+    Product.objects.filter(pk=product_id).delete()
+    autocomplete.remove_product(product_id)
+
+
+def fill(save, *args):
+    """
+    Guarda en el espejo datos recibidos de la API (``save`` es ``save_page``,
+    ``save_products``...). Un fallo de la base de datos no hace fallar la
+    petición: el espejo se rellenará en la siguiente lectura.
+    """
+    try:
+        with transaction.atomic():
+            save(*args)
+    except DatabaseError:
+        logger.exception('Error al guardar en el espejo (%s)', save.__name__)
+
+
+def fresh_since():
+    """Instante a partir del cual un producto del espejo se considera reciente"""
+    return timezone.now() - timedelta(seconds=settings.PRODUCTOS_ESPEJO_MAX_EDAD)
+
+
+def get_product(product_id):
+    """Devuelve el producto del espejo como diccionario, o None si no está o es antiguo"""
+    product = Product.objects.select_related('category').filter(
+        pk=product_id, synced_at__gte=fresh_since(),
+    ).first()
+    return product.as_dict() if product else None
+
+
+def get_products(product_ids):
+    """Devuelve {id: producto} con los productos recientes del espejo, en una sola consulta"""
+    products = Product.objects.select_related('category').filter(synced_at__gte=fresh_since()).in_bulk(product_ids)
+    return {pk: product.as_dict() for pk, product in products.items()}
+
+
+def get_page(page, per_page, partial=False):
+    """
+    Devuelve una página del espejo con el mismo formato que
+    ``descargar_pagina_productos``, o None si el espejo todavía no tiene esa
+    página completa (en ese caso hay que pedirla a la API).
+
+    Con ``partial`` se devuelve lo que haya aunque falten productos o sean
+    antiguos; se usa como contenido degradado cuando la API no responde.
+    """
+    state = SyncState.objects.filter(name='products').first()
+    if state is None and not partial:
+        return None
+
+    offset = (page - 1) * per_page
+    products = list(
+        Product.objects.select_related('category')[offset:offset + per_page + 1]
+    )
+    has_next = len(products) > per_page
+
+    if partial:
+        if not products:
+            return None
+    else:
+        if state.completed_at is None:
+            # Solo es válida si la página cae entera dentro del tramo ya copiado
+            if not has_next or state.last_id is None or products[-1].id > state.last_id:
+                return None
+        since = fresh_since()
+        if any(p.synced_at < since for p in products[:per_page]):
+            # Algún producto lleva demasiado sin confirmarse: se pide la página a la API
+            return None
+
+    return {
+        'products': [p.as_dict() for p in products[:per_page]],
+        'has_next': has_next,
+    }
+
+
+def save_page(page, per_page, page_data):
+    """
+    Guarda una página descargada de la API y, si continúa el tramo copiado
+    sin huecos, avanza el estado del espejo.
+    """
+    state, _ = SyncState.objects.get_or_create(name='products')
+    covered = 0
+    if state.last_id is not None:
+        covered = Product.objects.filter(id__lte=state.last_id).count()
+
+    save_products(page_data['products'])
+
+    if state.completed_at is not None or (page - 1) * per_page > covered:
+        return
+
+    if page_data['products']:
+        state.last_id = max(state.last_id or 0, page_data['products'][-1]['id'])
+    if not page_data['has_next']:
+        state.completed_at = timezone.now()
+    state.save()
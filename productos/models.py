@@ -1,3 +1,187 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class Category(models.Model):
+    """
+    Copia local de una categoría de la API de Platzi.
+    Usa el mismo ID que la API.
+    """
+    id = models.IntegerField(primary_key=True)
+    name = models.CharField(max_length=255)
+    slug = models.CharField(max_length=255, blank=True)
+    image = models.TextField(blank=True)
+    content_hash = models.CharField(max_length=40, blank=True)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'categoría'
+        verbose_name_plural = 'categorías'
+
+    def __str__(self):
+        return self.name
+
+    def as_dict(self):
+        """Representación con el mismo formato que devuelve la API"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'slug': self.slug,
+            'image': self.image,
+        }
+
+
+class Product(models.Model):
+    """
+    Copia local de un producto de la API de Platzi.
+    Usa el mismo ID que la API.
+    """
+    id = models.IntegerField(primary_key=True)
+    title = models.CharField(max_length=255)
+    slug = models.CharField(max_length=255, blank=True)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    description = models.TextField(blank=True)
+    images = models.JSONField(default=list, blank=True)
+    category = models.ForeignKey(
+        Category,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='products',
+    )
+    content_hash = models.CharField(max_length=40, blank=True)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'producto'
+        verbose_name_plural = 'productos'
+        indexes = [
+            models.Index(fields=['category', 'price'], name='producto_categoria_precio_idx'),
+            models.Index(fields=['price'], name='producto_precio_idx'),
+            models.Index(fields=['title'], name='producto_titulo_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    def as_dict(self):
+        """Representación con el mismo formato que devuelve la API"""
+        return {
+            'id': self.id,
+            'title': self.title,
+            'slug': self.slug,
+            'price': self.price,
+            'description': self.description,
+            'images': self.images,
+            'category': self.category.as_dict() if self.category else {},
+        }
+
+
+class SyncState(models.Model):
+    """
+    Estado de la copia local de un recurso de la API (ej: 'products').
+
+    ``last_id`` marca hasta qué ID el espejo contiene el listado de la API sin
+    huecos y ``completed_at`` indica que el listado completo ya está copiado.
+    ``offset`` es el punto de control desde el que reanuda ``sync_catalog``.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    last_id = models.IntegerField(null=True, blank=True)
+    offset = models.IntegerField(default=0)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+
+class Version(models.Model):
+    """
+    Contador de versión de un recurso del catálogo (ej: 'catalogo',
+    'producto:4'), ver productos/invalidation.py.
+
+    Vive en la base de datos para que todos los procesos (workers web,
+    ``sync_catalog`` y ``procesar_mutaciones``) vean los mismos valores.
+    """
+    name = models.CharField(max_length=100, primary_key=True)
+    counter = models.BigIntegerField()
+    modified_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.name}: {self.counter}'
+
+
+class Mutation(models.Model):
+    """
+    Cambio de un producto (crear, editar o eliminar) pendiente de enviar a la API.
+
+    Con ``PRODUCTOS_ESCRITURA_DIFERIDA`` las vistas guardan aquí el cambio y
+    responden al momento; ``python manage.py procesar_mutaciones`` los envía
+    (ver productos/mutations.py).
+    """
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    ACTIONS = [
+        (CREATE, 'Crear'),
+        (UPDATE, 'Editar'),
+        (DELETE, 'Eliminar'),
+    ]
+
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = [
+        (PENDING, 'Pendiente'),
+        (PROCESSING, 'Enviando'),
+        (DONE, 'Completado'),
+        (FAILED, 'Fallido'),
+    ]
+
+    action = models.CharField(max_length=10, choices=ACTIONS)
+    # Usuario que hizo el cambio: solo él puede consultar su estado
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='mutations',
+    )
+    # ID del producto en la API; en las altas se rellena cuando la API responde
+    product_id = models.IntegerField(null=True, blank=True)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    result = models.JSONField(null=True, blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'cambio pendiente'
+        verbose_name_plural = 'cambios pendientes'
+        indexes = [
+            models.Index(fields=['status', 'id'], name='mutacion_estado_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_action_display()} #{self.product_id or "-"} ({self.status})'
+
+    def as_dict(self):
+        """Estado del cambio para la consulta desde la interfaz"""
+        return {
+            'id': self.id,
+            'action': self.action,
+            'product_id': self.product_id,
+            'status': self.status,
+            'status_display': self.get_status_display(),
+            'attempts': self.attempts,
+            'error': self.last_error,
+        }
@@ -0,0 +1,148 @@
+"""
+Cola de escritura diferida para crear, editar y eliminar productos.
+
+Las vistas guardan el cambio con ``enqueue`` y responden al momento. El
+comando ``procesar_mutaciones`` llama a ``process_batch`` en bucle:
+
+- Reserva hasta ``size`` cambios pendientes, como máximo uno por producto y
+  siempre el más antiguo, para que los cambios de un mismo producto lleguen a
+  la API en el orden en que se hicieron.
+- Los envía a la API en paralelo (PLATZI_API_MAX_CONCURRENCY).
+- Si la API responde, actualiza el espejo local. Los errores de conexión, 429
+  y 5xx se reintentan con espera exponencial hasta PRODUCTOS_MUTACIONES_REINTENTOS
+  veces; el resto de errores marcan el cambio como fallido.
+
+Un cambio que se queda "enviando" más de PRODUCTOS_MUTACIONES_BLOQUEO segundos
+(ej: el worker se cayó) vuelve a enviarse, así que un cambio puede llegar a la
+API más de una vez.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from . import api, invalidation, mirror
+from .models import Mutation
+
+
+RETRY_BASE = 2  # Segundos de espera tras el primer fallo; se duplica en cada intento
+RETRY_MAX = 300
+
+
+def enqueue(action, payload=None, product_id=None, user=None):
+    """Guarda un cambio para enviarlo a la API más tarde"""
+    if user is not None and not user.is_authenticated:
+        user = None
+    return Mutation.objects.create(action=action, payload=payload or {}, product_id=product_id, user=user)
+
+
+def claim_batch(size):
+    """Reserva hasta ``size`` cambios listos para enviar, respetando el orden por producto"""
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.PRODUCTOS_MUTACIONES_BLOQUEO)
+    open_mutations = Mutation.objects.filter(
+        status__in=[Mutation.PENDING, Mutation.PROCESSING],
+    ).order_by('id')
+
+    claimed = []
+    seen_products = set()
+    for mutation in open_mutations.iterator():
+        # Solo el cambio más antiguo de cada producto puede enviarse
+        if mutation.product_id is not None:
+            if mutation.product_id in seen_products:
+                continue
+            seen_products.add(mutation.product_id)
+
+        if mutation.status == Mutation.PENDING and mutation.available_at > now:
+            continue
+        if mutation.status == Mutation.PROCESSING and mutation.locked_at > stale:
+            continue
+
+        # Reserva atómica: si otro worker la reservó antes no se actualiza ninguna fila
+        reserved = Mutation.objects.filter(
+            pk=mutation.pk, status=mutation.status, locked_at=mutation.locked_at,
+        ).update(status=Mutation.PROCESSING, locked_at=now, attempts=F('attempts') + 1)
+        if not reserved:
+            continue
+
+        mutation.status = Mutation.PROCESSING
+        mutation.locked_at = now
+        mutation.attempts += 1
+        claimed.append(mutation)
+        if len(claimed) >= size:
+            break
+    return claimed
+
+
+def send(mutation):
+    """Envía un cambio a la API y devuelve la respuesta"""
+    if mutation.action == Mutation.CREATE:
+        return api.post('products', json=mutation.payload)
+    if mutation.action == Mutation.UPDATE:
+        return api.put(f'products/{mutation.product_id}', json=mutation.payload)
+    return api.delete(f'products/{mutation.product_id}')
+
+
+def is_retryable(response):
+    return response.status_code == 429 or response.status_code >= 500
+
+
+def finish(mutation, response=None, error=None):
+    """Guarda el resultado de un envío y actualiza el espejo local si tuvo éxito"""
+    if error is None and response.status_code < 400:
+        if mutation.action == Mutation.DELETE:
+            mirror.delete_product(mutation.product_id)
+            invalidation.product_changed(mutation.product_id, deleted=True)
+            mutation.result = None
+        else:
+            try:
+                data = response.json()
+            except ValueError:
+                data = {}
+            if data.get('id') is not None:
+                mirror.save_product(data)
+                mutation.product_id = data['id']
+            if mutation.product_id is not None:
+                invalidation.product_changed(mutation.product_id, created=mutation.action == Mutation.CREATE)
+            mutation.result = data
+        mutation.status = Mutation.DONE
+        mutation.last_error = ''
+    else:
+        if error is not None:
+            mutation.last_error = f'Error al conectar con la API: {error}'
+        else:
+            mutation.last_error = f'Error HTTP {response.status_code}: {response.text[:500]}'
+
+        retry = error is not None or is_retryable(response)
+        if retry and mutation.attempts < settings.PRODUCTOS_MUTACIONES_REINTENTOS:
+            delay = min(RETRY_BASE * 2 ** (mutation.attempts - 1), RETRY_MAX)
+            mutation.status = Mutation.PENDING
+            mutation.available_at = timezone.now() + timedelta(seconds=delay)
+        else:
+            mutation.status = Mutation.FAILED
+
+    mutation.locked_at = None
+    mutation.save()
+
+
+def process_batch(size):
+    """Envía un lote de cambios y devuelve cuántos se procesaron"""
+    batch = claim_batch(size)
+    if not batch:
+        return 0
+
+    # Los hilos solo llaman a la API; la base de datos se actualiza en este hilo
+    workers = min(len(batch), settings.PLATZI_API_MAX_CONCURRENCY)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [(mutation, executor.submit(send, mutation)) for mutation in batch]
+        for mutation, future in futures:
+            try:
+                response = future.result()
+            except requests.exceptions.RequestException as e:
+                finish(mutation, error=e)
+            else:
+                finish(mutation, response=response)
+    return len(batch)
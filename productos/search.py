@@ -0,0 +1,123 @@
+"""
+Búsqueda de texto completo sobre el espejo local de productos.
+
+Usa el índice creado en la migración 0003_product_search_index:
+- PostgreSQL: columna ``search_vector`` (tsvector) con índice GIN, ordenada
+  por ``ts_rank_cd``.
+- SQLite: tabla virtual FTS5 ``productos_product_fts``, ordenada por ``bm25``.
+
+Con otros motores se recurre a ``icontains`` sin ranking.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Product
+
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    return TOKEN_RE.findall(query.lower())
+
+
+def build_filters(category_id, min_price, max_price):
+    """Condiciones SQL adicionales (sobre el alias ``p``) y sus parámetros"""
+    conditions = []
+    params = []
+    if category_id:
+        conditions.append('p.category_id = %s')
+        params.append(category_id)
+    if min_price is not None:
+        conditions.append('p.price >= %s')
+        params.append(min_price)
+    if max_price is not None:
+        conditions.append('p.price <= %s')
+        params.append(max_price)
+    return ''.join(f' AND {c}' for c in conditions), params
+
+
+def search_ids_postgresql(tokens, filters, filter_params, limit, offset):
+    # Los tokens solo contienen caracteres de palabra, así que se pueden
+    # combinar con '&'. El último término admite prefijo (':*').
+    terms = tokens[:-1] + [f'{tokens[-1]}:*']
+    sql = f"""
+        SELECT p.id, count(*) OVER () AS total
+        FROM productos_product p, to_tsquery('simple', %s) query
+        WHERE p.search_vector @@ query{filters}
+        ORDER BY ts_rank_cd(p.search_vector, query) DESC, p.id
+        LIMIT %s OFFSET %s
+    """
+    return sql, [' & '.join(terms), *filter_params, limit, offset]
+
+
+def search_ids_sqlite(tokens, filters, filter_params, limit, offset):
+    # Cada término entre comillas: FTS5 no interpreta operadores del usuario.
+    # El último término admite prefijo para encontrar palabras incompletas.
+    terms = [f'"{t}"' for t in tokens]
+    terms[-1] += '*'
+    sql = f"""
+        SELECT p.id, count(*) OVER () AS total
+        FROM (
+            SELECT rowid, bm25(productos_product_fts, 10.0, 1.0) AS rank
+            FROM productos_product_fts
+            WHERE productos_product_fts MATCH %s
+        ) f
+        JOIN productos_product p ON p.id = f.rowid
+        WHERE 1 = 1{filters}
+        ORDER BY f.rank, p.id
+        LIMIT %s OFFSET %s
+    """
+    return sql, [' '.join(terms), *filter_params, limit, offset]
+
+
+def search_ids_fallback(tokens, category_id, min_price, max_price, limit, offset):
+    products = Product.objects.all()
+    for token in tokens:
+        products = products.filter(Q(title__icontains=token) | Q(description__icontains=token))
+    if category_id:
+        products = products.filter(category_id=category_id)
+    if min_price is not None:
+        products = products.filter(price__gte=min_price)
+    if max_price is not None:
+        products = products.filter(price__lte=max_price)
+    return list(products.values_list('id', flat=True)[offset:offset + limit]), products.count()
+
+
+def search_products(query, category_id=None, min_price=None, max_price=None, page=1, per_page=12):
+    """
+    Busca productos por palabras clave en título y descripción.
+
+    Devuelve un diccionario con los productos de la página (en el mismo
+    formato que la API), el total de resultados y si hay página siguiente.
+    """
+    tokens = tokenize(query)
+    offset = (page - 1) * per_page
+    if not tokens:
+        return {'products': [], 'total': 0, 'has_next': False}
+
+    builders = {
+        'postgresql': search_ids_postgresql,
+        'sqlite': search_ids_sqlite,
+    }
+    builder = builders.get(connection.vendor)
+
+    if builder is None:
+        ids, total = search_ids_fallback(tokens, category_id, min_price, max_price, per_page, offset)
+    else:
+        filters, filter_params = build_filters(category_id, min_price, max_price)
+        sql, params = builder(tokens, filters, filter_params, per_page, offset)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        ids = [row[0] for row in rows]
+        total = rows[0][1] if rows else 0
+
+    products = Product.objects.select_related('category').in_bulk(ids)
+    return {
+        'products': [products[pk].as_dict() for pk in ids if pk in products],
+        'total': total,
+        'has_next': offset + len(ids) < total,
+    }
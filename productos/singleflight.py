@@ -0,0 +1,69 @@
+"""
+Coalescencia de llamadas idénticas concurrentes ("single-flight").
+
+Si varias peticiones necesitan a la vez el mismo recurso (misma clave), solo
+la primera ejecuta la función y el resto espera y recibe su mismo resultado
+(o su misma excepción).
+
+- ``group.do(key, fn)``: entre hilos del mismo proceso.
+- ``ado(key, coro_fn)``: entre corrutinas del mismo event loop.
+
+La coordinación entre workers se hace en productos/cache.py con un candado en
+la caché compartida.
+"""
+import asyncio
+import threading
+import weakref
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class Group:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.event.set()
+        return call.result
+
+
+group = Group()
+
+_async_calls = weakref.WeakKeyDictionary()
+
+
+async def ado(key, coro_fn):
+    loop = asyncio.get_running_loop()
+    tasks = _async_calls.setdefault(loop, {})
+    task = tasks.get(key)
+    if task is None:
+        task = tasks[key] = loop.create_task(coro_fn())
+        task.add_done_callback(lambda _: tasks.pop(key, None))
+    # shield: si una petición se cancela no cancela la llamada compartida
+    return await asyncio.shield(task)
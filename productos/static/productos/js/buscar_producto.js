@@ -0,0 +1,101 @@
+// URL del autocompletado (data-* del <script>)
+const autocompleteUrl = document.currentScript.dataset.autocompleteUrl;
+
+function showLoading() {
+    document.getElementById('search-text').style.display = 'none';
+    document.getElementById('search-loading').style.display = 'inline-block';
+}
+
+function searchSuggestion(id) {
+    const inputField = document.querySelector('input[name="product_id"]');
+    inputField.value = id;
+    document.querySelector('form').submit();
+}
+
+function addToCart(productId) {
+    showMessage('Producto agregado al carrito correctamente', 'success');
+}
+
+function shareProduct(productId) {
+    if (navigator.share) {
+        navigator.share({
+            title: 'Producto en Platzi Fake Store',
+            text: 'Mira este increíble producto que encontré',
+            url: window.location.href
+        });
+    } else {
+        const url = window.location.href;
+        navigator.clipboard.writeText(url).then(() => {
+            showMessage('Enlace copiado al portapapeles', 'info');
+        });
+    });
+}
+
+function showMessage(text, type) {
+    const messageDiv = document.createElement('div');
+    messageDiv.className = `message message-${type}`;
+    messageDiv.style.position = 'fixed';
+    messageDiv.style.top = '20px';
+    messageDiv.style.right = '20px';
+    messageDiv.style.zIndex = '9999';
+    messageDiv.style.minWidth = '300px';
+    messageDiv.innerHTML = `
+        <svg width="20" height="20" fill="currentColor" viewBox="0 0 24 24" style="margin-right: 0.5rem;">
+            <path d="M9 16.2L4.8 12l-1.4 1.4L9 19 21 7l-1.4-1.4L9 16.2z"/>
+        </svg>
+        ${text}
+    `;
+
+    document.body.appendChild(messageDiv);
+
+    setTimeout(() => {
+        messageDiv.style.opacity = '0';
+        messageDiv.style.transform = 'translateX(100%)';
+        setTimeout(() => {
+            if (document.body.contains(messageDiv)) {
+                document.body.removeChild(messageDiv);
+            }
+        }, 300);
+    }, 3000);
+}
+
+// Autocompletado del buscador por palabras clave
+(function() {
+    const input = document.querySelector('input[name="q"]');
+    const datalist = document.getElementById('sugerencias');
+    if (!input || !datalist) {
+        return;
+    }
+    input.setAttribute('list', 'sugerencias');
+    input.setAttribute('autocomplete', 'off');
+
+    let timer = null;
+    input.addEventListener('input', function() {
+        clearTimeout(timer);
+        const query = input.value.trim();
+        if (query.length < 2) {
+            return;
+        }
+        timer = setTimeout(() => {
+            fetch(`${autocompleteUrl}?q=${encodeURIComponent(query)}`)
+                .then(response => response.json())
+                .then(data => {
+                    datalist.innerHTML = '';
+                    data.results.forEach(product => {
+                        const option = document.createElement('option');
+                        option.value = product.title;
+                        datalist.appendChild(option);
+                    });
+                })
+                .catch(() => {});
+        }, 150);
+    });
+})();
+
+// Auto-focus en el campo de búsqueda
+document.addEventListener('DOMContentLoaded', function() {
+    const inputField = document.querySelector('input[name="product_id"]');
+    if (inputField) {
+        inputField.focus();
+    }
+});
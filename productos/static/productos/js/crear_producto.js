@@ -0,0 +1,383 @@
+    // SCRIPT CORREGIDO - Búsqueda flexible de elementos
+
+// Función para encontrar elementos de manera flexible
+function findElement(selectors) {
+    for (let selector of selectors) {
+        const element = document.querySelector(selector);
+        if (element) {
+            console.log(`✅ Elemento encontrado con selector: ${selector}`);
+            return element;
+        }
+    }
+    console.error(`❌ No se encontró elemento con ninguno de estos selectores:`, selectors);
+    return null;
+}
+
+// Búsqueda flexible de elementos del formulario
+const titleInput = findElement(['#id_title', 'input[name="title"]', 'input[type="text"]']);
+const priceInput = findElement(['#id_price', 'input[name="price"]']);
+const descriptionInput = findElement(['#id_description', 'textarea[name="description"]', 'textarea']);
+const imageInput = findElement(['#id_image', 'input[name="image"]', 'input[placeholder*="imagen"]', 'input[placeholder*="URL"]']);
+const categoryInput = findElement(['#id_category', 'select[name="category"]', 'select']);
+
+// Búsqueda flexible de elementos de vista previa
+const previewTitle = findElement(['#preview-title']);
+const previewPrice = findElement(['#preview-price']);
+const previewDescription = findElement(['#preview-description']);
+const previewImage = findElement(['#preview-image']);
+const previewCategory = findElement(['#preview-category']);
+
+// Debug: Verificar que los elementos existen
+console.log('=== DEBUG: Elementos encontrados ===');
+console.log('titleInput:', !!titleInput);
+console.log('priceInput:', !!priceInput);
+console.log('descriptionInput:', !!descriptionInput);
+console.log('imageInput:', !!imageInput);
+console.log('categoryInput:', !!categoryInput);
+console.log('previewImage:', !!previewImage);
+
+// Variables para validación de imagen
+let imageValidationTimeout;
+
+// Función principal de actualización de vista previa
+function updatePreview() {
+    console.log('=== updatePreview llamada ===');
+
+    // Actualizar campos de texto
+    if (titleInput && previewTitle) {
+        previewTitle.textContent = titleInput.value || 'Título del producto';
+    }
+
+    if (priceInput && previewPrice) {
+        const price = priceInput.value ? `$${parseFloat(priceInput.value).toFixed(2)}` : '$0.00';
+        previewPrice.textContent = price;
+    }
+
+    if (descriptionInput && previewDescription) {
+        previewDescription.textContent = descriptionInput.value || 'Descripción del producto...';
+    }
+
+    if (categoryInput && previewCategory) {
+        const category = categoryInput.options[categoryInput.selectedIndex]?.text || 'Sin categoría';
+        previewCategory.textContent = category;
+    }
+
+    // Actualizar imagen
+    updateImagePreview();
+}
+
+// Función para actualizar imagen
+function updateImagePreview() {
+    console.log('=== updateImagePreview llamada ===');
+
+    if (!imageInput) {
+        console.error('❌ imageInput no encontrado - no se puede actualizar imagen');
+        return;
+    }
+
+    const imageUrl = imageInput.value.trim();
+    console.log('URL ingresada:', imageUrl);
+
+    if (!imageUrl) {
+        console.log('No hay URL, reseteando imagen');
+        resetImagePreview();
+        hideImageStatus();
+        return;
+    }
+
+    if (!isValidUrl(imageUrl)) {
+        console.log('URL no válida');
+        showImageStatus('error', 'URL no válida');
+        resetImagePreview();
+        return;
+    }
+
+    console.log('URL válida, intentando cargar imagen...');
+    loadImageDirectly(imageUrl);
+}
+
+// Función para cargar imagen directamente
+function loadImageDirectly(imageUrl) {
+    console.log('=== loadImageDirectly llamada con URL:', imageUrl);
+
+    if (!previewImage) {
+        console.error('❌ previewImage no encontrado!');
+        return;
+    }
+
+    showImageStatus('loading', 'Cargando imagen...');
+
+    // Crear imagen
+    const img = document.createElement('img');
+    img.alt = 'Vista previa del producto';
+    img.style.cssText = 'width: 100%; height: 100%; object-fit: cover; border-radius: var(--border-radius);';
+
+    // Timer para timeout manual
+    const loadingTimeout = setTimeout(() => {
+        console.warn('⚠️ Imagen tardando mucho, pero continuando...');
+        showImageStatus('warning', 'La imagen está tardando en cargar...');
+    }, 5000);
+
+    img.onload = function() {
+        console.log('✅ Imagen cargada exitosamente:', imageUrl);
+        clearTimeout(loadingTimeout);
+        showImageStatus('success', 'Imagen cargada correctamente');
+        setTimeout(() => hideImageStatus(), 2000);
+    };
+
+    img.onerror = function(error) {
+        console.error('❌ Error al cargar imagen:', imageUrl, error);
+        clearTimeout(loadingTimeout);
+        resetImagePreview();
+        showImageStatus('error', 'No se pudo cargar la imagen. Intenta con otra URL.');
+    };
+
+    console.log('Asignando src y agregando al DOM...');
+    img.src = imageUrl;
+    previewImage.innerHTML = '';
+    previewImage.appendChild(img);
+    console.log('✅ Imagen agregada al DOM');
+}
+
+// Validar URL
+function isValidUrl(string) {
+    try {
+        const url = new URL(string);
+        return url.protocol === 'http:' || url.protocol === 'https:';
+    } catch (_) {
+        return false;
+    }
+}
+
+// Resetear imagen a estado inicial
+function resetImagePreview() {
+    console.log('=== resetImagePreview llamada ===');
+    if (!previewImage) {
+        console.warn('previewImage no encontrado para resetear');
+        return;
+    }
+
+    previewImage.innerHTML = `
+        <div style="text-align: center;">
+            <svg width="48" height="48" fill="currentColor" viewBox="0 0 24 24">
+                <path d="M21 19V5c0-1.1-.9-2-2-2H5c-1.1 0-2 .9-2 2v14c0 1.1.9 2 2 2h14c1.1 0 2-.9 2-2zM8.5 13.5l2.5 3.01L14.5 12l4.5 6H5l3.5-4.5z"/>
+            </svg>
+            <p style="margin-top: 0.5rem;">Imagen del producto</p>
+        </div>
+    `;
+    console.log('✅ Imagen reseteada');
+}
+
+// Mostrar estado de validación
+function showImageStatus(type, message) {
+    console.log('=== showImageStatus:', type, message);
+    const statusElement = findElement(['#image-validation-status']);
+    if (!statusElement) {
+        console.warn('Elemento image-validation-status no encontrado');
+        return;
+    }
+
+    statusElement.style.display = 'flex';
+    statusElement.style.alignItems = 'center';
+    statusElement.style.gap = '0.5rem';
+
+    let icon = '';
+    let color = '';
+
+    switch (type) {
+        case 'loading':
+            icon = '<div style="width:16px;height:16px;border:2px solid currentColor;border-top:2px solid transparent;border-radius:50%;animation:spin 1s linear infinite;"></div>';
+            color = '#2563eb';
+            break;
+        case 'success':
+            icon = '<svg width="16" height="16" fill="currentColor" viewBox="0 0 24 24"><path d="M9 16.2L4.8 12l-1.4 1.4L9 19 21 7l-1.4-1.4L9 16.2z"/></svg>';
+            color = '#10b981';
+            break;
+        case 'warning':
+            icon = '<svg width="16" height="16" fill="currentColor" viewBox="0 0 24 24"><path d="M1 21h22L12 2 1 21zm12-3h-2v-2h2v2zm0-4h-2v-4h2v4z"/></svg>';
+            color = '#f59e0b';
+            break;
+        case 'error':
+            icon = '<svg width="16" height="16" fill="currentColor" viewBox="0 0 24 24"><path d="M12 2C6.48 2 2 6.48 2 12s4.48 10 10 10 10-4.48 10-10S17.52 2 12 2zm1 15h-2v-2h2v2zm0-4h-2V7h2v6z"/></svg>';
+            color = '#ef4444';
+            break;
+    }
+
+    statusElement.innerHTML = `${icon} <span>${message}</span>`;
+    statusElement.style.color = color;
+}
+
+// Ocultar estado de validación
+function hideImageStatus() {
+    const statusElement = findElement(['#image-validation-status']);
+    if (statusElement) {
+        statusElement.style.display = 'none';
+    }
+}
+
+// Función debounce
+function debounce(func, wait) {
+    let timeout;
+    return function executedFunction(...args) {
+        const later = () => {
+            clearTimeout(timeout);
+            func(...args);
+        };
+        clearTimeout(timeout);
+        timeout = setTimeout(later, wait);
+    };
+}
+
+// Event listeners CON VERIFICACIÓN
+function setupEventListeners() {
+    console.log('=== Configurando event listeners ===');
+
+    if (imageInput) {
+        console.log('✅ Configurando listeners para imageInput');
+
+        imageInput.addEventListener('input', debounce(function(e) {
+            console.log('🔄 Event INPUT - Valor:', e.target.value);
+            updateImagePreview();
+        }, 500));
+
+        imageInput.addEventListener('blur', function(e) {
+            console.log('🔄 Event BLUR - Valor:', e.target.value);
+            updateImagePreview();
+        });
+
+        imageInput.addEventListener('paste', function(e) {
+            console.log('🔄 Event PASTE');
+            setTimeout(() => {
+                console.log('📋 Valor después de paste:', e.target.value);
+                updateImagePreview();
+            }, 100);
+        });
+    } else {
+        console.error('❌ No se pudo configurar listeners para imageInput');
+    }
+
+    // Otros event listeners
+    if (titleInput) titleInput.addEventListener('input', updatePreview);
+    if (priceInput) priceInput.addEventListener('input', updatePreview);
+    if (descriptionInput) descriptionInput.addEventListener('input', updatePreview);
+    if (categoryInput) categoryInput.addEventListener('change', updatePreview);
+
+    console.log('✅ Event listeners configurados');
+}
+
+// Función para llenar ejemplos con URLs confiables
+function fillExample(type) {
+    console.log('=== fillExample llamada con tipo:', type);
+
+    const examples = {
+        electronics: {
+            title: 'Auriculares Inalámbricos Premium',
+            price: '129.99',
+            description: 'Experimenta la libertad del sonido sin cables con nuestros auriculares premium.',
+            image: 'https://via.placeholder.com/400x400/4169E1/FFFFFF?text=Auriculares',
+            category: 'electronics'
+        },
+        fashion: {
+            title: 'Camiseta Vintage',
+            price: '24.99',
+            description: 'Camiseta de algodón 100% orgánico con diseño vintage único.',
+            image: 'https://via.placeholder.com/400x400/FF6B6B/FFFFFF?text=Camiseta',
+            category: "men's clothing"
+        },
+        home: {
+            title: 'Lámpara Moderna',
+            price: '89.99',
+            description: 'Ilumina tu espacio con estilo moderno.',
+            image: 'https://via.placeholder.com/400x400/4ECDC4/FFFFFF?text=Lampara',
+            category: 'electronics'
+        }
+    };
+
+    const example = examples[type];
+    if (example) {
+        console.log('📝 Llenando ejemplo con datos:', example);
+
+        if (titleInput) titleInput.value = example.title;
+        if (priceInput) priceInput.value = example.price;
+        if (descriptionInput) descriptionInput.value = example.description;
+        if (imageInput) {
+            imageInput.value = example.image;
+            console.log('🖼️ URL de imagen asignada:', example.image);
+        }
+
+        if (categoryInput) {
+            for (let i = 0; i < categoryInput.options.length; i++) {
+                if (categoryInput.options[i].value === example.category) {
+                    categoryInput.selectedIndex = i;
+                    break;
+                }
+            }
+        }
+
+        console.log('🔄 Actualizando preview...');
+        updatePreview();
+    }
+}
+
+// Funciones de testing
+function testImageUrl(url) {
+    console.log('🧪 TESTING URL:', url);
+    if (imageInput) {
+        imageInput.value = url;
+        updateImagePreview();
+    } else {
+        console.error('❌ No se puede testear - imageInput no encontrado');
+    }
+}
+
+// Otras funciones del formulario
+function handleFormSubmit(event) {
+    showProcessingState();
+    return true;
+}
+
+function showProcessingState() {
+    const actionText = document.getElementById('action-text');
+    const actionLoading = document.getElementById('action-loading');
+    if (actionText) actionText.style.display = 'none';
+    if (actionLoading) actionLoading.style.display = 'inline-block';
+}
+
+// Consultar el estado del cambio encolado (escritura diferida) hasta que se envíe a la API
+function pollMutationStatus(statusElement) {
+    fetch(statusElement.dataset.url)
+        .then(response => response.json())
+        .then(data => {
+            statusElement.textContent = `Estado del cambio: ${data.status_display}` + (data.error ? ` (${data.error})` : '');
+            if (data.status === 'pending' || data.status === 'processing') {
+                setTimeout(() => pollMutationStatus(statusElement), 2000);
+            }
+        })
+        .catch(() => setTimeout(() => pollMutationStatus(statusElement), 5000));
+}
+
+// Inicialización
+document.addEventListener('DOMContentLoaded', function() {
+    console.log('🚀 DOM Content Loaded - Inicializando...');
+
+    // Listar todos los inputs para debugging
+    console.log('📋 Todos los elementos de formulario:');
+    document.querySelectorAll('input, textarea, select').forEach(el => {
+        console.log(`  - Tipo: ${el.type || el.tagName}, ID: "${el.id}", Name: "${el.name}"`);
+    });
+
+    setupEventListeners();
+    updatePreview();
+
+    if (titleInput) titleInput.focus();
+
+    const mutationStatus = document.getElementById('mutation-status');
+    if (mutationStatus) pollMutationStatus(mutationStatus);
+
+});
+
+// Funciones globales para testing
+window.testImage = testImageUrl;
+window.debugPreview = updateImagePreview;
+window.resetPreview = resetImagePreview;
+window.fillEx = fillExample;
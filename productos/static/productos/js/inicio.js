@@ -0,0 +1,66 @@
+function confirmDelete(deleteUrl) {
+    const result = confirm('¿Estás seguro de que quieres eliminar este producto? Esta acción no se puede deshacer.');
+
+    if (result) {
+        const form = document.getElementById('delete-form');
+        form.action = deleteUrl;
+        form.submit();
+    }
+}
+
+function viewProduct(productId) {
+    document.getElementById('loading').style.display = 'inline-block';
+
+    setTimeout(() => {
+        window.location.href = `/productos/buscar/?id=${productId}`;
+    }, 500);
+}
+
+function addToFavorites(productId) {
+    showMessage('Producto agregado a favoritos', 'success');
+}
+
+function showMessage(text, type) {
+    const messageDiv = document.createElement('div');
+    messageDiv.className = `message message-${type}`;
+    messageDiv.textContent = text;
+    messageDiv.style.position = 'fixed';
+    messageDiv.style.top = '20px';
+    messageDiv.style.right = '20px';
+    messageDiv.style.zIndex = '9999';
+    messageDiv.style.minWidth = '300px';
+
+    document.body.appendChild(messageDiv);
+
+    setTimeout(() => {
+        messageDiv.style.opacity = '0';
+        messageDiv.style.transform = 'translateX(100%)';
+        setTimeout(() => {
+            document.body.removeChild(messageDiv);
+        }, 300);
+    }, 3000);
+}
+
+window.addEventListener('scroll', function() {
+    const hero = document.querySelector('.hero');
+    const scrolled = window.pageYOffset;
+    const rate = scrolled * -0.5;
+
+    if (hero) {
+        hero.style.transform = `translate3d(0, ${rate}px, 0)`;
+    }
+});
+
+document.addEventListener('DOMContentLoaded', function() {
+    const cards = document.querySelectorAll('.card');
+    cards.forEach((card, index) => {
+        card.style.transition = 'transform 0.3s ease';
+        card.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateY(-10px) scale(1.02)';
+        });
+
+        card.addEventListener('mouseleave', function() {
+            this.style.transform = 'translateY(0) scale(1)';
+        });
+    });
+});
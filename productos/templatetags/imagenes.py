@@ -0,0 +1,12 @@
+from django import template
+
+from productos.images import miniatura_url
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def miniatura(url, size='md', fmt='jpeg'):
+    """Uso: {% miniatura product.images.0 'md' 'webp' %}"""
+    return miniatura_url(url, size, fmt)
@@ -1,3 +1,685 @@
-from django.test import TestCase
+import asyncio
+import io
+import socket
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import OperationalError
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from . import api, autocomplete, circuit, images, invalidation, mirror, mutations, views
+from .management.commands import sync_catalog
+from . import cache as swr
+from . import singleflight
+from .forms import BuscarProductoForm
+from .models import Mutation, Product, SyncState, Version
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_llamadas_concurrentes_comparten_resultado(self):
+        group = singleflight.Group()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 'valor'
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(group.do('k', fn)))
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(target=lambda: results.append(group.do('k', fn))) for _ in range(4)]
+        for thread in followers:
+            thread.start()
+        # Deja que los seguidores lleguen a esperar a la llamada en curso
+        time.sleep(0.05)
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['valor'] * 5)
+        self.assertEqual(group.calls, {})
+
+    def test_llamadas_concurrentes_comparten_excepcion(self):
+        group = singleflight.Group()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            raise ValueError('fallo')
+
+        errors = []
+
+        def run():
+            try:
+                group.do('k', fn)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run)]
+        threads[0].start()
+        started.wait(5)
+        threads += [threading.Thread(target=run) for _ in range(2)]
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(errors), 3)
+        self.assertTrue(all(e is errors[0] for e in errors))
+
+    def test_llamadas_sucesivas_no_se_agrupan(self):
+        group = singleflight.Group()
+        calls = []
+        for _ in range(2):
+            group.do('k', lambda: calls.append(1))
+        self.assertEqual(len(calls), 2)
+
+    def test_ado_agrupa_corrutinas(self):
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'valor'
+
+        async def main():
+            return await asyncio.gather(*(singleflight.ado('k', load) for _ in range(5)))
+
+        self.assertEqual(asyncio.run(main()), ['valor'] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_ado_cancelar_una_espera_no_cancela_la_llamada(self):
+        async def load():
+            await asyncio.sleep(0.05)
+            return 'valor'
+
+        async def main():
+            first = asyncio.ensure_future(singleflight.ado('k', load))
+            second = asyncio.ensure_future(singleflight.ado('k', load))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        self.assertEqual(asyncio.run(main()), 'valor')
+
+
+class StaleWhileRevalidateTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_entrada_ausente_se_carga_y_se_guarda(self):
+        loader = mock.Mock(return_value='v1')
+        self.assertEqual(swr.get_or_refresh('k', loader, ttl=60, stale_ttl=60), 'v1')
+        self.assertEqual(swr.get_or_refresh('k', loader, ttl=60, stale_ttl=60), 'v1')
+        loader.assert_called_once()
+
+    def test_entrada_vencida_se_sirve_y_se_refresca_una_vez(self):
+        # Vencida hace un segundo, aún dentro de stale_ttl
+        cache.set('k', ('viejo', time.time() - 1), timeout=60)
+        refreshed = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            release.wait(5)
+            refreshed.set()
+            return 'nuevo'
+
+        with mock.patch.object(swr.connections, 'close_all'):
+            # Mientras dura el refresco se sigue sirviendo el valor vencido
+            for _ in range(3):
+                self.assertEqual(swr.get_or_refresh('k', loader, ttl=60, stale_ttl=60), 'viejo')
+            release.set()
+            self.assertTrue(refreshed.wait(5))
+            for _ in range(50):
+                if cache.get('k:refresh') is None:
+                    break
+                time.sleep(0.01)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.get('k')[0], 'nuevo')
+        self.assertIsNone(cache.get('k:refresh'))
+
+    def test_refresco_fallido_conserva_el_valor_anterior(self):
+        swr.set_entry('k', 'viejo', ttl=60, stale_ttl=60)
+        loader = mock.Mock(side_effect=RuntimeError('API caída'))
+
+        with mock.patch.object(swr.connections, 'close_all'), \
+                self.assertLogs('productos.cache', 'ERROR'):
+            swr._refresh('k', loader, 60, 60, 'k:refresh')
+
+        self.assertEqual(cache.get('k')[0], 'viejo')
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.breaker = circuit.CircuitBreaker('GET products', failure_threshold=3, reset_timeout=30)
+
+    def expire(self):
+        """Simula que ya pasó ``reset_timeout`` desde que se abrió"""
+        self.breaker.opened_at -= self.breaker.reset_timeout
+
+    def test_se_abre_tras_los_fallos_seguidos(self):
+        for _ in range(2):
+            self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, circuit.OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_un_exito_reinicia_la_cuenta(self):
+        for _ in range(2):
+            self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, circuit.CLOSED)
+
+    def test_half_open_deja_pasar_una_sola_prueba(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.expire()
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, circuit.HALF_OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_prueba_con_exito_cierra_el_circuito(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.expire()
+        self.breaker.allow()
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, circuit.CLOSED)
+        self.assertTrue(self.breaker.allow())
+        self.assertTrue(self.breaker.allow())
+
+    def test_prueba_fallida_vuelve_a_abrir(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.expire()
+        self.breaker.allow()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, circuit.OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_release_libera_la_prueba(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.expire()
+        self.breaker.allow()
+        self.breaker.release()
+        self.assertTrue(self.breaker.allow())
+
+
+@override_settings(PLATZI_API_URL='http://api.test/', PLATZI_API_CIRCUITO_FALLOS=2, PLATZI_API_HEDGE=False)
+class ApiRequestTests(SimpleTestCase):
+    def setUp(self):
+        circuit._breakers.clear()
+        self.addCleanup(circuit._breakers.clear)
+        self.session = mock.Mock()
+        patcher = mock.patch.object(api, 'get_session', return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def breaker(self):
+        return circuit.get_breaker('GET products/:id')
+
+    def test_circuito_abierto_no_sale_a_la_red(self):
+        self.session.request.side_effect = requests.exceptions.ConnectionError
+        for _ in range(2):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                api.get('products/1')
+        with self.assertRaises(api.CircuitOpenError):
+            api.get('products/2')
+        self.assertEqual(self.session.request.call_count, 2)
+
+    def test_errores_5xx_cuentan_como_fallo(self):
+        self.session.request.return_value = mock.Mock(status_code=503)
+        for _ in range(2):
+            api.get('products/1')
+        self.assertEqual(self.breaker().state, circuit.OPEN)
+
+    def test_timeout_completo_cuenta_como_fallo(self):
+        self.session.request.side_effect = requests.exceptions.ReadTimeout
+        with self.assertRaises(requests.exceptions.Timeout):
+            api.get('products/1')
+        self.assertEqual(self.breaker().failures, 1)
+
+    def test_timeout_recortado_por_el_presupuesto_no_cuenta(self):
+        self.session.request.side_effect = requests.exceptions.ReadTimeout
+        token = circuit._deadline.set(time.monotonic() + 0.5)
+        try:
+            for _ in range(3):
+                with self.assertRaises(requests.exceptions.Timeout):
+                    api.get('products/1')
+        finally:
+            circuit._deadline.reset(token)
+        self.assertEqual(self.breaker().failures, 0)
+        self.assertEqual(self.breaker().state, circuit.CLOSED)
+
+    def test_presupuesto_agotado_no_llama_a_la_api(self):
+        token = circuit._deadline.set(time.monotonic() - 1)
+        try:
+            with self.assertRaises(api.LatencyBudgetExceeded):
+                api.get('products/1')
+        finally:
+            circuit._deadline.reset(token)
+        self.session.request.assert_not_called()
+
+
+class HedgedGetTests(SimpleTestCase):
+    def setUp(self):
+        self.session = mock.Mock()
+        patcher = mock.patch.object(api, 'get_session', return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_respuesta_rapida_no_duplica(self):
+        self.session.get.return_value = 'rápida'
+        self.assertEqual(api.hedged_get('http://api.test/products', delay=1), 'rápida')
+        self.assertEqual(self.session.get.call_count, 1)
+
+    def test_respuesta_lenta_lanza_una_copia_y_usa_la_primera(self):
+        release = threading.Event()
+        responses = iter(['lenta', 'copia'])
+        lock = threading.Lock()
+
+        def get(url, **kwargs):
+            with lock:
+                response = next(responses)
+            if response == 'lenta':
+                release.wait(5)
+            return response
+
+        self.session.get.side_effect = get
+        try:
+            self.assertEqual(api.hedged_get('http://api.test/products', delay=0.01), 'copia')
+        finally:
+            release.set()
+        self.assertEqual(self.session.get.call_count, 2)
+
+    def test_si_falla_una_se_espera_a_la_otra(self):
+        calls = []
+        lock = threading.Lock()
+
+        def get(url, **kwargs):
+            with lock:
+                calls.append(1)
+                first = len(calls) == 1
+            if first:
+                time.sleep(0.05)
+                raise requests.exceptions.ConnectionError
+            time.sleep(0.1)
+            return 'copia'
+
+        self.session.get.side_effect = get
+        self.assertEqual(api.hedged_get('http://api.test/products', delay=0.01), 'copia')
+
+    def test_si_fallan_ambas_propaga_el_error(self):
+        self.session.get.side_effect = requests.exceptions.ConnectionError
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            api.hedged_get('http://api.test/products', delay=0)
+
+
+def api_product(pk, title='Camiseta'):
+    return {
+        'id': pk, 'title': title, 'slug': f'producto-{pk}', 'price': 10, 'description': 'Descripción',
+        'images': [f'https://example.com/{pk}.jpg'],
+        'category': {'id': 1, 'name': 'Ropa', 'slug': 'ropa', 'image': 'https://example.com/ropa.jpg'},
+    }
+
+
+class MirrorFillTests(TestCase):
+    def test_guarda_los_datos_de_la_api(self):
+        mirror.fill(mirror.save_products, [api_product(1)])
+        self.assertTrue(Product.objects.filter(pk=1).exists())
+
+    def test_un_fallo_al_guardar_no_hace_fallar_la_pagina(self):
+        page_data = {'products': [api_product(1)], 'has_next': False}
+        with mock.patch.object(views, 'descargar_pagina_productos', return_value=page_data), \
+                mock.patch.object(mirror, 'save_products', side_effect=OperationalError('database is locked')), \
+                self.assertLogs('productos.mirror', 'ERROR'):
+            self.assertEqual(views.cargar_pagina_productos(1, 12), page_data)
+        self.assertFalse(Product.objects.exists())
+
+
+class AutocompleteIndexTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(autocomplete, 'index', autocomplete.ProductIndex())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def sync_from_other_process(self, pk, title):
+        """Escribe en el espejo sin pasar por mirror (como sync_catalog u otro worker)"""
+        Product.objects.create(pk=pk, title=title, slug=f'producto-{pk}', price=10, content_hash=str(pk))
+        invalidation.catalog_synced([pk])
+
+    @override_settings(PRODUCTOS_AUTOCOMPLETAR_COMPROBACION=0)
+    def test_se_reconstruye_cuando_cambia_el_catalogo(self):
+        self.assertEqual(autocomplete.get_index().suggest('cami'), [])
+        self.sync_from_other_process(1, 'Camiseta azul')
+        self.assertEqual(autocomplete.get_index().suggest('cami'), [{'id': 1, 'title': 'Camiseta azul'}])
+
+    @override_settings(PRODUCTOS_AUTOCOMPLETAR_COMPROBACION=60)
+    def test_no_consulta_la_base_de_datos_entre_comprobaciones(self):
+        autocomplete.get_index()
+        self.sync_from_other_process(1, 'Camiseta azul')
+        with self.assertNumQueries(0):
+            self.assertEqual(autocomplete.get_index().suggest('cami'), [])
+
+    @override_settings(PRODUCTOS_AUTOCOMPLETAR_COMPROBACION=0)
+    def test_sin_cambios_no_se_reconstruye(self):
+        first = autocomplete.get_index()
+        self.assertIs(autocomplete.get_index(), first)
+
+
+class VersionTests(TestCase):
+    def test_leer_una_version_no_crea_filas(self):
+        names = [invalidation.pagina(page, 12) for page in range(1000, 1050)]
+        versions = invalidation.get_versions(names)
+        self.assertEqual(set(versions.values()), {invalidation.NUNCA})
+        invalidation.list_key(1000, 12)
+        self.assertFalse(Version.objects.exists())
+
+    def test_un_cambio_crea_un_contador_distinto(self):
+        before = invalidation.get_version(invalidation.CATALOGO)
+        invalidation.bump_version(invalidation.CATALOGO)
+        after = invalidation.get_version(invalidation.CATALOGO)
+        self.assertNotEqual(after[0], before[0])
+        invalidation.bump_version(invalidation.CATALOGO)
+        self.assertEqual(invalidation.get_version(invalidation.CATALOGO)[0], after[0] + 1)
+
+
+class SyncCatalogTests(TestCase):
+    def api_get(self, catalog, fail_from=None):
+        def get(path, params=None):
+            if path == 'categories':
+                return mock.Mock(status_code=200, json=lambda: [api_product(1)['category']])
+            if fail_from is not None and params['offset'] >= fail_from:
+                raise requests.exceptions.ConnectionError('API caída')
+            page = catalog[params['offset']:params['offset'] + params['limit']]
+            return mock.Mock(status_code=200, json=lambda: page)
+        return mock.patch.object(sync_catalog.api, 'get', side_effect=get)
+
+    def test_una_sincronizacion_interrumpida_invalida_lo_ya_escrito(self):
+        catalog = [api_product(pk) for pk in range(1, 5)]
+        with self.api_get(catalog, fail_from=2), self.assertRaises(CommandError):
+            call_command('sync_catalog', page_size=2, concurrency=1, stdout=io.StringIO())
+
+        self.assertEqual(Product.objects.count(), 2)
+        versions = invalidation.get_versions([invalidation.producto(1), invalidation.LISTAS])
+        self.assertNotIn(invalidation.NUNCA, versions.values())
+
+    def test_filas_insertadas_a_la_vez_por_las_vistas_se_actualizan(self):
+        mirror.save_products([api_product(1, title='Título anterior')])
+        command = sync_catalog.Command()
+        command.batch_size = 500
+        product = mirror.product_from_api(api_product(1, title='Título nuevo'))
+        # La fila no existía al leer las huellas: la vista la insertó justo después
+        with mock.patch.object(Product.objects, 'filter') as hashes:
+            hashes.return_value.values_list.return_value = []
+            created, _ = command.apply_changes(Product, [product], mirror.PRODUCT_FIELDS)
+
+        self.assertEqual(len(created), 1)
+        self.assertEqual(Product.objects.get(pk=1).title, 'Título nuevo')
+
+
+@override_settings(PRODUCTOS_IMAGENES_HOSTS_PERMITIDOS=[])
+class ImageDownloadTests(SimpleTestCase):
+    def test_no_descarga_si_el_dns_cambia_tras_la_comprobacion(self):
+        server = socket.socket()
+        server.bind(('127.0.0.1', 0))
+        server.listen()
+        self.addCleanup(server.close)
+        port = server.getsockname()[1]
+        getaddrinfo = socket.getaddrinfo
+        answers = iter([[(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('93.184.216.34', port))]])
+
+        def rebinding(*args, **kwargs):
+            # La comprobación ve una IP pública; la conexión, 127.0.0.1
+            return next(answers, None) or getaddrinfo('127.0.0.1', *args[1:], **kwargs)
+
+        with mock.patch('socket.getaddrinfo', side_effect=rebinding), \
+                self.assertRaisesMessage(images.ImageError, 'Host no permitido'):
+            images.download(f'http://imagenes.example:{port}/foto.jpg')
+
+
+@override_settings(PRODUCTOS_MUTACIONES_REINTENTOS=3, PRODUCTOS_MUTACIONES_BLOQUEO=300)
+class MutationQueueTests(TestCase):
+    def claim(self, size=10):
+        return [m.pk for m in mutations.claim_batch(size)]
+
+    def response(self, status_code, data=None):
+        return mock.Mock(status_code=status_code, json=lambda: data or {}, text='error')
+
+    def test_un_cambio_por_producto_y_en_orden(self):
+        first = mutations.enqueue(Mutation.UPDATE, {'title': 'a'}, product_id=1)
+        second = mutations.enqueue(Mutation.UPDATE, {'title': 'b'}, product_id=1)
+        other = mutations.enqueue(Mutation.UPDATE, {'title': 'c'}, product_id=2)
+        created = mutations.enqueue(Mutation.CREATE, {'title': 'd'})
+
+        self.assertEqual(self.claim(), [first.pk, other.pk, created.pk])
+        # Mientras el primero se envía, el segundo del mismo producto espera
+        self.assertEqual(self.claim(), [])
+
+        mutations.finish(Mutation.objects.get(pk=first.pk), self.response(200))
+        self.assertEqual(self.claim(), [second.pk])
+
+    def test_respeta_el_tamano_del_lote(self):
+        for pk in range(1, 4):
+            mutations.enqueue(Mutation.DELETE, product_id=pk)
+        self.assertEqual(len(self.claim(size=2)), 2)
+        self.assertEqual(len(self.claim(size=2)), 1)
+
+    def test_un_reintento_pendiente_bloquea_los_siguientes_del_producto(self):
+        first = mutations.enqueue(Mutation.UPDATE, product_id=1)
+        mutations.enqueue(Mutation.UPDATE, product_id=1)
+        self.claim()
+        mutations.finish(Mutation.objects.get(pk=first.pk), self.response(503))
+
+        first.refresh_from_db()
+        self.assertEqual(first.status, Mutation.PENDING)
+        self.assertGreater(first.available_at, timezone.now())
+        self.assertEqual(self.claim(), [])
+
+        Mutation.objects.filter(pk=first.pk).update(available_at=timezone.now())
+        self.assertEqual(self.claim(), [first.pk])
+
+    def test_se_recuperan_los_cambios_bloqueados(self):
+        mutation = mutations.enqueue(Mutation.DELETE, product_id=1)
+        self.claim()
+        self.assertEqual(self.claim(), [])
+
+        Mutation.objects.filter(pk=mutation.pk).update(locked_at=timezone.now() - timedelta(seconds=301))
+        self.assertEqual(self.claim(), [mutation.pk])
+        mutation.refresh_from_db()
+        self.assertEqual(mutation.attempts, 2)
+
+    def test_espera_exponencial_y_fallo_tras_los_reintentos(self):
+        mutation = mutations.enqueue(Mutation.UPDATE, product_id=1)
+        delays = []
+        for _ in range(3):
+            Mutation.objects.filter(pk=mutation.pk).update(available_at=timezone.now())
+            (claimed,) = mutations.claim_batch(1)
+            before = timezone.now()
+            mutations.finish(claimed, error=requests.exceptions.ConnectionError('API caída'))
+            mutation.refresh_from_db()
+            if mutation.status == Mutation.PENDING:
+                delays.append(round((mutation.available_at - before).total_seconds()))
+
+        self.assertEqual(delays, [mutations.RETRY_BASE, mutations.RETRY_BASE * 2])
+        self.assertEqual(mutation.status, Mutation.FAILED)
+        self.assertEqual(mutation.attempts, 3)
+        self.assertIn('API caída', mutation.last_error)
+
+    def test_los_errores_4xx_no_se_reintentan(self):
+        mutation = mutations.enqueue(Mutation.UPDATE, product_id=1)
+        (claimed,) = mutations.claim_batch(1)
+        mutations.finish(claimed, self.response(400))
+        mutation.refresh_from_db()
+        self.assertEqual(mutation.status, Mutation.FAILED)
+        self.assertEqual(mutation.attempts, 1)
+
+    def test_un_alta_correcta_actualiza_el_espejo(self):
+        mutation = mutations.enqueue(Mutation.CREATE, {'title': 'Camiseta'})
+        (claimed,) = mutations.claim_batch(1)
+        mutations.finish(claimed, self.response(201, api_product(7)))
+        mutation.refresh_from_db()
+        self.assertEqual(mutation.status, Mutation.DONE)
+        self.assertEqual(mutation.product_id, 7)
+        self.assertTrue(Product.objects.filter(pk=7).exists())
+
+
+@override_settings(PRODUCTOS_POR_PAGINA=2)
+class ProductChangedTests(TestCase):
+    def setUp(self):
+        mirror.save_products([api_product(pk) for pk in range(1, 6)])
+        SyncState.objects.create(name='products', last_id=5, completed_at=timezone.now())
+        self.before = invalidation.get_counters(self.names())
+
+    def names(self):
+        return [invalidation.LISTAS] + [invalidation.pagina(page, 2) for page in range(1, 6)]
+
+    def changed(self):
+        after = invalidation.get_counters(self.names())
+        return [name for name in self.names() if after[name] != self.before[name]]
+
+    def test_una_edicion_solo_invalida_su_pagina(self):
+        invalidation.product_changed(3)
+        self.assertEqual(self.changed(), [invalidation.pagina(2, 2)])
+
+    def test_un_alta_invalida_su_pagina_y_las_siguientes(self):
+        mirror.save_products([api_product(6)])
+        invalidation.product_changed(6, created=True)
+        # 6 productos en páginas de 2: cae en la 3 y puede crear la 4
+        self.assertEqual(self.changed(), [invalidation.pagina(page, 2) for page in (3, 4, 5)])
+
+    def test_una_baja_desplaza_las_paginas_siguientes(self):
+        mirror.delete_product(2)
+        invalidation.product_changed(2, deleted=True)
+        self.assertEqual(self.changed(), [invalidation.pagina(page, 2) for page in (1, 2, 3, 4)])
+
+    def test_si_el_espejo_no_cubre_el_producto_se_invalidan_todas(self):
+        SyncState.objects.filter(name='products').update(last_id=4, completed_at=None)
+        invalidation.product_changed(5)
+        self.assertEqual(self.changed(), [invalidation.LISTAS])
+
+
+# Sin collectstatic no hay manifiesto de los archivos estáticos
+STORAGES_SIN_MANIFIESTO = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+@override_settings(PRODUCTOS_POR_PAGINA=2, STORAGES=STORAGES_SIN_MANIFIESTO)
+class ConditionalResponseTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        mirror.save_products([api_product(pk) for pk in range(1, 4)])
+        SyncState.objects.create(name='products', last_id=3, completed_at=timezone.now())
+
+    def test_304_hasta_que_cambia_el_catalogo(self):
+        response = self.client.get('/')
+        etag = response['ETag']
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/', headers={'If-None-Match': etag}).status_code, 304)
+
+        mirror.save_products([api_product(1, title='Título nuevo')])
+        invalidation.product_changed(1)
+        response = self.client.get('/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertContains(response, 'Título nuevo')
+
+    def test_una_pagina_degradada_no_lleva_validadores(self):
+        # Página que el espejo no cubre y API caída: se sirve lo que haya
+        SyncState.objects.filter(name='products').update(last_id=None, completed_at=None)
+        with mock.patch.object(views, 'descargar_pagina_productos',
+                               side_effect=requests.exceptions.ConnectionError):
+            response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+        self.assertIn('no-store', response['Cache-Control'])
+
+    def test_una_pagina_degradada_no_se_guarda_en_la_cache(self):
+        SyncState.objects.filter(name='products').update(last_id=None, completed_at=None)
+        with mock.patch.object(views, 'descargar_pagina_productos',
+                               side_effect=requests.exceptions.ConnectionError):
+            self.assertNotIn('ETag', self.client.get('/'))
+
+        # La API vuelve: la página se pide de nuevo en vez de servir la degradada
+        page_data = {'products': [api_product(1, title='Desde la API')], 'has_next': False}
+        with mock.patch.object(views, 'descargar_pagina_productos', return_value=page_data) as descargar:
+            response = self.client.get('/')
+        descargar.assert_called_once()
+        self.assertIn('ETag', response)
+        self.assertContains(response, 'Desde la API')
+
+    def test_una_respuesta_con_error_no_lleva_validadores(self):
+        with mock.patch.object(views, 'get_categories', return_value=[]), \
+                mock.patch.object(views.api, 'get', return_value=mock.Mock(status_code=404)):
+            response = self.client.get('/editar/99/')
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn('ETag', response)
+        self.assertIn('no-store', response['Cache-Control'])
+
+
+@override_settings(PRODUCTOS_BUSQUEDA_MAX_IDS=5)
+class BuscarProductoFormTests(SimpleTestCase):
+    def clean(self, value):
+        form = BuscarProductoForm({'product_id': value})
+        if form.is_valid():
+            return form.cleaned_data['product_id']
+        return form.errors['product_id']
+
+    def test_ids_sueltos_listas_y_rangos(self):
+        self.assertEqual(self.clean('4'), [4])
+        self.assertEqual(self.clean('1, 5, 3'), [1, 5, 3])
+        self.assertEqual(self.clean('2-4'), [2, 3, 4])
+        self.assertEqual(self.clean('9, 1-2'), [9, 1, 2])
+
+    def test_punto_y_coma_como_separador(self):
+        self.assertEqual(self.clean('1; 2;3, 4'), [1, 2, 3, 4])
+
+    def test_sin_repetidos_y_en_orden(self):
+        self.assertEqual(self.clean('3, 1-3, 2, 3'), [3, 1, 2])
+
+    def test_rango_invertido(self):
+        self.assertEqual(self.clean('5-2'), ['Rango inválido: 5-2'])
+
+    def test_ids_no_validos(self):
+        self.assertEqual(self.clean('-5'), ['ID inválido: -5'])
+        self.assertEqual(self.clean('abc'), ['ID inválido: abc'])
+        self.assertEqual(self.clean('0'), ['El ID debe ser mayor a 0'])
+        self.assertEqual(self.clean(' , ;'), ['Ingresa al menos un ID.'])
+
+    def test_maximo_de_ids(self):
+        error = ['Puedes consultar como máximo 5 productos a la vez.']
+        self.assertEqual(self.clean('1-5'), [1, 2, 3, 4, 5])
+        self.assertEqual(self.clean('1-6'), error)
+        self.assertEqual(self.clean('1-3, 7, 8, 9'), error)
+        # Los repetidos no cuentan para el máximo
+        self.assertEqual(self.clean('1-5, 1-5'), [1, 2, 3, 4, 5])
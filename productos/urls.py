@@ -1,12 +1,19 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 
 app_name = 'productos'
 
+# Con PRODUCTOS_ASYNC_VIEWS (servidores ASGI) se usan las vistas asíncronas
+product_views = async_views if settings.PRODUCTOS_ASYNC_VIEWS else views
+
 urlpatterns = [
-    path('', views.inicio, name='inicio'),
-    path('buscar/', views.buscar_producto_view, name='buscar_producto'),
-    path('crear/', views.crear_producto_view, name='crear_producto'),
-    path('eliminar/<int:product_id>/', views.eliminar_producto_view, name='eliminar_producto'),
-    path('editar/<int:product_id>/', views.editar_producto_view, name='editar_producto'),
+    path('', product_views.inicio, name='inicio'),
+    path('buscar/', product_views.buscar_producto_view, name='buscar_producto'),
+    path('buscar/autocompletar/', views.autocompletar_view, name='autocompletar'),
+    path('crear/', product_views.crear_producto_view, name='crear_producto'),
+    path('eliminar/<int:product_id>/', product_views.eliminar_producto_view, name='eliminar_producto'),
+    path('editar/<int:product_id>/', product_views.editar_producto_view, name='editar_producto'),
+    path('mutaciones/<int:mutation_id>/', views.estado_mutacion_view, name='estado_mutacion'),
+    path('imagenes/<slug:fmt>/<slug:size>/<str:token>', views.imagen_view, name='imagen'),
 ]
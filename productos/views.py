@@ -1,117 +1,412 @@
+import contextvars
+import hashlib
 import requests
 import json
-from django.shortcuts import render, redirect
-from .forms import BuscarProductoForm, CrearProductoForm
-from django.http import HttpResponse
+from datetime import datetime, timezone
+from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.shortcuts import get_object_or_404, render, redirect
+from .forms import BuscarProductoForm, BusquedaProductoForm, CrearProductoForm
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseRedirect, JsonResponse
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.utils.cache import add_never_cache_headers
+from django.views.decorators.http import condition
+from django.conf import settings
+from . import api, autocomplete, images, invalidation, mirror, mutations
+from .cache import get_or_refresh
+from .categories import get_categories
+from .models import Mutation
+from .search import search_products
+
+class PaginaDegradada(Exception):
+    """
+    La API no respondió y la página se sacó del espejo aunque esté incompleta.
+    Se lanza en vez de devolverla para que no se guarde en la caché: cuando la
+    API vuelva, la siguiente petición la pedirá de nuevo.
+    """
+
+    def __init__(self, page_data):
+        super().__init__('Página servida desde el espejo sin la API')
+        self.page_data = {**page_data, 'degradada': True}
+
+
+def descargar_pagina_productos(page, per_page):
+    """Descargar una página de productos desde la API usando offset/limit"""
+    # Se pide un producto extra para saber si existe una página siguiente
+    response = api.get('products', params={
+        'offset': (page - 1) * per_page,
+        'limit': per_page + 1,
+    })
+    response.raise_for_status()
+    return build_page(response.json(), per_page)
+
+
+def build_page(data, per_page):
+    """Convertir la respuesta de la API (per_page + 1 productos) en una página"""
+    if isinstance(data, list):
+        products_data = data
+    else:
+        products_data = [data]
 
-def inicio(request):
-    base_url = 'https://api.escuelajs.co/api/v1/products'
-    products_data = []
+    return {
+        'products': [p for p in products_data[:per_page] if 'id' in p and p['id'] is not None],
+        'has_next': len(products_data) > per_page,
+    }
 
-    try:
-        response = requests.get(base_url)
-        response.raise_for_status()
 
-        data = response.json()
-        if isinstance(data, list):
-            products_data = data
+def cargar_pagina_productos(page, per_page):
+    """Obtener una página de productos del espejo local o, si falta, de la API"""
+    page_data = mirror.get_page(page, per_page)
+    if page_data is None:
+        try:
+            page_data = descargar_pagina_productos(page, per_page)
+        except requests.exceptions.RequestException:
+            # API caída o circuito abierto: se sirve lo que haya en el espejo
+            page_data = mirror.get_page(page, per_page, partial=True)
+            if page_data is None:
+                raise
+            raise PaginaDegradada(page_data)
+        mirror.fill(mirror.save_page, page, per_page, page_data)
+    return page_data
+
+
+def get_page_number(request):
+    """Leer el número de página de la query (?page=N), por defecto 1"""
+    try:
+        return max(int(request.GET.get('page', 1)), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+def validadores(request, prefix, *versions):
+    """
+    ETag y Last-Modified de una página que depende de los recursos
+    ``versions`` (ver productos/invalidation.py). Incluyen al usuario y el
+    token CSRF porque las plantillas cambian con ellos.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return None, None
+
+    versions = invalidation.get_versions(versions).values()
+    csrf_cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+    etag = '-'.join([
+        prefix,
+        *(str(counter) for counter, _ in versions),
+        str(request.user.pk or 0),
+        hashlib.sha1(csrf_cookie.encode()).hexdigest()[:8],
+    ])
+
+    last_modified = datetime.fromtimestamp(max(modified for _, modified in versions), tz=timezone.utc)
+    if request.user.is_authenticated and request.user.last_login:
+        last_modified = max(last_modified, request.user.last_login)
+    return etag, last_modified
+
+
+def degradada(response):
+    """Marca una respuesta generada sin la API (contenido incompleto o vacío)"""
+    response.degradada = True
+    return response
+
+
+def sin_validadores(response):
+    """
+    Las respuestas degradadas o con error no llevan ETag ni Last-Modified y no
+    se guardan en caché: si no, el cliente seguiría recibiendo 304 para ese
+    contenido cuando la API vuelva.
+    """
+    if getattr(response, 'degradada', False) or response.status_code >= 400:
+        del response['ETag']
+        del response['Last-Modified']
+        add_never_cache_headers(response)
+    return response
+
+
+def condicional(get_validadores):
+    """
+    ``condition`` de Django con el ETag y el Last-Modified que devuelve
+    ``get_validadores``, calculados una sola vez por petición. En las vistas
+    asíncronas se calculan con ``sync_to_async`` porque leen la sesión.
+    """
+    def decorator(view):
+        def conditional_view(etag, last_modified):
+            return condition(
+                etag_func=lambda *args, **kwargs: etag,
+                last_modified_func=lambda *args, **kwargs: last_modified,
+            )(view)
+
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def inner(request, *args, **kwargs):
+                etag, last_modified = await sync_to_async(get_validadores)(request, *args, **kwargs)
+                response = await conditional_view(etag, last_modified)(request, *args, **kwargs)
+                return sin_validadores(response)
         else:
-            products_data = [data]
+            @wraps(view)
+            def inner(request, *args, **kwargs):
+                etag, last_modified = get_validadores(request, *args, **kwargs)
+                return sin_validadores(conditional_view(etag, last_modified)(request, *args, **kwargs))
+        return inner
+    return decorator
+
+
+def validadores_inicio(request):
+    page = get_page_number(request)
+    return validadores(request, f'inicio-{page}-{settings.PRODUCTOS_POR_PAGINA}', invalidation.CATALOGO)
+
+
+def validadores_busqueda(request):
+    query = hashlib.sha1(request.GET.urlencode().encode()).hexdigest()[:12]
+    return validadores(request, f'buscar-{query}', invalidation.CATALOGO, invalidation.CATEGORIAS)
 
-        products_data = [p for p in products_data if 'id' in p and p['id'] is not None]
 
+def validadores_edicion(request, product_id):
+    return validadores(
+        request, f'editar-{product_id}', invalidation.producto(product_id), invalidation.CATEGORIAS,
+    )
+
+
+@condicional(validadores_inicio)
+def inicio(request):
+    page = get_page_number(request)
+    per_page = settings.PRODUCTOS_POR_PAGINA
+    page_data = {'products': [], 'has_next': False, 'degradada': True}
+
+    try:
+        page_data = get_or_refresh(
+            invalidation.list_key(page, per_page),
+            lambda: cargar_pagina_productos(page, per_page),
+            ttl=settings.PRODUCTOS_CACHE_TTL,
+            stale_ttl=settings.PRODUCTOS_CACHE_STALE_TTL,
+        )
+
+    except PaginaDegradada as e:
+        page_data = e.page_data
     except requests.exceptions.RequestException as e:
         print(f'Error al conectar con la API: {e}')
 
-    context = {
-        'products': products_data,
+    response = render(request, 'inicio.html', build_page_context(page, page_data))
+    return degradada(response) if page_data.get('degradada') else response
+
+
+def build_page_context(page, page_data):
+    """
+    Contexto de la plantilla inicio.html para una página de productos. Cada
+    producto lleva como versión la huella de su contenido (ver
+    ``mirror.content_hash``), que forma parte de la clave de su tarjeta
+    cacheada (ver ``{% cache %}`` en inicio.html): una edición hecha en
+    cualquier proceso cambia la clave en todos sin consultar nada más.
+    """
+    return {
+        'products': [
+            {**p, 'version': mirror.product_from_api(p).content_hash} for p in page_data['products']
+        ],
+        'card_ttl': settings.PRODUCTOS_FRAGMENTOS_TTL,
+        'page': page,
+        'has_previous': page > 1,
+        'has_next': page_data['has_next'],
+        'previous_page': page - 1,
+        'next_page': page + 1,
     }
-    return render(request, 'inicio.html', context)
 
 
+def check_product(product_id, product_data):
+    """Convertir las respuestas de 'no encontrado' de la API en un error para la plantilla"""
+    if product_data.get('statusCode') == 404 or product_data.get('id') is None:
+        return {'id': product_id, 'error': f'Producto {product_id}: no encontrado.'}
+    return product_data
+
+
+def descargar_producto(product_id):
+    """Descargar un producto de la API; los fallos se devuelven como {'error': ...}"""
+    try:
+        response = api.get(f'products/{product_id}')
+        if response.status_code in (400, 404):
+            # La API responde 400 cuando el ID no existe
+            return check_product(product_id, {})
+        response.raise_for_status()
+        return check_product(product_id, response.json())
+    except requests.exceptions.RequestException as e:
+        return {'id': product_id, 'error': f'Producto {product_id}: error al conectar con la API: {e}'}
+
+
+def get_products(product_ids):
+    """
+    Obtener varios productos: los que están en el espejo local con una sola
+    consulta y el resto de la API en paralelo (como máximo
+    PLATZI_API_MAX_CONCURRENCY peticiones a la vez).
+    """
+    found = mirror.get_products(product_ids)
+    missing = [pk for pk in product_ids if pk not in found]
+
+    if missing:
+        workers = min(len(missing), settings.PLATZI_API_MAX_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Cada hilo hereda el contexto para respetar el presupuesto de latencia
+            futures = [executor.submit(contextvars.copy_context().run, descargar_producto, pk) for pk in missing]
+            downloaded = {pk: future.result() for pk, future in zip(missing, futures)}
+        mirror.fill(mirror.save_products, [p for p in downloaded.values() if 'error' not in p])
+        found.update(downloaded)
+
+    return [found[pk] for pk in product_ids]
+
+
+def buscar_por_palabras(request, categories):
+    """Búsqueda por palabras clave (?q=...) sobre el espejo local"""
+    search_form = BusquedaProductoForm(request.GET if 'q' in request.GET else None)
+    search_form.fields['category'].choices = [('', 'Todas las categorías')] + list(categories)
+    if not search_form.is_bound or not search_form.is_valid():
+        return search_form, None
+
+    data = search_form.cleaned_data
+    page = get_page_number(request)
+    results = search_products(
+        data['q'],
+        category_id=data['category'] or None,
+        min_price=data['min_price'],
+        max_price=data['max_price'],
+        page=page,
+        per_page=settings.PRODUCTOS_POR_PAGINA,
+    )
+
+    # Query string sin 'page' para los enlaces de paginación
+    params = request.GET.copy()
+    params.pop('page', None)
+    results.update({
+        'page': page,
+        'has_previous': page > 1,
+        'previous_page': page - 1,
+        'next_page': page + 1,
+        'querystring': params.urlencode(),
+    })
+    return search_form, results
+
+
+@condicional(validadores_busqueda)
 def buscar_producto_view(request):
-    product_data = None
+    products_data = []
     form = BuscarProductoForm()
+    search_form, search_results = buscar_por_palabras(request, get_categories())
 
     if request.method == 'POST':
         form = BuscarProductoForm(request.POST)
         if form.is_valid():
-            product_id = form.cleaned_data['product_id']
-            base_url = f'https://api.escuelajs.co/api/v1/products/{product_id}'
-
-            try:
-                response = requests.get(base_url)
-                response.raise_for_status()
-                product_data = response.json()
-
-                if product_data.get('statusCode') == 404:
-                    product_data = {'error': 'Producto no encontrado.'}
-
-            except requests.exceptions.RequestException as e:
-                product_data = {'error': f'Error al conectar con la API: {e}'}
+            # Lista de IDs ya sin repetidos (ver BuscarProductoForm.clean_product_id)
+            products_data = get_products(form.cleaned_data['product_id'])
 
     context = {
         'form': form,
-        'product_data': product_data
+        'products_data': products_data,
+        'search_form': search_form,
+        'search_results': search_results,
     }
     return render(request, 'buscar_producto.html', context)
 
 
-def get_categories():
-    """Obtener categorías desde la API"""
-    url = "https://api.escuelajs.co/api/v1/categories"
+def autocompletar_view(request):
+    """Sugerencias de productos para el buscador (?q=...) en formato JSON"""
+    query = request.GET.get('q', '')[:100]
+    return JsonResponse({'results': autocomplete.get_index().suggest(query)})
+
+
+def imagen_view(request, fmt, size, token):
+    """Miniatura de una imagen de producto servida desde la caché en disco (ver productos/images.py)"""
+    url = images.unsign_url(token)
+    if url is None or size not in images.SIZES or fmt not in images.FORMATS:
+        raise Http404('Imagen no encontrada')
+
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        return [(str(cat["id"]), cat["name"]) for cat in data]
-    except requests.exceptions.RequestException:
-        return []
+        path = images.get_thumbnail(url, size, fmt)
+        try:
+            image_file = open(path, 'rb')
+        except FileNotFoundError:
+            # Expulsada de la caché justo después de generarla
+            image_file = open(images.get_thumbnail(url, size, fmt), 'rb')
+    except images.ImageError as e:
+        print(f'Error en el proxy de imágenes: {e}')
+        # Sin miniatura se deja que el navegador cargue la original
+        response = HttpResponseRedirect(url)
+        response['Cache-Control'] = 'public, max-age=300'
+        return response
+
+    response = FileResponse(image_file, content_type=images.FORMATS[fmt][1])
+    response['Cache-Control'] = f'public, max-age={settings.PRODUCTOS_IMAGENES_MAX_AGE}, immutable'
+    return response
+
+
+@login_required
+def estado_mutacion_view(request, mutation_id):
+    """Estado de un cambio encolado (escritura diferida) en formato JSON; solo para su autor"""
+    mutation = get_object_or_404(Mutation, pk=mutation_id, user=request.user)
+    return JsonResponse(mutation.as_dict())
+
+
+def build_payload(data):
+    """Construir el cuerpo que espera la API a partir de los datos del formulario"""
+    return {
+        'title': data['title'],
+        'price': float(data['price']),
+        'description': data['description'],
+        'categoryId': int(data['category']),
+        'images': [data['image']]
+    }
+
+
+def build_initial_data(product_data):
+    """Datos iniciales del formulario de edición a partir de un producto"""
+    return {
+        'title': product_data.get('title', ''),
+        'price': str(product_data.get('price', '')),
+        'description': product_data.get('description', ''),
+        'category': str(product_data.get('category', {}).get('id', '')),
+        'image': product_data.get('images', [''])[0] if product_data.get('images') else ''
+    }
 
 
 def crear_producto_view(request):
     message = None
+    mutation_id = None
     categories = get_categories()
 
     if request.method == 'POST':
         form = CrearProductoForm(request.POST)
         form.fields['category'].choices = categories  # asignar dinámicamente
         if form.is_valid():
-            data = form.cleaned_data.copy()
-
-            payload = {
-                'title': data['title'],
-                'price': float(data['price']),
-                'description': data['description'],
-                'categoryId': int(data['category']),
-                'images': [data['image']]
-            }
-
-            base_url = 'https://api.escuelajs.co/api/v1/products'
-            try:
-                headers = {'Content-Type': 'application/json'}
-                response = requests.post(base_url, json=payload, headers=headers)
-
-                print(f"Status Code: {response.status_code}")
-                print(f"Response: {response.text}")
-
-                if response.status_code == 201:
-                    new_product = response.json()
-                    message = f'¡Producto "{new_product.get("title", "")}" creado con éxito!'
-                    form = CrearProductoForm()
-                    form.fields['category'].choices = categories
-                else:
-                    try:
-                        error_data = response.json()
-                        message = f'Error de la API: {error_data}'
-                    except:
-                        message = f'Error HTTP {response.status_code}: {response.text}'
-            except requests.exceptions.RequestException as e:
-                message = f'Error de conexión: {e}'
-            except Exception as e:
-                message = f'Error inesperado: {e}'
+            payload = build_payload(form.cleaned_data)
+
+            if settings.PRODUCTOS_ESCRITURA_DIFERIDA:
+                mutation = mutations.enqueue(Mutation.CREATE, payload, user=request.user)
+                mutation_id = mutation.id
+                message = f'Producto "{payload["title"]}" en cola para crearse (cambio #{mutation.id})'
+                form = CrearProductoForm()
+                form.fields['category'].choices = categories
+            else:
+                try:
+                    headers = {'Content-Type': 'application/json'}
+                    response = api.post('products', json=payload, headers=headers)
+
+                    print(f"Status Code: {response.status_code}")
+                    print(f"Response: {response.text}")
+
+                    if response.status_code == 201:
+                        new_product = response.json()
+                        if new_product.get('id') is not None:
+                            mirror.fill(mirror.save_product, new_product)
+                            invalidation.product_changed(new_product['id'], created=True)
+                        message = f'¡Producto "{new_product.get("title", "")}" creado con éxito!'
+                        form = CrearProductoForm()
+                        form.fields['category'].choices = categories
+                    else:
+                        try:
+                            error_data = response.json()
+                            message = f'Error de la API: {error_data}'
+                        except:
+                            message = f'Error HTTP {response.status_code}: {response.text}'
+                except requests.exceptions.RequestException as e:
+                    message = f'Error de conexión: {e}'
+                except Exception as e:
+                    message = f'Error inesperado: {e}'
     else:
         form = CrearProductoForm()
         form.fields['category'].choices = categories
@@ -119,6 +414,7 @@ def crear_producto_view(request):
     context = {
         'form': form,
         'message': message,
+        'mutation_id': mutation_id,
         'edit_mode': False,
     }
     return render(request, 'crear_producto.html', context)
@@ -126,11 +422,16 @@ def crear_producto_view(request):
 
 def eliminar_producto_view(request, product_id):
     if request.method == 'POST':
-        base_url = f'https://api.escuelajs.co/api/v1/products/{product_id}'
+        if settings.PRODUCTOS_ESCRITURA_DIFERIDA:
+            mutation = mutations.enqueue(Mutation.DELETE, product_id=product_id, user=request.user)
+            messages.success(request, f'Producto en cola para eliminarse (cambio #{mutation.id})')
+            return redirect('productos:inicio')
 
         try:
-            response = requests.delete(base_url)
+            response = api.delete(f'products/{product_id}')
             response.raise_for_status()
+            mirror.delete_product(product_id)
+            invalidation.product_changed(product_id, deleted=True)
             messages.success(request, 'Producto eliminado exitosamente')
 
         except requests.exceptions.RequestException as e:
@@ -140,69 +441,65 @@ def eliminar_producto_view(request, product_id):
     return redirect('productos:inicio')
 
 
+@condicional(validadores_edicion)
 def editar_producto_view(request, product_id):
-    base_url = f'https://api.escuelajs.co/api/v1/products/{product_id}'
+    product_path = f'products/{product_id}'
     message = None
+    mutation_id = None
     categories = get_categories()
 
     if request.method == 'POST':
         form = CrearProductoForm(request.POST)
         form.fields['category'].choices = categories
         if form.is_valid():
-            data = form.cleaned_data.copy()
-
-            payload = {
-                'title': data['title'],
-                'price': float(data['price']),
-                'description': data['description'],
-                'categoryId': int(data['category']),
-                'images': [data['image']]
-            }
-
-            try:
-                headers = {'Content-Type': 'application/json'}
-                response = requests.put(base_url, json=payload, headers=headers, timeout=10)
-
-                print(f"PUT Payload: {payload}")
-                print(f"Status Code: {response.status_code}")
-                print(f"Response: {response.text}")
-
-                if response.status_code in [200, 201]:
-                    response_data = response.json()
-                    message = f'¡Producto actualizado con éxito! ID: {response_data.get("id", product_id)}'
-                else:
-                    try:
-                        error_data = response.json()
-                        message = f'Error de la API: {error_data}'
-                    except:
-                        message = f'Error HTTP {response.status_code}: {response.text}'
-
-            except requests.exceptions.Timeout:
-                message = 'Error: Tiempo de espera agotado. Inténtalo de nuevo.'
-            except requests.exceptions.ConnectionError:
-                message = 'Error: No se pudo conectar con la API. Verifica tu conexión.'
-            except requests.exceptions.RequestException as e:
-                message = f'Error de conexión: {e}'
+            payload = build_payload(form.cleaned_data)
+
+            if settings.PRODUCTOS_ESCRITURA_DIFERIDA:
+                mutation = mutations.enqueue(Mutation.UPDATE, payload, product_id=product_id, user=request.user)
+                mutation_id = mutation.id
+                message = f'Cambios del producto {product_id} en cola (cambio #{mutation.id})'
+            else:
+                try:
+                    headers = {'Content-Type': 'application/json'}
+                    response = api.put(product_path, json=payload, headers=headers)
+
+                    print(f"PUT Payload: {payload}")
+                    print(f"Status Code: {response.status_code}")
+                    print(f"Response: {response.text}")
+
+                    if response.status_code in [200, 201]:
+                        response_data = response.json()
+                        if response_data.get('id') is not None:
+                            mirror.fill(mirror.save_product, response_data)
+                        invalidation.product_changed(product_id)
+                        message = f'¡Producto actualizado con éxito! ID: {response_data.get("id", product_id)}'
+                    else:
+                        try:
+                            error_data = response.json()
+                            message = f'Error de la API: {error_data}'
+                        except:
+                            message = f'Error HTTP {response.status_code}: {response.text}'
+
+                except requests.exceptions.Timeout:
+                    message = 'Error: Tiempo de espera agotado. Inténtalo de nuevo.'
+                except requests.exceptions.ConnectionError:
+                    message = 'Error: No se pudo conectar con la API. Verifica tu conexión.'
+                except requests.exceptions.RequestException as e:
+                    message = f'Error de conexión: {e}'
 
     else:
         try:
-            response = requests.get(base_url, timeout=10)
+            product_data = mirror.get_product(product_id)
 
-            if response.status_code == 200:
+            if product_data is None:
+                response = api.get(product_path)
+                if response.status_code != 200:
+                    return HttpResponse(f'Error al obtener el producto: Status {response.status_code}', status=400)
                 product_data = response.json()
+                mirror.fill(mirror.save_product, product_data)
 
-                initial_data = {
-                    'title': product_data.get('title', ''),
-                    'price': str(product_data.get('price', '')),
-                    'description': product_data.get('description', ''),
-                    'category': str(product_data.get('category', {}).get('id', '')),
-                    'image': product_data.get('images', [''])[0] if product_data.get('images') else ''
-                }
-
-                form = CrearProductoForm(initial=initial_data)
-                form.fields['category'].choices = categories
-            else:
-                return HttpResponse(f'Error al obtener el producto: Status {response.status_code}', status=400)
+            form = CrearProductoForm(initial=build_initial_data(product_data))
+            form.fields['category'].choices = categories
 
         except requests.exceptions.RequestException as e:
             return HttpResponse(f'Error al obtener los datos del producto: {e}', status=500)
@@ -212,6 +509,7 @@ def editar_producto_view(request, product_id):
         'product_id': product_id,
         'edit_mode': True,
         'message': message,
+        'mutation_id': mutation_id,
     }
 
     return render(request, 'crear_producto.html', context)
\ No newline at end of file